@@ -0,0 +1,129 @@
+"""
+Checkpoint Log
+Append-only JSONL record of per-article stage outputs, so an interrupted
+run can resume without repeating completed fetch/analysis/validation work.
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List
+
+from result_cache import make_cache_key
+from models import Article, as_dict, is_result
+
+# Constants
+DEFAULT_CHECKPOINT_PATH = "cache/pipeline_checkpoint.jsonl"
+
+
+def checkpoint_key(article: Dict) -> str:
+    """Stable identity of an article within a run."""
+    return make_cache_key(article.get("url", ""), article.get("title", ""), article.get("api_source", ""))
+
+
+class CheckpointState:
+    """Stage outputs recovered from a checkpoint log."""
+
+    def __init__(self):
+        self.articles: List[Dict] = []
+        self.analyses: Dict[str, Dict] = {}
+        self.validations: Dict[str, Dict] = {}
+
+    def apply(self, articles: List[Dict]):
+        """Restore checkpointed analysis/validation results onto articles."""
+        for article in articles:
+            key = checkpoint_key(article)
+            if key in self.analyses:
+                article["analysis"] = self.analyses[key]
+            if key in self.validations:
+                article["validation"] = self.validations[key]
+
+
+class CheckpointLog:
+    """
+    Append-only JSONL checkpoint writer/reader.
+
+    Each line is {"stage": "fetch" | "analysis" | "validation", "key": ..., "data": ...}.
+    Lines are flushed as they are written, so a crash loses at most the
+    record being written; a torn final line is ignored on load.
+
+    Args:
+        path: JSONL file to append to
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Begin a fresh run, discarding any previous checkpoint."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._file = open(self.path, 'w', encoding='utf-8')
+
+    def reopen(self):
+        """Continue appending to an existing checkpoint (used on resume)."""
+        with self._lock:
+            if not self._file:
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if self._file.tell() and not self._ends_with_newline():
+                    self._file.write("\n")  # end a torn line so the next record is not glued onto it
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _append(self, stage: str, article: Dict, data: Dict):
+        record = {"stage": stage, "key": checkpoint_key(article), "data": as_dict(data)}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def record_fetched(self, articles: List[Dict]):
+        """Checkpoint the fetched article list."""
+        for article in articles:
+            self._append("fetch", article, article)
+
+    def record_analysis(self, article: Dict):
+        """Checkpoint a successful analysis (failures are retried on resume)."""
+        if is_result(article.get("analysis")):
+            self._append("analysis", article, article["analysis"])
+
+    def record_validation(self, article: Dict):
+        """Checkpoint a successful validation (failures are retried on resume)."""
+        if is_result(article.get("validation")):
+            self._append("validation", article, article["validation"])
+
+    def load(self) -> CheckpointState:
+        """Read back everything recorded so far."""
+        state = CheckpointState()
+        if not os.path.exists(self.path):
+            return state
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from a crash
+                stage = record.get("stage")
+                if stage == "fetch":
+                    state.articles.append(Article.from_dict(record["data"]))
+                elif stage == "analysis":
+                    state.analyses[record["key"]] = record["data"]
+                elif stage == "validation":
+                    state.validations[record["key"]] = record["data"]
+        return state
+
+    def close(self):
+        """Close the checkpoint file."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,244 @@
+"""
+Columnar Export
+Writes flattened article, analysis and validation fields to Parquet or
+Arrow IPC so analytics jobs can scan single columns (sentiment, tone,
+source) without parsing the nested JSON report.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+from models import UNSAMPLED, is_result
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for columnar output
+    pa = None
+    pq = None
+
+# Constants
+ROW_GROUP_SIZE = 10000  # articles buffered per Parquet row group / Arrow record batch
+PARQUET_COMPRESSION = "zstd"
+FORMAT_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrows"}
+
+# Column name -> kind; "category" columns are dictionary-encoded
+COLUMNS = {
+    "title": "string",
+    "source": "category",
+    "url": "string",
+    "published_at": "string",
+    "api_source": "category",
+    "gist": "string",
+    "sentiment": "category",
+    "tone": "category",
+    "key_entities": "list",
+    "analyzed_by": "category",
+    "analysis_error": "string",
+    "is_valid": "bool",
+    "justification": "string",
+    "suggested_corrections": "list",
+    "sampling_weight": "float",
+    "validation_error": "string",
+    "duplicate_of": "string",
+    "analysis_ok": "bool",
+    "validation_ok": "bool",
+    "validation_unsampled": "bool",
+}
+
+
+def columnar_available() -> bool:
+    """Whether the optional pyarrow dependency is installed."""
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("columnar export requires the 'pyarrow' package (pip install pyarrow)")
+
+
+def columnar_path(base_path: str, fmt: str) -> str:
+    """Build a .parquet/.arrows output path from a base path."""
+    root, _ = os.path.splitext(base_path)
+    return root + FORMAT_SUFFIXES[fmt]
+
+
+def _as_string(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _as_string_list(value) -> Optional[List[str]]:
+    if not isinstance(value, list):
+        return None
+    return [str(item) for item in value]
+
+
+def flatten_article(article: Dict) -> Dict:
+    """
+    Flatten an article with its analysis/validation into one columnar row.
+
+    Missing or malformed LLM output becomes nulls rather than an error, so
+    one bad response cannot break the export.
+    """
+    analysis = article.get("analysis") if is_result(article.get("analysis")) else {}
+    validation = article.get("validation") if is_result(article.get("validation")) else {}
+    is_valid = validation.get("is_valid")
+
+    return {
+        "title": _as_string(article.get("title")),
+        "source": _as_string(article.get("source")),
+        "url": _as_string(article.get("url")),
+        "published_at": _as_string(article.get("published_at")),
+        "api_source": _as_string(article.get("api_source")),
+        "gist": _as_string(analysis.get("gist")),
+        "sentiment": _as_string(analysis.get("sentiment")),
+        "tone": _as_string(analysis.get("tone")),
+        "key_entities": _as_string_list(analysis.get("key_entities")),
+        "analyzed_by": _as_string(analysis.get("analyzed_by")),
+        "analysis_error": _as_string(article.get("analysis_error")),
+        "is_valid": is_valid if isinstance(is_valid, bool) else None,
+        "justification": _as_string(validation.get("justification")),
+        "suggested_corrections": _as_string_list(validation.get("suggested_corrections")),
+        "sampling_weight": float(validation.get("sampling_weight") or 1.0) if validation else None,
+        "validation_error": _as_string(article.get("validation_error")),
+        "duplicate_of": _as_string(article.get("duplicate_of")),
+        "analysis_ok": bool(analysis),
+        "validation_ok": bool(validation),
+        "validation_unsampled": article.get("validation") == UNSAMPLED,
+    }
+
+
+def _schema():
+    """Arrow schema for flattened rows."""
+    types = {
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "list": pa.list_(pa.string()),
+        "bool": pa.bool_(),
+        "float": pa.float64(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS.items()])
+
+
+class _Dictionary:
+    """
+    Append-only value dictionary for one category column.
+
+    Later batches only ever extend the dictionary, so Arrow IPC can send
+    them as deltas instead of replacing the dictionary mid-file.
+    """
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def encode(self, values: List[Optional[str]]):
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            idx = self._index.get(value)
+            if idx is None:
+                idx = self._index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(idx)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()), pa.array(self.values, type=pa.string())
+        )
+
+
+class ColumnarWriter:
+    """
+    Buffer flattened rows and write them as Parquet row groups or Arrow
+    IPC record batches of `row_group_size` articles each.
+
+    Args:
+        path: Output file
+        fmt: "parquet" or "arrow" (Arrow IPC stream format)
+        row_group_size: Articles per row group / record batch
+    """
+
+    def __init__(self, path: str, fmt: str = "parquet", row_group_size: int = ROW_GROUP_SIZE):
+        _require_pyarrow()
+        if fmt not in FORMAT_SUFFIXES:
+            raise ValueError(f"Unsupported columnar format: {fmt}")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.fmt = fmt
+        self.row_group_size = max(1, row_group_size)
+        self.count = 0
+        self.schema = _schema()
+        self._rows: List[Dict] = []
+        self._sink = None
+        self._dictionaries = {name: _Dictionary() for name, kind in COLUMNS.items() if kind == "category"}
+
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression=PARQUET_COMPRESSION)
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_stream(self._sink, self.schema, options=options)
+
+    def write(self, article: Dict):
+        """Buffer one article, flushing a row group when the buffer is full."""
+        self._rows.append(flatten_article(article))
+        self.count += 1
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        arrays = []
+        for field in self.schema:
+            values = [row[field.name] for row in self._rows]
+            if field.name in self._dictionaries:
+                arrays.append(self._dictionaries[field.name].encode(values))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+        self._rows = []
+
+    def close(self):
+        """Write any buffered rows and finalize the file."""
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_columnar_report(articles: Iterable[Dict], filepath: str = "output/analysis_reports.json",
+                         fmt: str = "parquet") -> str:
+    """
+    Export articles to a columnar file next to the JSON report.
+
+    Args:
+        articles: Processed articles
+        filepath: Base report path; the extension is replaced per format
+        fmt: "parquet" or "arrow"
+
+    Returns:
+        Path of the written file
+    """
+    with ColumnarWriter(columnar_path(filepath, fmt), fmt) as writer:
+        for article in articles:
+            writer.write(article)
+
+    print(f"Saved {fmt} report: {writer.path} ({writer.count} rows)")
+    return writer.path
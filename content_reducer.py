@@ -0,0 +1,167 @@
+"""
+Content Reducer
+Shrinks article text to a per-model token budget before it is sent to an
+LLM. Boilerplate is stripped, the text is split on sentence boundaries and
+the most salient sentences are kept (sentence-level TF-IDF with a lead and
+title bonus), in their original order. Both LLM stages use one budget and
+reductions are memoized, so the validator judges exactly the text the
+analyzer saw without reducing it again.
+"""
+
+import re
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from throttling import estimate_tokens
+
+# Constants
+CONTENT_TOKEN_BUDGET = 1000  # article tokens sent to both LLM stages
+CACHE_SIZE = 1024  # reduced articles kept in memory
+LEAD_SENTENCES = 3  # opening sentences get a salience bonus (news lead)
+LEAD_BONUS = 0.5
+TITLE_BONUS = 0.3  # per unit of overlap with the title
+GAP_MARKER = " [...] "
+MIN_WORD_LENGTH = 3
+MAX_BOILERPLATE_LENGTH = 200  # longer sentences are kept even if they match a prompt phrase
+
+STOPWORDS = frozenset("""
+a about after again against all also an and any are as at be because been before being between both
+but by can could did do does during each few for from had has have having he her here hers him his
+how i if in into is it its just more most my no nor not now of off on once only or other our out over
+own said same says she should so some such than that the their them then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your
+""".split())
+
+_NOISE_RE = re.compile(r"\[\+\d+ chars\]|https?://\S+")  # NewsAPI truncation suffix, links
+_BOILERPLATE_RE = re.compile(
+    r"\b(sign up|subscribe|newsletter|follow us|click here|read more|all rights reserved|"
+    r"advertisement|download the app|share this)\b|^(photograph|photo|image|related|also read|watch)\s*:",
+    re.IGNORECASE,
+)
+_SENTENCE_RE = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9])")
+_ABBREVIATION_RE = re.compile(r"\b(?:Mr|Mrs|Ms|Dr|Prof|Sr|Jr|St|Gen|Col|Lt|Sgt|Rep|Sen|Gov|Inc|Ltd|Co|No|vs|[A-Z])\.$")
+_WORD_RE = re.compile(r"\w+")
+
+
+def strip_boilerplate(text: str) -> str:
+    """Remove links and API truncation markers and collapse whitespace."""
+    return re.sub(r"\s+", " ", _NOISE_RE.sub(" ", text)).strip()
+
+
+def _is_boilerplate(sentence: str) -> bool:
+    """Short subscription prompts, captions and 'read more' lines."""
+    return len(sentence) <= MAX_BOILERPLATE_LENGTH and bool(_BOILERPLATE_RE.search(sentence))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on sentence boundaries, keeping common abbreviations intact."""
+    sentences: List[str] = []
+    for piece in _SENTENCE_RE.split(text):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if sentences and _ABBREVIATION_RE.search(sentences[-1]):
+            sentences[-1] += " " + piece
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased content words (stopwords and very short words dropped)."""
+    return [
+        word for word in _WORD_RE.findall(text.lower())
+        if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS
+    ]
+
+
+def _score_sentences(sentences: List[str], title: str) -> List[float]:
+    """Sentence-level TF-IDF salience with lead and title bonuses."""
+    sentence_terms = [terms(sentence) for sentence in sentences]
+    document_frequency = Counter(term for words in sentence_terms for term in set(words))
+    title_terms = set(terms(title))
+    count = len(sentences)
+
+    scores = []
+    for position, words in enumerate(sentence_terms):
+        if not words:
+            scores.append(0.0)
+            continue
+        frequencies = Counter(words)
+        weight = sum(
+            (1 + math.log(freq)) * math.log((1 + count) / (1 + document_frequency[term]) + 1)
+            for term, freq in frequencies.items()
+        )
+        score = weight / math.sqrt(len(words))
+        if position < LEAD_SENTENCES:
+            score *= 1 + LEAD_BONUS
+        if title_terms:
+            score *= 1 + TITLE_BONUS * len(title_terms & frequencies.keys())
+        scores.append(score)
+    return scores
+
+
+def _clip(text: str, token_budget: int) -> str:
+    """Hard-cut a single overlong sentence at a word boundary."""
+    limit = token_budget * 4
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + " ..."
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _ranked(content: str, title: str) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    """Cleaned sentences and their indices ordered by salience (memoized)."""
+    sentences = [s for s in split_sentences(strip_boilerplate(content)) if not _is_boilerplate(s)]
+    scores = _score_sentences(sentences, title)
+    order = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+    return tuple(sentences), tuple(order)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def reduce_content(content: str, token_budget: int, title: str = "") -> str:
+    """
+    Reduce article text to its most salient sentences within a token budget.
+
+    Text that already fits is only cleaned of boilerplate. Otherwise the
+    highest-scoring sentences are kept in article order, with gaps marked.
+
+    Args:
+        content: Article body
+        token_budget: Maximum estimated tokens of the returned text
+        title: Article title (terms shared with it raise a sentence's score)
+
+    Returns:
+        Reduced text
+    """
+    if not content:
+        return ""
+    sentences, order = _ranked(content, title)
+    if not sentences:
+        return ""
+    full_text = " ".join(sentences)
+    if estimate_tokens(full_text) <= token_budget:
+        return full_text
+
+    chosen: List[int] = []
+    used = 0
+    for idx in order:
+        cost = estimate_tokens(sentences[idx]) + 1
+        if used + cost > token_budget:
+            continue
+        chosen.append(idx)
+        used += cost
+    if not chosen:
+        return _clip(sentences[order[0]], token_budget)
+
+    chosen.sort()
+    parts = [sentences[chosen[0]]]
+    for previous, idx in zip(chosen, chosen[1:]):
+        parts.append((" " if idx == previous + 1 else GAP_MARKER) + sentences[idx])
+    return "".join(parts)
+
+
+def article_content(article: Dict) -> str:
+    """Article text reduced to its most salient sentences, as sent to Gemini and Mistral."""
+    return reduce_content(article.get("content", ""), CONTENT_TOKEN_BUDGET, article.get("title", ""))
@@ -0,0 +1,263 @@
+"""
+Deduplicator
+Collapses syndicated and cross-source copies of the same story before the
+LLM stages. Exact duplicates are caught by URL normalization, near
+duplicates by MinHash signatures indexed with LSH banding, so each lookup
+only compares against a handful of candidate articles.
+"""
+
+import re
+import zlib
+import random
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Constants
+NUM_PERM = 64  # MinHash signature length
+NUM_BANDS = 16  # LSH bands (NUM_PERM / NUM_BANDS rows each)
+SIMILARITY_THRESHOLD = 0.8  # estimated Jaccard similarity for a duplicate
+SHINGLE_SIZE = 3  # words per shingle
+MAX_TEXT_LENGTH = 1500  # characters compared; syndicated copies share the lead
+RESULT_FIELDS = ("analysis", "analysis_error", "validation", "validation_error")  # copied onto duplicates
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "cmpid", "CMP", "mc_cid", "mc_eid", "ito"}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonicalize a URL for exact-duplicate detection.
+    Lowercases scheme/host, drops 'www.', fragments, trailing slashes and
+    tracking query parameters.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Hash overlapping word n-grams of the text into 32-bit integers."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """Computes MinHash signatures with a fixed family of hash permutations."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """Return the MinHash signature of the text's shingle set."""
+        shingles = _shingles(text)
+        if not shingles:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        return tuple(
+            min((a * shingle + b) % _MERSENNE_PRIME for shingle in shingles)
+            for a, b in self._params
+        )
+
+
+def _article_text(article: Dict) -> str:
+    """Text used for near-duplicate comparison."""
+    return f"{article.get('title', '')} {article.get('content', '')}"[:MAX_TEXT_LENGTH]
+
+
+class DedupIndex:
+    """
+    Incremental duplicate index over articles.
+
+    Each article is checked against previously added ones: first by
+    normalized URL, then by MinHash/LSH candidates whose estimated Jaccard
+    similarity reaches the threshold. Lookups touch only LSH bucket-mates,
+    so cost per article stays flat as the index grows.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, num_bands: int = NUM_BANDS,
+                 threshold: float = SIMILARITY_THRESHOLD):
+        if num_perm % num_bands:
+            raise ValueError("num_perm must be divisible by num_bands")
+        self.hasher = MinHasher(num_perm)
+        self.rows = num_perm // num_bands
+        self.num_bands = num_bands
+        self.threshold = threshold
+        self._urls: Dict[str, int] = {}
+        self._signatures: List[Optional[Tuple[int, ...]]] = []
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(num_bands)]
+
+    def _bands(self, signature: Tuple[int, ...]) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        for band in range(self.num_bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _similarity(self, a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+    def add(self, article: Dict) -> Tuple[int, Optional[int]]:
+        """
+        Add an article to the index.
+
+        Returns:
+            (article id, id of the earlier article it duplicates or None)
+        """
+        url = normalize_url(article.get("url", ""))
+        if url and url in self._urls:
+            duplicate_of = self._urls[url]
+            self._signatures.append(None)  # duplicates are never compared against
+            return len(self._signatures) - 1, duplicate_of
+
+        signature = self.hasher.signature(_article_text(article))
+        duplicate_of = None
+        best = 0.0
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        for candidate in candidates:
+            similarity = self._similarity(signature, self._signatures[candidate])
+            if similarity >= self.threshold and similarity > best:
+                duplicate_of, best = candidate, similarity
+
+        article_id = len(self._signatures)
+        self._signatures.append(signature if duplicate_of is None else None)
+        if duplicate_of is None:
+            # Only representatives are indexed, so clusters do not chain
+            for band, key in self._bands(signature):
+                self._buckets[band].setdefault(key, []).append(article_id)
+            if url:
+                self._urls[url] = article_id
+        return article_id, duplicate_of
+
+
+def _copy_results(duplicate: Dict, representative: Dict):
+    """Propagate the representative's LLM results onto a duplicate."""
+    for field in RESULT_FIELDS:
+        if field in representative:
+            duplicate[field] = representative[field]
+    duplicate["duplicate_of"] = representative.get("url", "")
+
+
+def deduplicate(articles: List[Dict]) -> Tuple[List[Dict], List[Tuple[Dict, Dict]]]:
+    """
+    Split articles into cluster representatives and their duplicates.
+
+    Args:
+        articles: Fetched articles from all sources
+
+    Returns:
+        (representatives in input order, [(duplicate, representative), ...])
+    """
+    index = DedupIndex()
+    representatives: List[Dict] = []
+    by_id: Dict[int, Dict] = {}
+    duplicates: List[Tuple[Dict, Dict]] = []
+
+    for article in articles:
+        article_id, duplicate_of = index.add(article)
+        if duplicate_of is None:
+            by_id[article_id] = article
+            representatives.append(article)
+        else:
+            duplicates.append((article, by_id[duplicate_of]))
+
+    print(f"[OK] Dedup: {len(representatives)} unique, {len(duplicates)} duplicates of {len(articles)} articles")
+    return representatives, duplicates
+
+
+def propagate_results(duplicates: List[Tuple[Dict, Dict]]):
+    """Copy analysis/validation from each representative to its duplicates."""
+    for duplicate, representative in duplicates:
+        _copy_results(duplicate, representative)
+
+
+class StreamDeduplicator:
+    """
+    Streaming counterpart of deduplicate/propagate_results.
+
+    filter() drops duplicates before the LLM stages and remembers them;
+    expand() sits after the validator and re-emits each held duplicate
+    with its representative's results once that representative is done.
+
+    Memory stays flat in the number of articles: representatives are only
+    referenced while they are inside the pipeline, and once one leaves it
+    only its result fields are kept for duplicates that arrive later.
+    """
+
+    def __init__(self):
+        self.index = DedupIndex()
+        self.unique = 0
+        self._in_flight: Dict[int, Dict] = {}  # article id -> representative between filter() and expand()
+        self._ids: Dict[int, int] = {}  # id(representative) -> article id, for the same articles
+        self._pending: Dict[int, List[Dict]] = {}  # article id -> duplicates held for an in-flight representative
+        self._results: Dict[int, Dict] = {}  # article id -> result fields of a representative that left
+        self._ready: List[Tuple[Dict, Dict]] = []
+        self._lock = threading.Lock()
+
+    def filter(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield only cluster representatives."""
+        for article in articles:
+            article_id, duplicate_of = self.index.add(article)
+            with self._lock:
+                if duplicate_of is None:
+                    self._in_flight[article_id] = article
+                    self._ids[id(article)] = article_id
+                elif duplicate_of in self._results:
+                    self._ready.append((article, self._results[duplicate_of]))
+                else:
+                    self._pending.setdefault(duplicate_of, []).append(article)
+            if duplicate_of is None:
+                self.unique += 1
+                yield article
+
+    def expand(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield processed representatives followed by their duplicates."""
+        duplicates = 0
+        for article in articles:
+            yield article
+            with self._lock:
+                article_id = self._ids.pop(id(article), None)
+                held = []
+                if article_id is not None:
+                    del self._in_flight[article_id]
+                    results = {field: article[field] for field in RESULT_FIELDS if field in article}
+                    results["url"] = article.get("url", "")  # for duplicate_of
+                    self._results[article_id] = results
+                    held = [(dup, results) for dup in self._pending.pop(article_id, [])]
+                ready = held + self._ready
+                self._ready = []
+            for duplicate, representative in ready:
+                _copy_results(duplicate, representative)
+                duplicates += 1
+                yield duplicate
+        
+        # Upstream finished: flush anything still held
+        with self._lock:
+            ready = list(self._ready)
+            for article_id, held in self._pending.items():
+                ready.extend((dup, self._in_flight[article_id]) for dup in held)
+            self._pending, self._ready = {}, []
+            self._in_flight, self._ids = {}, {}
+        for duplicate, representative in ready:
+            _copy_results(duplicate, representative)
+            duplicates += 1
+            yield duplicate
+        print(f"[OK] Dedup: {self.unique} unique, {duplicates} duplicates reused their results")
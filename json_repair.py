@@ -0,0 +1,257 @@
+"""
+JSON Repair
+Tolerant parsing for LLM replies. Strict json.loads is tried first; if it
+fails, an incremental scanner rewrites the text into valid JSON: prose and
+code fences around the value are skipped, trailing commas dropped, raw
+newlines and stray inner quotes escaped, Python literals converted, and
+truncated output closed (cutting back to the last complete member when
+needed). The scanner can be fed chunk by chunk, so partial replies can be
+inspected while they stream in. A "[" in leading prose only starts the
+value when a JSON value follows it, so "[see below]" is not taken for an
+array; callers that expect an object can skip arrays entirely.
+"""
+
+import json
+import threading
+from typing import Any, List, Optional, Tuple
+
+# Constants
+LITERALS = {"True": "true", "False": "false", "None": "null", "NaN": "null", "undefined": "null"}
+VALID_ESCAPES = set('"\\/bfnrtu')
+STRING_CONTROL = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+VALUE_CLOSERS = set(",}]:")  # a quote followed by one of these ends the string
+ARRAY_STARTS = set("{[\"'-0123456789]")  # a top-level "[" must be followed by one of these
+
+
+class JsonRepairParser:
+    """
+    Incremental repairing JSON scanner.
+
+    feed() text as it arrives; value() returns the best-effort parse of
+    everything seen so far (open strings and containers are closed), and
+    complete is True once the top-level value has been closed (consumed then
+    marks where it ended in the input).
+
+    Args:
+        expect_object: Only a "{" starts the top-level value
+    """
+
+    def __init__(self, expect_object: bool = False):
+        self._expect_object = expect_object
+        self._array_pending = False  # saw a "[" in leading text, waiting to see what follows it
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._cuts: List[Tuple[int, Tuple[str, ...]]] = []  # (output length, open containers) after each opener / before each comma
+        self._word = ""
+        self._in_string = False
+        self._quote = '"'
+        self._escape = False
+        self._pending_quote = False  # saw the closing quote, waiting to see what follows it
+        self._pending_space = ""
+        self.started = False
+        self.complete = False
+        self.consumed = 0  # input characters scanned; stops at the end of the top-level value
+
+    def feed(self, text: str) -> "JsonRepairParser":
+        """Scan more reply text."""
+        for ch in text:
+            if self.complete:
+                break  # trailing prose after the top-level value
+            self.consumed += 1
+            if not self.started:
+                if not self._find_start(ch):
+                    continue
+            if self._pending_quote:
+                if self._resolve_quote(ch):
+                    continue
+            if self._in_string:
+                self._string_char(ch)
+            else:
+                self._structural_char(ch)
+        return self
+
+    def _find_start(self, ch: str) -> bool:
+        """Look for the top-level value in leading text; True if ch is the first item of a just-opened array."""
+        if self._array_pending:
+            if ch.isspace():
+                return False
+            self._array_pending = False
+            if ch in ARRAY_STARTS:
+                self.started = True
+                self._open("[")
+                return True
+        if ch == "{":
+            self.started = True
+            self._open(ch)
+        elif ch == "[" and not self._expect_object:
+            self._array_pending = True
+        return False
+
+    def _resolve_quote(self, ch: str) -> bool:
+        """Decide whether a quote ended the string; True if ch was consumed."""
+        if ch.isspace():
+            self._pending_space += ch
+            return True
+        self._pending_quote = False
+        if ch in VALUE_CLOSERS:
+            self._out.append('"')
+            self._in_string = False
+        else:
+            # The quote was part of the text ("He said "no" today", 'India's budget')
+            self._out.append('\\"' if self._quote == '"' else self._quote)
+            self._out.append("".join(STRING_CONTROL.get(c, c) for c in self._pending_space))
+        self._pending_space = ""
+        return False
+
+    def _string_char(self, ch: str):
+        if self._escape:
+            self._escape = False
+            if ch in VALID_ESCAPES:
+                self._out.append(ch)
+            else:
+                self._out.pop()  # drop the backslash of an invalid escape such as \'
+                self._out.append('\\"' if ch == '"' else ch)
+        elif ch == "\\":
+            self._out.append(ch)
+            self._escape = True
+        elif ch == self._quote:
+            self._pending_quote = True
+        elif ch == '"':
+            self._out.append('\\"')  # double quote inside a single-quoted string
+        else:
+            self._out.append(STRING_CONTROL.get(ch, ch))
+
+    def _structural_char(self, ch: str):
+        if self._word and not (ch.isalnum() or ch in "_.+-"):
+            self._flush_word()
+        if ch in "\"'":
+            self._in_string = True
+            self._quote = ch
+            self._out.append('"')
+        elif ch in "{[":
+            self._open(ch)
+        elif ch in "}]":
+            self._close()
+        elif ch == ",":
+            self._strip_trailing(",")
+            if self._out and self._out[-1] not in "{[,":
+                self._cuts.append((len(self._out), tuple(self._stack)))
+                self._out.append(",")
+        elif ch == ":":
+            self._out.append(":")
+        elif ch.isalnum() or ch in "_.+-":
+            self._word += ch
+        # whitespace and stray characters (backticks, prose between members) are dropped
+
+    def _open(self, ch: str):
+        self._stack.append(ch)
+        self._out.append(ch)
+        self._cuts.append((len(self._out), tuple(self._stack)))
+
+    def _close(self):
+        if not self._stack:
+            return
+        self._strip_trailing(",")
+        self._out.append("}" if self._stack.pop() == "{" else "]")  # mismatched closers are corrected
+        if not self._stack:
+            self.complete = True
+
+    def _flush_word(self):
+        self._out.append(LITERALS.get(self._word, self._word))
+        self._word = ""
+
+    def _strip_trailing(self, chars: str):
+        while self._out and self._out[-1] in chars:
+            self._out.pop()
+
+    @staticmethod
+    def _closed(parts: List[str], stack) -> str:
+        """Close dangling separators and open containers of a partial output."""
+        text = "".join(parts).rstrip().rstrip(",")
+        if text.endswith(":"):
+            text += "null"
+        return text + "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+    def value(self) -> Any:
+        """
+        Best-effort value of the text seen so far.
+
+        Raises:
+            ValueError: No JSON value could be recovered
+        """
+        if not self.started:
+            raise ValueError("no JSON object or array in reply")
+        parts = list(self._out)
+        if self._word:
+            parts.append(LITERALS.get(self._word, self._word))
+        if self._in_string:
+            if self._escape:
+                parts.pop()  # dangling backslash
+            parts.append('"')
+
+        candidates = [(parts, self._stack)] + [(parts[:length], stack) for length, stack in reversed(self._cuts)]
+        for candidate, stack in candidates:
+            try:
+                return json.loads(self._closed(candidate, stack))
+            except ValueError:
+                continue
+        raise ValueError("unrepairable JSON reply")
+
+
+class ParseStats:
+    """Thread-safe counts of strict, repaired and failed reply parses."""
+
+    def __init__(self):
+        self.strict = 0
+        self.repaired = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def count(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @property
+    def total(self) -> int:
+        return self.strict + self.repaired + self.failed
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.total if self.total else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.strict} strict, {self.repaired} repaired, {self.failed} failed "
+                f"({self.failure_rate:.1%} parse failures)")
+
+
+def parse_json(text: str, stats: Optional[ParseStats] = None, expect_object: bool = False) -> Any:
+    """
+    Parse an LLM reply as JSON, repairing it if strict parsing fails.
+
+    Args:
+        text: Raw reply text
+        stats: Optional counters to record the outcome in
+        expect_object: Repair only the first object, ignoring arrays in the surrounding prose
+
+    Returns:
+        Parsed value
+
+    Raises:
+        ValueError: The reply holds no recoverable JSON value
+    """
+    try:
+        value = json.loads(text)
+        if stats:
+            stats.count("strict")
+        return value
+    except (TypeError, ValueError):
+        pass
+    try:
+        value = JsonRepairParser(expect_object).feed(text or "").value()
+    except ValueError:
+        if stats:
+            stats.count("failed")
+        raise
+    if stats:
+        stats.count("repaired")
+    return value
@@ -0,0 +1,143 @@
+"""
+JSONL I/O
+Streaming writer and lazy reader for one-record-per-line JSON output,
+optionally gzip- or zstd-compressed.
+"""
+
+import io
+import os
+import gzip
+import json
+from typing import Dict, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for .zst output
+    zstandard = None
+
+# Constants
+FSYNC_EVERY = 100  # records between flush + fsync
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def infer_compression(path: str) -> Optional[str]:
+    """Guess the compression codec from a file extension."""
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def jsonl_path(base_path: str, compression: Optional[str] = None) -> str:
+    """Build a .jsonl output path (with codec suffix) from a base path."""
+    root, _ = os.path.splitext(base_path)
+    return root + ".jsonl" + COMPRESSION_SUFFIXES.get(compression, "")
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise ImportError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+
+
+class JsonlWriter:
+    """
+    Append compact JSON records to a file, one per line.
+
+    Data is flushed and fsync'ed every `fsync_every` records (and on close)
+    rather than per record, which keeps syscalls and compression-block
+    overhead low while bounding how much a crash can lose.
+
+    Args:
+        path: Output file
+        compression: None, "gzip" or "zstd" (inferred from the suffix if None)
+        fsync_every: Records between durable flushes
+        append: Append to an existing file instead of truncating it
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None,
+                 fsync_every: int = FSYNC_EVERY, append: bool = False):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.compression = compression or infer_compression(path)
+        self.fsync_every = max(1, fsync_every)
+        self.count = 0
+        self._pending = 0
+
+        mode = "ab" if append else "wb"
+        self._raw = open(path, mode)
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode=mode)
+        elif self.compression == "zstd":
+            _require_zstd()
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        elif self.compression is None:
+            self._stream = self._raw
+        else:
+            self._raw.close()
+            raise ValueError(f"Unsupported compression: {self.compression}")
+
+    def write(self, record: Dict):
+        """Append one record."""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._stream.write(line.encode("utf-8"))
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Flush buffered records through the codec and fsync them to disk."""
+        if self.compression == "zstd":
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._stream.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._pending = 0
+
+    def close(self):
+        """Flush, fsync and close the file."""
+        if self._raw.closed:
+            return
+        if self._stream is not self._raw:
+            # Closing the codec writes its trailer/end-of-frame to the raw file
+            self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_jsonl(path: str, compression: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Lazily iterate the records of a (possibly compressed) JSONL file.
+
+    Args:
+        path: JSONL file written by JsonlWriter
+        compression: None, "gzip" or "zstd" (inferred from the suffix if None)
+
+    Yields:
+        One decoded record per non-empty line
+    """
+    compression = compression or infer_compression(path)
+
+    if compression == "gzip":
+        f = gzip.open(path, "rt", encoding="utf-8")
+    elif compression == "zstd":
+        _require_zstd()
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        f = io.TextIOWrapper(reader, encoding="utf-8")
+    else:
+        f = open(path, "r", encoding="utf-8")
+
+    with f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -1,8 +1,21 @@
 import os
 import json
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional, Iterable, Iterator, Tuple
 from dotenv import load_dotenv
 from google import genai
+from throttling import (
+    AdaptiveBackoff, OverloadError, RateLimiter,
+    estimate_tokens, ordered_map,
+)
+from resilience import as_overload_error, is_retryable
+from result_cache import ResultCache, make_cache_key
+from content_reducer import article_content
+from json_repair import ParseStats, parse_json
+from models import SENTIMENTS, TONES
+from local_classifier import LocalClassifier, LOCAL_LABEL
+from llm_backends import BackendRouter, GeminiBackend, OpenRouterBackend, Prompt
+from llm_validator import init_mistral
 
 # Load environment variables
 load_dotenv()
@@ -10,8 +23,134 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # Constants
-MAX_CONTENT_LENGTH = 4000  # characters
 MODEL_NAME = "gemini-3-flash-preview"
+FALLBACK_MODELS = ["gemini-2.5-flash"]  # same Gemini client, tried in order after MODEL_NAME
+OPENROUTER_FALLBACK_MODELS = ["google/gemini-2.5-flash"]  # last resort, via the validator's OpenRouter client
+CALL_DEADLINE = 60.0  # seconds per single-article attempt before failing over
+BATCH_CALL_DEADLINE = 180.0  # seconds per batched attempt
+MAX_IN_FLIGHT = 8  # concurrent Gemini requests
+REQUESTS_PER_MINUTE = 60
+TOKENS_PER_MINUTE = 250000
+PROMPT_OVERHEAD_TOKENS = 1600  # instruction block + expected JSON reply
+MAX_OVERLOAD_RETRIES = 4
+PROMPT_VERSION = "4"  # bump whenever the analysis prompt or cache policy changes
+CACHE_PATH = "cache/analysis_cache.db"
+CACHE_TTL = 7 * 24 * 3600  # seconds
+CACHE_MAX_ENTRIES = 50000
+BATCH_TOKEN_BUDGET = 12000  # input + expected output tokens per batched request
+BATCH_ITEM_OUTPUT_TOKENS = 200  # expected JSON reply per article
+MAX_BATCH_SIZE = 10
+REQUIRED_FIELDS = ["gist", "sentiment", "tone", "key_entities"]
+
+# Structured-output schemas (Gemini Schema dicts): the reply is constrained to
+# bare JSON with valid enum values, so no fence stripping or re-asking is needed
+ANALYSIS_PROPERTIES = {
+    "gist": {"type": "STRING"},
+    "sentiment": {"type": "STRING", "enum": list(SENTIMENTS)},
+    "tone": {"type": "STRING", "enum": [tone for tone in TONES if tone != "unknown"]},
+    "key_entities": {"type": "ARRAY", "items": {"type": "STRING"}},
+}
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": ANALYSIS_PROPERTIES,
+    "required": REQUIRED_FIELDS,
+    "property_ordering": REQUIRED_FIELDS,
+}
+BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": dict(ANALYSIS_PROPERTIES, index={"type": "INTEGER"}),
+        "required": ["index"] + REQUIRED_FIELDS,
+        "property_ordering": ["index"] + REQUIRED_FIELDS,
+    },
+}
+
+# Prompt templates, built once. The instruction blocks are identical for every
+# request and go first, as a prefix the providers can cache; only the article
+# part is formatted per request. The shared field guide keeps both blocks above
+# Gemini's explicit context-cache minimum (MIN_CONTEXT_CACHE_TOKENS).
+ANALYSIS_GUIDE = """Field guide:
+
+gist
+- One or two plain sentences stating what happened, who did it and why it matters.
+- Report the article's own claims; do not add background the article does not give.
+- Attribute contested claims ("the opposition alleged...") instead of stating them as fact.
+
+sentiment (how the events reported affect the people, parties or institutions at the centre of the story)
+- positive: favorable developments such as a bill passing with broad support, a dispute being settled, welfare schemes or investment being announced, or an election won cleanly.
+- negative: unfavorable developments such as violence, arrests, scandals, defections that topple a government, walkouts, or a policy being struck down.
+- neutral: schedules, procedural updates, explainers, or stories that weigh both sides without a clear outcome.
+- Judge the events, not the writer's adjectives: a calmly written report of riots is still negative.
+
+tone (the writing style of the article itself)
+- urgent: breaking news, live updates, warnings or deadlines; short sentences and words like "just in" or "immediately".
+- analytical: explains causes, numbers or likely consequences; typical of explainers and data stories.
+- satirical: mocks its subject through irony or exaggeration; typical of columns and parody.
+- balanced: presents the positions of several sides with comparable weight.
+- critical: argues against a person, party or policy; typical of opinion pieces and editorials.
+- optimistic: stresses progress, hope or opportunity.
+- informative: straight factual reporting with little interpretation; use it when no other tone clearly fits.
+
+key_entities
+- Three to five people, parties, institutions or places that the story is about, most important first.
+- Use full names on first mention ("Narendra Modi", not "PM"), and the common short form for parties and bodies ("BJP", "Congress", "Election Commission").
+- Leave out the news outlet, the reporter and entities mentioned only in passing.
+
+Edge cases
+- Opinion pieces: the gist states the author's argument ("The author argues..."); sentiment still follows the events discussed.
+- Live blogs and roundups: summarise the main development only.
+- Truncated or very short content: analyse what is given and do not guess the rest.
+- Mixed outcomes: pick the sentiment of the headline development; use neutral only when no side clearly gains or loses.
+
+Examples:
+
+Article: "The Lok Sabha passed the Women's Reservation Bill with 454 votes in favour and two against, reserving a third of seats in Parliament and state assemblies for women. Leaders across parties welcomed the vote."
+{"gist": "The Lok Sabha passed the Women's Reservation Bill by 454 votes to two, reserving a third of legislative seats for women.", "sentiment": "positive", "tone": "informative", "key_entities": ["Lok Sabha", "Women's Reservation Bill", "Parliament"]}
+
+Article: "Opposition MPs staged a walkout after the Speaker refused a debate on the Manipur violence. Congress accused the government of silencing Parliament, while the BJP said the opposition was disrupting business for headlines."
+{"gist": "Opposition MPs walked out after the Speaker refused a debate on the Manipur violence, with Congress and the BJP trading blame.", "sentiment": "negative", "tone": "balanced", "key_entities": ["Congress", "BJP", "Lok Sabha Speaker", "Manipur"]}
+
+Article: "Why did the alliance lose Karnataka? Vote-share data shows its rural support fell by six points while urban seats held steady, suggesting farm distress rather than leadership drove the result."
+{"gist": "Vote-share data suggests the alliance lost Karnataka because its rural support fell six points, pointing to farm distress.", "sentiment": "negative", "tone": "analytical", "key_entities": ["Karnataka", "Karnataka assembly election"]}
+
+Article: "Just in: the Election Commission has ordered a repoll in 12 booths of Nandigram after reports of EVM tampering. Polling resumes at 7 am tomorrow; security forces are being rushed to the constituency."
+{"gist": "The Election Commission ordered a repoll in 12 Nandigram booths after reports of EVM tampering, with voting set for the next morning.", "sentiment": "negative", "tone": "urgent", "key_entities": ["Election Commission", "Nandigram", "EVM"]}"""
+ANALYSIS_INSTRUCTIONS = """Analyze the news article about Indian politics given below and provide a structured JSON response.
+
+Provide your analysis in the following JSON format (respond ONLY with valid JSON, no other text):
+{
+    "gist": "A concise 1-2 sentence summary of the article",
+    "sentiment": "positive OR negative OR neutral",
+    "tone": "One of: urgent, analytical, satirical, balanced, critical, optimistic, informative",
+    "key_entities": ["List of important people, organizations, or places mentioned"]
+}
+
+Respond ONLY with valid JSON, no markdown formatting or additional text.
+
+""" + ANALYSIS_GUIDE
+ARTICLE_TEMPLATE = """Article Title: {title}
+
+Article Content:
+{content}"""
+BATCH_INSTRUCTIONS = """Analyze each of the news articles about Indian politics given below and provide a structured JSON response.
+
+Respond ONLY with a JSON array containing exactly one object per article, in this format:
+[
+    {
+        "index": <article number from its heading>,
+        "gist": "A concise 1-2 sentence summary of the article",
+        "sentiment": "positive OR negative OR neutral",
+        "tone": "One of: urgent, analytical, satirical, balanced, critical, optimistic, informative",
+        "key_entities": ["List of important people, organizations, or places mentioned"]
+    }
+]
+
+Analyze every article independently. Respond ONLY with valid JSON, no markdown formatting or additional text.
+
+""" + ANALYSIS_GUIDE
+BATCH_TEMPLATE = "{count} articles:\n\n{articles}"
+BATCH_ITEM_TEMPLATE = "### Article {index}\nTitle: {title}\nContent:\n{content}"
 
 
 def init_gemini() -> Optional[genai.Client]:
@@ -27,7 +166,8 @@ def init_gemini() -> Optional[genai.Client]:
     
     try:
         os.environ["GEMINI_API_KEY"] = GEMINI_API_KEY
-        client = genai.Client()
+        # SDK-level timeout so calls abandoned by a deadline do not hang forever
+        client = genai.Client(http_options={"timeout": int(BATCH_CALL_DEADLINE * 1000)})
         print(f"[OK] Gemini: Client initialized ({MODEL_NAME})")
         return client
     except Exception as e:
@@ -35,28 +175,61 @@ def init_gemini() -> Optional[genai.Client]:
         return None
 
 
-def truncate_content(content: str, max_length: int = MAX_CONTENT_LENGTH) -> str:
-    """Truncate content to fit within token limits."""
-    if len(content) <= max_length:
-        return content
-    return content[:max_length] + "... [truncated]"
+def init_backends(stream_replies: bool = False) -> Optional[BackendRouter]:
+    """
+    Build the analysis backend chain: MODEL_NAME, then FALLBACK_MODELS on
+    the Gemini client, then OPENROUTER_FALLBACK_MODELS on OpenRouter.
+    
+    Args:
+        stream_replies: Stream replies and stop reading at the end of the JSON
+    
+    Returns:
+        Router over every backend whose client initialized, or None if none did
+    """
+    backends = []
+    client = init_gemini()
+    if client:
+        backends.extend(GeminiBackend(client, model) for model in [MODEL_NAME] + FALLBACK_MODELS)
+    openrouter = init_mistral() if OPENROUTER_FALLBACK_MODELS else None
+    if openrouter:
+        openrouter = openrouter.with_options(timeout=BATCH_CALL_DEADLINE)
+        backends.extend(OpenRouterBackend(openrouter, model) for model in OPENROUTER_FALLBACK_MODELS)
+    if not backends:
+        return None
+    print(f"[OK] Analysis backends: {' -> '.join(backend.name for backend in backends)}")
+    return BackendRouter(backends, deadline=CALL_DEADLINE, streaming=stream_replies)
+
+
+def _has_content(content: str) -> bool:
+    """Check whether reduced article content is worth sending to Gemini."""
+    return bool(content) and content != "No content"
+
+
+def _parse_analysis(response_text: str, stats: Optional[ParseStats] = None) -> Dict:
+    """Parse (repairing if needed) a single-article reply; incomplete replies raise so the router fails over."""
+    analysis = parse_json(response_text, stats, expect_object=True)
+    if not isinstance(analysis, dict) or not all(field in analysis for field in REQUIRED_FIELDS):
+        raise ValueError("incomplete analysis")
+    return analysis
 
 
-def analyze_article(article: Dict, client: genai.Client) -> Optional[Dict]:
+def analyze_article(article: Dict, router: BackendRouter, raise_on_overload: bool = False) -> Optional[Dict]:
     """
-    Analyze a single article using Gemini.
+    Analyze a single article using Gemini (or a failover backend).
     
     Args:
         article: Article dictionary with title, content, etc.
-        client: Initialized Gemini client
+        router: Backend router from init_backends
+        raise_on_overload: Raise OverloadError (RateLimitError for 429s) when every
+            backend failed transiently, instead of returning None
         
     Returns:
-        Analysis dictionary or None on failure
+        Analysis dictionary (analyzed_by names the answering backend) or None on failure
     """
     title = article.get("title", "No title")
-    content = truncate_content(article.get("content", ""))
+    content = article_content(article)
     
-    if not content or content == "No content":
+    if not _has_content(content):
         print(f"[WARN] Skipping article with no content: {title[:50]}")
         return {
             "gist": "No content available for analysis",
@@ -66,62 +239,289 @@ def analyze_article(article: Dict, client: genai.Client) -> Optional[Dict]:
             "error": "no_content"
         }
     
-    prompt = f"""Analyze the following news article about Indian politics and provide a structured JSON response.
+    prompt = Prompt(ANALYSIS_INSTRUCTIONS, ARTICLE_TEMPLATE.format(title=title, content=content))
 
-Article Title: {title}
+    try:
+        # Deadlines, hedging and failover to alternate models happen in the router
+        completion = router.complete(prompt, parse=partial(_parse_analysis, stats=router.parse_stats),
+                                     schema=ANALYSIS_SCHEMA)
+        analysis = completion.value
+        analysis["analyzed_by"] = completion.backend
+        return analysis
+        
+    except Exception as e:
+        if raise_on_overload and is_retryable(e):
+            raise as_overload_error(e) from e
+        print(f"[ERROR] Analysis failed for '{title[:50]}': {str(e)[:100]}")
+        return None
 
-Article Content:
-{content}
 
-Provide your analysis in the following JSON format (respond ONLY with valid JSON, no other text):
-{{
-    "gist": "A concise 1-2 sentence summary of the article",
-    "sentiment": "positive OR negative OR neutral",
-    "tone": "One of: urgent, analytical, satirical, balanced, critical, optimistic, informative",
-    "key_entities": ["List of important people, organizations, or places mentioned"]
-}}
+def plan_batches(articles: List[Dict], token_budget: int = BATCH_TOKEN_BUDGET,
+                 max_batch_size: int = MAX_BATCH_SIZE) -> List[List[Dict]]:
+    """
+    Greedily pack consecutive articles into batches that fit a token budget.
+    
+    Args:
+        articles: Articles to pack (order is preserved)
+        token_budget: Estimated input + output tokens allowed per request
+        max_batch_size: Hard cap on articles per request
+        
+    Returns:
+        List of batches; concatenating them gives back the input list
+    """
+    batches = []
+    current = []
+    used = PROMPT_OVERHEAD_TOKENS
+    
+    for article in articles:
+        content = article_content(article)
+        cost = estimate_tokens(article.get("title", "") + content) + BATCH_ITEM_OUTPUT_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            used = PROMPT_OVERHEAD_TOKENS
+        current.append(article)
+        used += cost
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch(response_text: str, stats: Optional[ParseStats] = None) -> List:
+    """Parse (repairing if needed) a batched reply into a list of items (tolerating {"0": {...}} objects)."""
+    items = parse_json(response_text, stats)
+    if isinstance(items, dict):
+        items = [dict(value, index=key) for key, value in items.items() if isinstance(value, dict)]
+    if not isinstance(items, list):
+        raise ValueError(f"batch reply is {type(items).__name__}, expected a list")
+    return items
+
+
+def analyze_batch(articles: List[Dict], router: BackendRouter, raise_on_overload: bool = False) -> List[Optional[Dict]]:
+    """
+    Analyze several articles in a single Gemini request.
+    
+    The instruction block is sent once and Gemini returns a JSON array with
+    one object per article, keyed by its index in the batch. Items that are
+    missing or malformed come back as None so the caller can retry only
+    those through analyze_article.
+    
+    Args:
+        articles: Articles with non-empty content
+        router: Backend router from init_backends
+        raise_on_overload: Raise OverloadError when every backend failed transiently
+            instead of failing the batch
+        
+    Returns:
+        One analysis (or None) per input article, in input order
+    """
+    articles_block = "\n\n".join(
+        BATCH_ITEM_TEMPLATE.format(index=idx, title=article.get("title", "No title"), content=article_content(article))
+        for idx, article in enumerate(articles)
+    )
+    prompt = Prompt(BATCH_INSTRUCTIONS, BATCH_TEMPLATE.format(count=len(articles), articles=articles_block))
+
+    results: List[Optional[Dict]] = [None] * len(articles)
+    
+    try:
+        completion = router.complete(prompt, parse=partial(_parse_batch, stats=router.parse_stats), kind="batch",
+                                     deadline=BATCH_CALL_DEADLINE, schema=BATCH_SCHEMA)
+    except Exception as e:
+        if raise_on_overload and is_retryable(e):
+            raise as_overload_error(e) from e
+        print(f"[WARN] Batch analysis of {len(articles)} articles failed: {str(e)[:100]}")
+        return results
+    
+    for item in completion.value:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.pop("index"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < len(articles) and all(field in item for field in REQUIRED_FIELDS):
+            item["analyzed_by"] = completion.backend
+            results[idx] = item
+    
+    return results
 
-Rules:
-- Sentiment: positive (favorable/good news), negative (unfavorable/bad news), neutral (factual/balanced)
-- Tone: Choose the most appropriate tone that matches the article's writing style
-- Key entities: Extract 3-5 most important names/organizations
-- Respond ONLY with valid JSON, no markdown formatting or additional text"""
 
+def analysis_cache_key(article: Dict) -> str:
+    """Content-addressed cache key for an article's Gemini analysis."""
+    title = article.get("title", "No title")
+    content = article_content(article)
+    return make_cache_key(MODEL_NAME, PROMPT_VERSION, title, content)
+
+
+def _is_cacheable(analysis: Optional[Dict]) -> bool:
+    """Only MODEL_NAME's own answers are cached; failover answers would pose as primary-model hits."""
+    return bool(analysis) and "error" not in analysis and analysis.get("analyzed_by") == MODEL_NAME
+
+
+def open_analysis_cache() -> Optional[ResultCache]:
+    """Open the persistent analysis cache, or None if it is unavailable."""
     try:
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt
-        )
-        response_text = response.text.strip()
+        return ResultCache(CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+    except Exception as e:
+        print(f"[WARN] Analysis cache disabled: {str(e)[:100]}")
+        return None
+
+
+class _AnalysisWorker:
+    """
+    Per-article LLM call guarded by shared rate limits, backoff and cache.
+    
+    Cached Gemini answers are used first; otherwise a confident local
+    classifier result (if a classifier is given) skips the Gemini call.
+    """
+    
+    def __init__(self, router: BackendRouter,
+                 requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE,
+                 cache: Optional[ResultCache] = None,
+                 classifier: Optional[LocalClassifier] = None):
+        self.router = router
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.backoff = AdaptiveBackoff()
+        self.cache = cache
+        self.classifier = classifier
+    
+    def __call__(self, article: Dict) -> Optional[Dict]:
+        if self.cache:
+            cached = self.cache.get(analysis_cache_key(article))
+            if cached is not None:
+                return cached
+        if self.classifier:
+            local = self.classifier.classify(article)
+            if local is not None:
+                return local
+        return self._analyze_uncached(article)
+    
+    def _analyze_uncached(self, article: Dict) -> Optional[Dict]:
+        """Single-article Gemini call with rate limiting and 429 retries."""
+        title = article.get("title", "No title")
+        content = article_content(article)
+        tokens = estimate_tokens(title + content) + PROMPT_OVERHEAD_TOKENS
         
-        # Clean up response - remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
+        for attempt in range(MAX_OVERLOAD_RETRIES + 1):
+            # Fail fast instead of sitting out the shared backoff while every backend is tripped
+            if not self.router.available:
+                print(f"[ERROR] Analysis failed for '{title[:50]}': all backend circuits open")
+                return None
+            self.backoff.wait()
+            self.limiter.acquire(tokens)
+            try:
+                analysis = analyze_article(article, self.router, raise_on_overload=True)
+            except OverloadError as e:
+                print(f"[WARN] Analysis backends overloaded (attempt {attempt + 1}): {title[:50]}")
+                self.backoff.record_rate_limit(e.retry_after)
+                continue
+            self.backoff.record_success()
+            if self.cache and _is_cacheable(analysis):
+                self.cache.put(analysis_cache_key(article), analysis)
+            return analysis
         
-        # Parse JSON
-        analysis = json.loads(response_text)
+        print(f"[ERROR] Analysis failed for '{title[:50]}': overload retries exhausted")
+        return None
+    
+    def analyze_batch(self, articles: List[Dict]) -> List[Optional[Dict]]:
+        """Analyze a planned batch, falling back to single calls for failed items."""
+        results: List[Optional[Dict]] = [None] * len(articles)
+        pending: List[Tuple[int, Dict]] = []
         
-        # Validate required fields
-        required_fields = ["gist", "sentiment", "tone", "key_entities"]
-        if not all(field in analysis for field in required_fields):
-            print(f"[WARN] Incomplete analysis for: {title[:50]}")
-            return None
+        for idx, article in enumerate(articles):
+            content = article_content(article)
+            cached = self.cache.get(analysis_cache_key(article)) if self.cache and _has_content(content) else None
+            local = self.classifier.classify(article) if self.classifier and cached is None else None
+            if cached is not None:
+                results[idx] = cached
+            elif local is not None:
+                results[idx] = local
+            elif _has_content(content):
+                pending.append((idx, article))
+            else:
+                results[idx] = analyze_article(article, self.router)
         
-        return analysis
+        if len(pending) > 1:
+            batch = [article for _, article in pending]
+            tokens = PROMPT_OVERHEAD_TOKENS + sum(
+                estimate_tokens(a.get("title", "") + article_content(a)) + BATCH_ITEM_OUTPUT_TOKENS
+                for a in batch
+            )
+            batch_results = [None] * len(batch)
+            for attempt in range(MAX_OVERLOAD_RETRIES + 1):
+                if not self.router.available:
+                    break  # leftovers fail fast on the single-article path
+                self.backoff.wait()
+                self.limiter.acquire(tokens)
+                try:
+                    batch_results = analyze_batch(batch, self.router, raise_on_overload=True)
+                except OverloadError as e:
+                    print(f"[WARN] Analysis backends overloaded on batch (attempt {attempt + 1})")
+                    self.backoff.record_rate_limit(e.retry_after)
+                    continue
+                self.backoff.record_success()
+                break
+            
+            for (idx, article), analysis in zip(pending, batch_results):
+                if analysis is not None:
+                    results[idx] = analysis
+                    if self.cache and _is_cacheable(analysis):
+                        self.cache.put(analysis_cache_key(article), analysis)
+            pending = [(idx, article) for idx, article in pending if results[idx] is None]
+            if pending:
+                print(f"[WARN] {len(pending)}/{len(batch)} batch items need a single-article retry")
         
-    except Exception as e:
-        print(f"[ERROR] Analysis failed for '{title[:50]}': {str(e)[:100]}")
-        return None
+        # Single-article path for leftovers (and batches of one)
+        for idx, article in pending:
+            results[idx] = self._analyze_uncached(article)
+        
+        return results
 
 
-def analyze_all_articles(articles: List[Dict]) -> List[Dict]:
+def _record_analysis(article: Dict, analysis: Optional[Dict]) -> bool:
+    """Attach an analysis result (or failure marker) to the article."""
+    if analysis:
+        article["analysis"] = analysis
+        route = f" | local ({analysis['confidence']:.2f})" if analysis.get("analyzed_by") == LOCAL_LABEL else ""
+        print(f"   [OK] Sentiment: {analysis['sentiment']} | Tone: {analysis['tone']}{route}")
+        return True
+    
+    article["analysis"] = "failed"
+    article["analysis_error"] = "analysis_failed"
+    print(f"   [ERROR] Analysis failed")
+    return False
+
+
+def _load_fast_path(fast_path: bool) -> Optional[LocalClassifier]:
+    """Load the local pre-classifier when the fast path is requested."""
+    return LocalClassifier.load() if fast_path else None
+
+
+def _is_local(analysis: Optional[Dict]) -> bool:
+    return bool(analysis) and analysis.get("analyzed_by") == LOCAL_LABEL
+
+
+def analyze_all_articles(articles: List[Dict], max_in_flight: int = MAX_IN_FLIGHT,
+                         use_cache: bool = True, batched: bool = False,
+                         on_result: Optional[Callable[[Dict], None]] = None,
+                         fast_path: bool = False, stream_replies: bool = False) -> List[Dict]:
     """
     Analyze all articles using Gemini.
     Continues even if some analyses fail.
     
+    Requests run concurrently (up to max_in_flight at once) under shared
+    requests-per-minute / tokens-per-minute limits; results keep input order.
+    
     Args:
         articles: List of article dictionaries
+        max_in_flight: Maximum concurrent Gemini requests (1 = serial)
+        use_cache: Reuse analyses from the persistent cache
+        batched: Pack several articles into each Gemini request
+        on_result: Called with each article as soon as its analysis is attached
+        fast_path: Let the local classifier answer confident articles without Gemini
+        stream_replies: Stream replies, closing each stream once its JSON is complete
         
     Returns:
         List of articles with analysis added
@@ -130,9 +530,9 @@ def analyze_all_articles(articles: List[Dict]) -> List[Dict]:
     print("Starting LLM Analysis (Gemini)")
     print("="*60)
     
-    client = init_gemini()
-    if not client:
-        print("[ERROR] FAILED: Could not initialize Gemini")
+    router = init_backends(stream_replies)
+    if not router:
+        print("[ERROR] FAILED: Could not initialize Gemini or a fallback backend")
         for article in articles:
             article["analysis"] = "failed"
             article["analysis_error"] = "gemini_init_failed"
@@ -141,34 +541,109 @@ def analyze_all_articles(articles: List[Dict]) -> List[Dict]:
     analyzed_articles = []
     success_count = 0
     fail_count = 0
+    local_count = 0
     
-    for idx, article in enumerate(articles, 1):
-        print(f"\n[{idx}/{len(articles)}] Analyzing: {article['title'][:60]}...")
-        
-        analysis = analyze_article(article, client)
+    cache = open_analysis_cache() if use_cache else None
+    classifier = _load_fast_path(fast_path)
+    worker = _AnalysisWorker(router, cache=cache, classifier=classifier)
+    if batched:
+        batches = plan_batches(articles)
+        print(f"Packed {len(articles)} articles into {len(batches)} batched requests")
+        results = (
+            analysis
+            for batch_results in ordered_map(worker.analyze_batch, batches, max_in_flight)
+            for analysis in batch_results
+        )
+    else:
+        results = ordered_map(worker, articles, max_in_flight)
+    
+    for idx, (article, analysis) in enumerate(zip(articles, results), 1):
+        print(f"\n[{idx}/{len(articles)}] Analyzed: {article['title'][:60]}...")
         
-        if analysis:
-            article["analysis"] = analysis
-            analyzed_articles.append(article)
+        if _record_analysis(article, analysis):
             success_count += 1
-            print(f"   [OK] Sentiment: {analysis['sentiment']} | Tone: {analysis['tone']}")
+            local_count += _is_local(analysis)
         else:
-            article["analysis"] = "failed"
-            article["analysis_error"] = "analysis_failed"
-            analyzed_articles.append(article)
             fail_count += 1
-            print(f"   [ERROR] Analysis failed")
+        analyzed_articles.append(article)
+        if on_result:
+            on_result(article)
     
     # Summary
     print("\n" + "-"*60)
     print(f"[OK] SUCCESS: Analyzed {success_count}/{len(articles)} articles")
     if fail_count > 0:
         print(f"[WARN] WARNING: {fail_count} articles failed analysis")
+    if classifier:
+        print(f"   Fast path: {local_count} classified locally, {len(articles) - local_count} routed to Gemini")
+    router.print_report()
+    router.close()
+    if cache:
+        print(f"   Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
     print("="*60 + "\n")
     
     return analyzed_articles
 
 
+def analyze_stream(articles: Iterable[Dict], max_in_flight: int = MAX_IN_FLIGHT,
+                   use_cache: bool = True, fast_path: bool = False,
+                   stream_replies: bool = False) -> Iterator[Dict]:
+    """
+    Analyze articles as they arrive.
+    Streaming counterpart of analyze_all_articles: holds at most
+    max_in_flight articles, so it can sit between a fetch stream and the
+    validator. Output order matches input order.
+    
+    Args:
+        articles: Iterable of article dictionaries (may be unbounded)
+        max_in_flight: Maximum concurrent Gemini requests
+        use_cache: Reuse analyses from the persistent cache
+        fast_path: Let the local classifier answer confident articles without Gemini
+        stream_replies: Stream replies, closing each stream once its JSON is complete
+        
+    Yields:
+        Each article with analysis added
+    """
+    router = init_backends(stream_replies)
+    if not router:
+        print("[ERROR] Could not initialize Gemini or a fallback backend, marking streamed articles as failed")
+        for article in articles:
+            article["analysis"] = "failed"
+            article["analysis_error"] = "gemini_init_failed"
+            yield article
+        return
+    
+    success_count = 0
+    fail_count = 0
+    local_count = 0
+    cache = open_analysis_cache() if use_cache else None
+    classifier = _load_fast_path(fast_path)
+    worker = _AnalysisWorker(router, cache=cache, classifier=classifier)
+    
+    def analyze_pair(article: Dict):
+        return article, worker(article)
+    
+    for idx, (article, analysis) in enumerate(ordered_map(analyze_pair, articles, max_in_flight), 1):
+        print(f"\n[{idx}] Analyzed: {article['title'][:60]}...")
+        
+        if _record_analysis(article, analysis):
+            success_count += 1
+            local_count += _is_local(analysis)
+        else:
+            fail_count += 1
+        yield article
+    
+    print(f"\n[OK] Gemini stream: {success_count} analyzed, {fail_count} failed")
+    if classifier:
+        print(f"   Fast path: {local_count} classified locally, {success_count + fail_count - local_count} routed to Gemini")
+    router.print_report()
+    router.close()
+    if cache:
+        print(f"   Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+
+
 if __name__ == "__main__":
     # Test the analyzer with a sample article
     sample_article = {
@@ -180,9 +655,9 @@ if __name__ == "__main__":
         "api_source": "test"
     }
     
-    client = init_gemini()
-    if client:
-        result = analyze_article(sample_article, client)
+    router = init_backends()
+    if router:
+        result = analyze_article(sample_article, router)
         if result:
             print("\nAnalysis Result:")
             print(json.dumps(result, indent=2))
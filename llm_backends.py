@@ -0,0 +1,685 @@
+"""
+LLM Backends
+Provider-neutral completion layer for the LLM stages. A BackendRouter sends
+each prompt to an ordered list of backends (model + provider). Every
+attempt has a deadline; when an attempt is slower than the backend's
+observed p95 latency a duplicate (hedged) request is sent and the first
+answer wins; failed, invalid or timed-out attempts fail over to the next
+backend. Every call goes through the backend's circuit breaker, so a dead
+model is skipped immediately. Per-backend latency histograms are kept
+across runs for tuning. Callers may pass a response schema; backends then
+request provider-side JSON mode so replies need no free-text cleanup. In
+streaming mode replies are read chunk by chunk and the stream is closed as
+soon as the top-level JSON value is complete, which also lets abandoned
+attempts (deadline passed, hedge lost) stop generating. Static instruction
+prefixes are sent ahead of the per-request text and cached provider-side
+where possible; input and cached token counts are kept per endpoint.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from json_repair import JsonRepairParser, ParseStats
+from throttling import OverloadError, RateLimitError, estimate_tokens
+from resilience import CallCancelled, CircuitOpenError, classify_error, get_breaker, guarded, retry_after
+
+# Constants
+CALL_DEADLINE = 60.0  # seconds per attempt on one backend
+HEDGE_QUANTILE = 0.95
+MIN_HEDGE_SAMPLES = 20  # latencies observed before the quantile is trusted
+DEFAULT_HEDGE_DELAY = 15.0  # seconds, until enough samples exist
+MIN_HEDGE_DELAY = 0.5
+HEDGE_BUDGET = 0.1  # hedged duplicates allowed per request (caps extra load)
+POOL_SIZE = 32  # threads for in-flight, hedged and abandoned calls
+HISTOGRAM_PATH = "cache/backend_latency.json"
+MAX_PERSISTED_SAMPLES = 1000  # loaded histograms are scaled down so new runs adapt
+BUCKET_START = 0.05  # seconds, upper bound of the first bucket
+BUCKET_GROWTH = 1.25
+BUCKET_COUNT = 40  # last bucket ends around 5 minutes
+MIN_CONTEXT_CACHE_TOKENS = 1024  # Gemini rejects explicit context caches smaller than this
+CONTEXT_CACHE_TTL = 3600  # seconds; caches are deleted when the router closes
+CACHE_CONTROL_MODELS = ("anthropic/", "google/")  # OpenRouter models that cache only at cache_control breakpoints
+
+Completion = namedtuple("Completion", ["value", "backend"])
+StreamedReply = namedtuple("StreamedReply", ["text", "first_token", "stopped_early"])
+# A prompt split into a static, cacheable instruction prefix and the per-request text
+Prompt = namedtuple("Prompt", ["prefix", "text"])
+
+
+def split_prompt(prompt: Union[str, Prompt]) -> Tuple[Optional[str], str]:
+    """(prefix, text) of a Prompt; plain strings have no prefix."""
+    if isinstance(prompt, Prompt):
+        return prompt.prefix, prompt.text
+    return None, prompt
+
+
+class BackendError(Exception):
+    """Raised when every backend failed and retrying would not help."""
+
+
+class TokenUsage:
+    """Thread-safe input token counts for one endpoint, split into fresh and cached."""
+
+    def __init__(self):
+        self.replies = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, prompt_tokens: Optional[int], cached_tokens: Optional[int]):
+        with self._lock:
+            self.replies += 1
+            self.prompt_tokens += prompt_tokens or 0
+            self.cached_tokens += cached_tokens or 0
+
+    def summary(self) -> str:
+        share = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        per_reply = self.prompt_tokens / self.replies if self.replies else 0.0
+        return (f"{self.prompt_tokens} input tokens over {self.replies} replies ({per_reply:.0f} per reply), "
+                f"{self.cached_tokens} served from prompt cache ({share:.0%})")
+
+
+_usage: Dict[str, TokenUsage] = {}
+_usage_lock = threading.Lock()
+
+
+def get_usage(name: str) -> TokenUsage:
+    """Process-wide token usage for a backend name (shared by every instance of that model)."""
+    with _usage_lock:
+        if name not in _usage:
+            _usage[name] = TokenUsage()
+        return _usage[name]
+
+
+class Backend:
+    """One model on one provider; subclasses implement generate()."""
+
+    name = "backend"
+
+    def generate(self, prompt: Union[str, Prompt], max_tokens: Optional[int] = None,
+                 schema: Optional[Dict] = None) -> str:
+        """
+        Send a single-turn prompt and return the raw reply text.
+
+        Args:
+            prompt: Prompt text, or a Prompt whose prefix the provider may cache
+            max_tokens: Reply token cap, where the provider supports it
+            schema: Response schema (Gemini Schema dict); when given the
+                backend asks the provider for a bare JSON reply
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: Union[str, Prompt], max_tokens: Optional[int] = None,
+               schema: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Yield the reply text in chunks as it is generated; closing the
+        generator cancels the request. Backends without streaming support
+        yield the whole reply as one chunk.
+        """
+        yield self.generate(prompt, max_tokens, schema)
+
+    def close(self):
+        """Release provider-side resources (context caches)."""
+
+
+class GeminiBackend(Backend):
+    """
+    Gemini model via the google-genai client.
+
+    A Prompt prefix is stored once in an explicit context cache when it is
+    long enough for one; shorter prefixes are sent as the system
+    instruction, ahead of the article, where Gemini's implicit prefix
+    caching can reuse them.
+    """
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+        self.name = model
+        self._caches: Dict[str, Optional[str]] = {}  # prefix -> cached content name (None = inline)
+        self._lock = threading.Lock()
+
+    def _context_cache(self, prefix: str) -> Optional[str]:
+        """Name of the context cache holding prefix, created on first use."""
+        with self._lock:
+            if prefix not in self._caches:
+                self._caches[prefix] = self._create_cache(prefix)
+            return self._caches[prefix]
+
+    def _create_cache(self, prefix: str) -> Optional[str]:
+        if estimate_tokens(prefix) < MIN_CONTEXT_CACHE_TOKENS:
+            return None  # below the explicit-cache minimum
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config={"system_instruction": prefix, "ttl": f"{CONTEXT_CACHE_TTL}s"},
+            )
+            print(f"[OK] {self.name}: instruction prefix stored in context cache {cache.name}")
+            return cache.name
+        except Exception as e:
+            print(f"[WARN] {self.name}: context cache unavailable, sending the prefix inline: {str(e)[:100]}")
+            return None
+
+    def _request(self, prompt: Union[str, Prompt], schema: Optional[Dict]) -> Tuple[str, Optional[Dict]]:
+        """Contents and config for a prompt."""
+        prefix, text = split_prompt(prompt)
+        config = {}
+        if schema:
+            # Structured output: the model is constrained to the schema (enums included)
+            config.update(response_mime_type="application/json", response_schema=schema)
+        if prefix:
+            cache = self._context_cache(prefix)
+            if cache:
+                config["cached_content"] = cache
+            else:
+                config["system_instruction"] = prefix
+        return text, config or None
+
+    def _record_usage(self, metadata):
+        if metadata is not None:
+            get_usage(self.name).record(getattr(metadata, "prompt_token_count", None),
+                                        getattr(metadata, "cached_content_token_count", None))
+
+    def generate(self, prompt: Union[str, Prompt], max_tokens: Optional[int] = None,
+                 schema: Optional[Dict] = None) -> str:
+        contents, config = self._request(prompt, schema)
+        response = self.client.models.generate_content(model=self.model, contents=contents, config=config)
+        self._record_usage(getattr(response, "usage_metadata", None))
+        return response.text
+
+    def stream(self, prompt: Union[str, Prompt], max_tokens: Optional[int] = None,
+               schema: Optional[Dict] = None) -> Iterator[str]:
+        contents, config = self._request(prompt, schema)
+        response = self.client.models.generate_content_stream(model=self.model, contents=contents, config=config)
+        metadata = None
+        try:
+            for chunk in response:
+                metadata = getattr(chunk, "usage_metadata", None) or metadata
+                yield chunk.text or ""
+        finally:
+            close = getattr(response, "close", None)
+            if close:
+                close()
+            self._record_usage(metadata)
+
+    def close(self):
+        with self._lock:
+            names = [name for name in self._caches.values() if name]
+            self._caches.clear()
+        for name in names:
+            try:
+                self.client.caches.delete(name=name)
+            except Exception as e:
+                print(f"[WARN] {self.name}: could not delete context cache {name}: {str(e)[:100]}")
+
+
+class OpenRouterBackend(Backend):
+    """
+    Any OpenRouter model via its OpenAI-compatible client.
+
+    A Prompt prefix is sent as the system message. Models whose providers
+    cache prompts only at explicit breakpoints get a cache_control marker on
+    it; the others cache repeated prefixes automatically (or not at all).
+    """
+
+    def __init__(self, client, model: str, temperature: float = 0.3):
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+        self.name = f"openrouter:{model}"
+
+    def _messages(self, prompt: Union[str, Prompt]) -> List[Dict]:
+        prefix, text = split_prompt(prompt)
+        if not prefix:
+            return [{"role": "user", "content": text}]
+        system = prefix
+        if self.model.startswith(CACHE_CONTROL_MODELS):
+            system = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+        return [{"role": "system", "content": system}, {"role": "user", "content": text}]
+
+    def _create(self, prompt: Union[str, Prompt], max_tokens: Optional[int], schema: Optional[Dict], **options):
+        if max_tokens:
+            options["max_tokens"] = max_tokens
+        if schema:
+            # JSON mode is the portable subset across OpenRouter models; the prompt carries the shape
+            options["response_format"] = {"type": "json_object"}
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt),
+            temperature=self.temperature,
+            **options
+        )
+
+    def generate(self, prompt: Union[str, Prompt], max_tokens: Optional[int] = None,
+                 schema: Optional[Dict] = None) -> str:
+        response = self._create(prompt, max_tokens, schema)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            get_usage(self.name).record(getattr(usage, "prompt_tokens", None),
+                                        getattr(details, "cached_tokens", None) if details else None)
+        return response.choices[0].message.content
+
+    def stream(self, prompt: Union[str, Prompt], max_tokens: Optional[int] = None,
+               schema: Optional[Dict] = None) -> Iterator[str]:
+        # Usage arrives only in the final chunk, which an early-closed stream never reads
+        response = self._create(prompt, max_tokens, schema, stream=True)
+        try:
+            for chunk in response:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            response.close()  # drops the connection, which stops generation (and billing)
+
+
+def _bucket_bounds() -> List[float]:
+    return [BUCKET_START * BUCKET_GROWTH ** i for i in range(BUCKET_COUNT)]
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram with log-spaced buckets.
+
+    Quantiles are reported as bucket upper bounds (within 25% of the true
+    value), which is plenty for choosing hedge delays and deadlines.
+    """
+
+    BOUNDS = _bucket_bounds()
+
+    def __init__(self, counts: Optional[List[int]] = None):
+        self.counts = list(counts) if counts else [0] * (len(self.BOUNDS) + 1)
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float):
+        """Add one observed latency."""
+        idx = next((i for i, bound in enumerate(self.BOUNDS) if seconds <= bound), len(self.BOUNDS))
+        with self._lock:
+            self.counts[idx] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency below which a fraction q of calls completed, or None if empty."""
+        with self._lock:
+            counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for idx, count in enumerate(counts):
+            seen += count
+            if seen >= q * total:
+                return self.BOUNDS[min(idx, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+    def scaled(self, max_samples: int) -> "LatencyHistogram":
+        """Copy with at most max_samples observations, keeping the shape."""
+        total = self.total
+        if total <= max_samples:
+            return LatencyHistogram(self.counts)
+        return LatencyHistogram([count * max_samples // total for count in self.counts])
+
+
+def read_json_stream(chunks: Iterator[str], cancel: Optional[threading.Event] = None,
+                     expect_object: bool = False) -> StreamedReply:
+    """
+    Read a streamed reply until its top-level JSON value closes, then close the stream.
+
+    Args:
+        chunks: Reply text chunks (a Backend.stream generator)
+        cancel: Set by the caller to abandon the call between chunks
+        expect_object: The reply is a single object; arrays before it are prose
+
+    Returns:
+        StreamedReply(text up to the end of the JSON value, seconds to the
+        first non-empty chunk, whether the stream was closed at the value's end)
+
+    Raises:
+        CallCancelled: cancel was set before the reply was complete
+    """
+    start = time.monotonic()
+    parser = JsonRepairParser(expect_object)
+    parts: List[str] = []
+    first_token = None
+    try:
+        for chunk in chunks:
+            if cancel is not None and cancel.is_set():
+                raise CallCancelled("reply stream abandoned")
+            if not chunk:
+                continue
+            if first_token is None:
+                first_token = time.monotonic() - start
+            before = parser.consumed
+            parser.feed(chunk)
+            if parser.complete:
+                parts.append(chunk[:parser.consumed - before])  # drop anything after the closing bracket
+                return StreamedReply("".join(parts), first_token, True)
+            parts.append(chunk)
+        return StreamedReply("".join(parts), first_token, False)
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+
+class StreamStats:
+    """Time-to-first-token histogram and counters for streamed replies."""
+
+    def __init__(self):
+        self.first_token = LatencyHistogram()
+        self.streams = 0
+        self.early_stops = 0
+        self._lock = threading.Lock()
+
+    def record(self, reply: StreamedReply):
+        if reply.first_token is not None:
+            self.first_token.record(reply.first_token)
+        with self._lock:
+            self.streams += 1
+            self.early_stops += reply.stopped_early
+
+    def summary(self) -> str:
+        quantiles = ", ".join(
+            f"{label} {value:.2f}s" for label, value in
+            (("p50", self.first_token.quantile(0.5)), ("p95", self.first_token.quantile(0.95))) if value is not None
+        )
+        return (f"{self.streams} streamed replies, {self.early_stops} closed at the end of the JSON"
+                + (f" | first token {quantiles}" if quantiles else ""))
+
+
+class _BackendStats:
+    """Latency histogram and outcome counters for one (backend, call kind)."""
+
+    COUNTERS = ("requests", "successes", "errors", "invalid", "rate_limited", "timeouts",
+                "short_circuits", "hedges", "hedge_wins", "failovers")
+
+    def __init__(self, histogram: Optional[LatencyHistogram] = None):
+        self.histogram = histogram or LatencyHistogram()
+        self.streaming = StreamStats()
+        self._lock = threading.Lock()
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def to_dict(self) -> Dict:
+        summary = {counter: getattr(self, counter) for counter in self.COUNTERS}
+        summary["samples"] = self.histogram.total
+        for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            summary[label] = self.histogram.quantile(q)
+        summary["streams"] = self.streaming.streams
+        summary["early_stops"] = self.streaming.early_stops
+        summary["ttft_p50"] = self.streaming.first_token.quantile(0.5)
+        summary["ttft_p95"] = self.streaming.first_token.quantile(0.95)
+        return summary
+
+
+class BackendRouter:
+    """
+    Deadline, hedging and failover policy over an ordered list of backends.
+
+    Args:
+        backends: Backends in failover order (the first is the primary)
+        deadline: Seconds allowed per attempt on one backend
+        hedge_quantile: Latency quantile after which a duplicate request is sent
+        histogram_path: JSON file the latency histograms are loaded from / saved to
+        streaming: Stream replies and stop reading once the JSON value is complete
+    """
+
+    def __init__(self, backends: Sequence[Backend], deadline: float = CALL_DEADLINE,
+                 hedge_quantile: float = HEDGE_QUANTILE, histogram_path: Optional[str] = HISTOGRAM_PATH,
+                 streaming: bool = False):
+        if not backends:
+            raise ValueError("BackendRouter needs at least one backend")
+        self.backends = list(backends)
+        self.deadline = deadline
+        self.hedge_quantile = hedge_quantile
+        self.histogram_path = histogram_path
+        self.streaming = streaming
+        self._stats: Dict[Tuple[str, str], _BackendStats] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hedges = 0
+        self.parse_stats = ParseStats()  # filled by callers' parse functions
+        self._executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="llm-backend")
+        self._load_histograms()
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    @property
+    def available(self) -> bool:
+        """False while every backend's circuit breaker is open."""
+        return any(get_breaker(backend.name).state != "open" for backend in self.backends)
+
+    def stats(self, backend: Backend, kind: str = "single") -> _BackendStats:
+        """Counters and latency histogram for a backend and call kind."""
+        key = (backend.name, kind)
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = _BackendStats()
+            return self._stats[key]
+
+    def hedge_delay(self, backend: Backend, kind: str = "single") -> float:
+        """Seconds to wait before sending a hedged duplicate request."""
+        histogram = self.stats(backend, kind).histogram
+        if histogram.total < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return max(MIN_HEDGE_DELAY, histogram.quantile(self.hedge_quantile))
+
+    def _take_hedge(self) -> bool:
+        """Reserve a hedge if the run is within its hedge budget."""
+        with self._lock:
+            if self._hedges >= HEDGE_BUDGET * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def complete(self, prompt: Union[str, Prompt], parse: Optional[Callable[[str], object]] = None,
+                 max_tokens: Optional[int] = None, kind: str = "single",
+                 deadline: Optional[float] = None, schema: Optional[Dict] = None) -> Completion:
+        """
+        Get a (parsed) completion, failing over through the backends.
+
+        Args:
+            prompt: Single-turn prompt, or a Prompt with a cacheable prefix
+            parse: Converts reply text to a result; raising marks the reply
+                invalid and moves on to the next backend
+            max_tokens: Reply token cap, where the provider supports it
+            kind: Latency class ("single", "batch", ...); each kind has its
+                own histogram so batch calls do not skew hedge delays
+            deadline: Seconds per attempt (default: the router deadline)
+            schema: Response schema passed to every backend (JSON mode)
+
+        Returns:
+            Completion(value, backend name)
+
+        Raises:
+            RateLimitError: Every backend rejected the request with a 429
+            OverloadError: Every backend failed transiently (worth retrying later)
+            BackendError: A backend replied invalidly or fatally, or every
+                backend's circuit breaker is open
+        """
+        with self._lock:
+            self._requests += 1
+        errors = []
+
+        for position, backend in enumerate(self.backends):
+            stats = self.stats(backend, kind)
+            if position:
+                stats.count("failovers")
+            try:
+                value = self._attempt(backend, stats, prompt, parse, max_tokens, kind,
+                                      deadline or self.deadline, schema)
+                return Completion(value, backend.name)
+            except Exception as e:
+                errors.append((backend, e))
+        raise self._final_error(errors)
+
+    @staticmethod
+    def _final_error(errors) -> Exception:
+        """Summarize per-backend failures as one error the caller can classify."""
+        summary = "; ".join(f"{backend.name}: {str(e)[:80] or type(e).__name__}" for backend, e in errors)
+        kinds = {classify_error(e) for _, e in errors}
+        if kinds == {"rate_limit"}:
+            error = RateLimitError("all backends rate limited: " + summary)
+        elif kinds <= {"rate_limit", "unavailable", "network", "circuit_open"} and kinds != {"circuit_open"}:
+            error = OverloadError("all backends unavailable: " + summary)
+        else:
+            return BackendError("all backends failed: " + summary)
+        requested = [retry_after(e) for _, e in errors]
+        error.retry_after = max((value for value in requested if value is not None), default=None)
+        return error
+
+    def _attempt(self, backend: Backend, stats: _BackendStats, prompt: Union[str, Prompt],
+                 parse: Optional[Callable[[str], object]], max_tokens: Optional[int],
+                 kind: str, deadline: float, schema: Optional[Dict] = None):
+        """One backend attempt with an optional hedged duplicate, bounded by the deadline."""
+        cancel = threading.Event()  # stops streamed calls that are no longer needed
+        expect_object = bool(schema) and schema.get("type") == "OBJECT"
+
+        def call():
+            start = time.monotonic()
+            try:
+                if self.streaming:
+                    reply = guarded(backend.name, read_json_stream, backend.stream(prompt, max_tokens, schema), cancel,
+                                    expect_object=expect_object)
+                    stats.streaming.record(reply)
+                    text = reply.text
+                else:
+                    text = guarded(backend.name, backend.generate, prompt, max_tokens, schema)
+            except CircuitOpenError:
+                stats.count("short_circuits")
+                raise
+            except CallCancelled:
+                raise
+            except Exception as e:
+                stats.count("rate_limited" if classify_error(e) == "rate_limit" else "errors")
+                raise
+            # Late answers still count: they are the tail the hedge delay is tuned on
+            stats.histogram.record(time.monotonic() - start)
+            try:
+                return parse(text) if parse else text
+            except Exception:
+                stats.count("invalid")
+                raise
+
+        stats.count("requests")
+        start = time.monotonic()
+        end = start + deadline
+        hedge_at = start + self.hedge_delay(backend, kind)
+        primary = self._executor.submit(call)
+        pending = {primary}
+        hedged = False
+        error: Optional[BaseException] = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= end:
+                break
+            waiting_for_hedge = not hedged and hedge_at < end
+            timeout = (hedge_at if waiting_for_hedge else end) - now
+            done, pending = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    value = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                stats.count("successes")
+                if future is not primary:
+                    stats.count("hedge_wins")
+                cancel.set()  # the losing duplicate, if any, stops streaming
+                return value
+            # Hedge only while the primary is still running and the budget allows it
+            if waiting_for_hedge and time.monotonic() >= hedge_at and pending:
+                hedged = True
+                if self._take_hedge():
+                    stats.count("hedges")
+                    pending.add(self._executor.submit(call))
+
+        if pending:
+            # Abandoned calls finish in the background; their answers are discarded.
+            # A hung backend must still trip its breaker, so the timeout counts as a failure.
+            stats.count("timeouts")
+            cancel.set()
+            timeout = TimeoutError(f"no reply within {deadline:.0f}s")
+            get_breaker(backend.name).record_failure(timeout)
+            raise timeout
+        raise error
+
+    def latency_report(self) -> Dict[str, Dict]:
+        """Per-backend counters and latency quantiles, keyed "name [kind]"."""
+        with self._lock:
+            items = sorted(self._stats.items())
+        return {f"{name} [{kind}]": stats.to_dict() for (name, kind), stats in items if stats.requests}
+
+    def print_report(self):
+        """Print a compact latency / outcome line per backend."""
+        for key, summary in self.latency_report().items():
+            quantiles = ", ".join(
+                f"{label} {summary[label]:.2f}s" for label in ("p50", "p95", "p99") if summary[label] is not None
+            )
+            print(f"   Backend {key}: {summary['successes']}/{summary['requests']} ok, "
+                  f"{summary['errors'] + summary['invalid'] + summary['rate_limited']} errors, "
+                  f"{summary['timeouts']} timeouts, {summary['short_circuits']} short-circuited, "
+                  f"{summary['hedges']} hedges "
+                  f"({summary['hedge_wins']} won), {summary['failovers']} failovers | {quantiles}"
+                  + (f" | first token p50 {summary['ttft_p50']:.2f}s, p95 {summary['ttft_p95']:.2f}s, "
+                     f"{summary['early_stops']}/{summary['streams']} streams closed at the end of the JSON"
+                     if summary['ttft_p50'] is not None else ""))
+        for backend in self.backends:
+            usage = get_usage(backend.name)
+            if usage.replies:
+                print(f"   Tokens {backend.name}: {usage.summary()}")
+        if self.parse_stats.total:
+            print(f"   Reply parsing: {self.parse_stats.summary()}")
+
+    def _load_histograms(self):
+        if not self.histogram_path:
+            return
+        try:
+            with open(self.histogram_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Backend latency history unreadable: {str(e)[:100]}")
+            return
+        for key, counts in stored.items():
+            name, _, kind = key.partition("|")
+            if len(counts) == len(LatencyHistogram.BOUNDS) + 1:
+                self._stats[(name, kind)] = _BackendStats(LatencyHistogram(counts).scaled(MAX_PERSISTED_SAMPLES))
+
+    def save(self):
+        """Persist the latency histograms so the next run hedges from the first call."""
+        if not self.histogram_path:
+            return
+        with self._lock:
+            stored = {f"{name}|{kind}": stats.histogram.counts for (name, kind), stats in self._stats.items()}
+        try:
+            if os.path.dirname(self.histogram_path):
+                os.makedirs(os.path.dirname(self.histogram_path), exist_ok=True)
+            tmp_path = self.histogram_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.histogram_path)
+        except OSError as e:
+            print(f"[WARN] Could not save backend latency history: {str(e)[:100]}")
+
+    def close(self):
+        """Save histograms, drop context caches and release the pool without waiting for abandoned calls."""
+        self.save()
+        for backend in self.backends:
+            backend.close()
+        self._executor.shutdown(wait=False)
@@ -1,8 +1,18 @@
 import os
 import json
-from typing import Dict, List, Optional
+import time
+import httpx
+from typing import Callable, Dict, List, Optional, Iterable, Iterator, Tuple
 from dotenv import load_dotenv
 from openai import OpenAI
+from throttling import AdaptiveBackoff, AIMDLimiter, OverloadError, ordered_map
+from resilience import as_overload_error, get_breaker, guarded, is_retryable
+from json_repair import parse_json
+from llm_backends import OpenRouterBackend, Prompt, StreamStats, get_usage, read_json_stream
+from result_cache import ResultCache, make_cache_key
+from content_reducer import article_content
+from models import UNSAMPLED, is_result
+from validation_policy import ValidationPolicy
 
 # Load environment variables
 load_dotenv()
@@ -12,6 +22,80 @@ OPENROUTER_API_KEY = os.getenv("OPEN_ROUTER_API")
 # Constants
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 MODEL_NAME = "mistralai/mistral-7b-instruct"
+POOL_SIZE = 32  # keep-alive connections shared by all validation workers
+MAX_IN_FLIGHT = 32  # upper bound for the adaptive concurrency limit
+INITIAL_IN_FLIGHT = 4
+LATENCY_TARGET = 15.0  # seconds; slower responses count as congestion
+MAX_OVERLOAD_RETRIES = 4
+PROMPT_VERSION = "2"  # bump whenever the validation prompt changes
+CACHE_PATH = "cache/validation_cache.db"
+CACHE_TTL = 7 * 24 * 3600  # seconds
+CACHE_MAX_ENTRIES = 50000
+MAX_BATCH_SIZE = 8  # analyses validated per batched request
+BATCH_ITEM_MAX_TOKENS = 250  # reply budget per batched item
+REQUIRED_FIELDS = ["is_valid", "justification", "suggested_corrections"]
+ENDPOINT = f"openrouter:{MODEL_NAME}"  # circuit breaker name (shared with a router backend of this model)
+
+# Prompt templates, built once. The instruction blocks are identical for every
+# request and go first (as the system message) so providers can cache them;
+# only the item part is formatted per request.
+VALIDATION_INSTRUCTIONS = """You are a fact-checking validator. Review the news article analysis given below and determine if it's accurate.
+
+Your task:
+1. Check if the gist accurately summarizes the article
+2. Verify if the sentiment (positive/negative/neutral) matches the article's content
+3. Confirm if the tone classification is appropriate
+4. Identify any errors or misinterpretations
+
+Respond ONLY with valid JSON in this exact format:
+{
+    "is_valid": true or false,
+    "justification": "Brief explanation of why the analysis is correct or incorrect",
+    "suggested_corrections": ["List any specific corrections needed, empty list if none"]
+}
+
+Rules:
+- is_valid: true if analysis is mostly accurate, false if there are significant errors
+- justification: 1-2 sentences explaining your assessment
+- suggested_corrections: specific issues found, or empty list if analysis is correct"""
+VALIDATION_TEMPLATE = """Original Article:
+Title: {title}
+Content: {content}
+
+Analysis to Validate:
+- Gist: {gist}
+- Sentiment: {sentiment}
+- Tone: {tone}"""
+BATCH_INSTRUCTIONS = """You are a fact-checking validator. Review each of the news article analyses given below and determine if it's accurate.
+
+Your task, for every item independently:
+1. Check if the gist accurately summarizes the article
+2. Verify if the sentiment (positive/negative/neutral) matches the article's content
+3. Confirm if the tone classification is appropriate
+4. Identify any errors or misinterpretations
+
+Respond ONLY with a JSON array containing exactly one object per item, in this format:
+[
+    {
+        "index": <item number from its heading>,
+        "is_valid": true or false,
+        "justification": "Brief explanation of why the analysis is correct or incorrect",
+        "suggested_corrections": ["List any specific corrections needed, empty list if none"]
+    }
+]
+
+Rules:
+- is_valid: true if analysis is mostly accurate, false if there are significant errors
+- justification: 1-2 sentences explaining your assessment
+- suggested_corrections: specific issues found, or empty list if analysis is correct"""
+BATCH_TEMPLATE = "{count} items:\n\n{items}"
+BATCH_ITEM_TEMPLATE = """### Item {index}
+Title: {title}
+Content: {content}
+Analysis to Validate:
+- Gist: {gist}
+- Sentiment: {sentiment}
+- Tone: {tone}"""
 
 
 def init_mistral() -> Optional[OpenAI]:
@@ -26,9 +110,14 @@ def init_mistral() -> Optional[OpenAI]:
         return None
     
     try:
+        # One pooled HTTP client so concurrent workers reuse connections
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+        )
         client = OpenAI(
             base_url=OPENROUTER_BASE_URL,
             api_key=OPENROUTER_API_KEY,
+            http_client=http_client,
         )
         print("[OK] Mistral: Client initialized (via OpenRouter)")
         return client
@@ -37,7 +126,30 @@ def init_mistral() -> Optional[OpenAI]:
         return None
 
 
-def validate_analysis(article: Dict, analysis: Dict, client: OpenAI) -> Optional[Dict]:
+def _complete(client: OpenAI, prompt: Prompt, max_tokens: int, stream_stats: Optional[StreamStats] = None,
+              expect_object: bool = False) -> str:
+    """
+    One Mistral completion through the endpoint's circuit breaker.
+    
+    With stream_stats the reply is streamed and the stream closed as soon as
+    the JSON value is complete, so a chatty model is not read (or billed)
+    past its answer; time to first token is recorded in stream_stats.
+    expect_object marks single-verdict replies, so an array in leading
+    prose is not mistaken for the answer.
+    
+    Returns:
+        Reply text
+    """
+    backend = OpenRouterBackend(client, MODEL_NAME)
+    if stream_stats is None:
+        return guarded(ENDPOINT, backend.generate, prompt, max_tokens)
+    reply = guarded(ENDPOINT, read_json_stream, backend.stream(prompt, max_tokens), expect_object=expect_object)
+    stream_stats.record(reply)
+    return reply.text
+
+
+def validate_analysis(article: Dict, analysis: Dict, client: OpenAI, raise_on_overload: bool = False,
+                      stream_stats: Optional[StreamStats] = None) -> Optional[Dict]:
     """
     Validate analysis using Mistral via OpenRouter.
     
@@ -45,12 +157,14 @@ def validate_analysis(article: Dict, analysis: Dict, client: OpenAI) -> Optional
         article: Original article dictionary
         analysis: Analysis from Agent 2
         client: Initialized OpenRouter client
+        raise_on_overload: Raise OverloadError on transient failures (429/5xx/network) instead of returning None
+        stream_stats: Stream the reply, recording time to first token here
         
     Returns:
         Validation dictionary or None on failure
     """
     title = article.get("title", "No title")
-    content = article.get("content", "")[:2000]  # Truncate for validation
+    content = article_content(article)
     
     # Skip if analysis failed
     if analysis == "failed" or isinstance(analysis, str):
@@ -61,82 +175,253 @@ def validate_analysis(article: Dict, analysis: Dict, client: OpenAI) -> Optional
             "suggested_corrections": []
         }
     
-    gist = analysis.get("gist", "")
-    sentiment = analysis.get("sentiment", "")
-    tone = analysis.get("tone", "")
-    
-    prompt = f"""You are a fact-checking validator. Review the following news article analysis and determine if it's accurate.
-
-Original Article:
-Title: {title}
-Content: {content}
-
-Analysis to Validate:
-- Gist: {gist}
-- Sentiment: {sentiment}
-- Tone: {tone}
-
-Your task:
-1. Check if the gist accurately summarizes the article
-2. Verify if the sentiment (positive/negative/neutral) matches the article's content
-3. Confirm if the tone classification is appropriate
-4. Identify any errors or misinterpretations
-
-Respond ONLY with valid JSON in this exact format:
-{{
-    "is_valid": true or false,
-    "justification": "Brief explanation of why the analysis is correct or incorrect",
-    "suggested_corrections": ["List any specific corrections needed, empty list if none"]
-}}
-
-Rules:
-- is_valid: true if analysis is mostly accurate, false if there are significant errors
-- justification: 1-2 sentences explaining your assessment
-- suggested_corrections: specific issues found, or empty list if analysis is correct"""
+    prompt = Prompt(VALIDATION_INSTRUCTIONS, VALIDATION_TEMPLATE.format(
+        title=title, content=content, gist=analysis.get("gist", ""),
+        sentiment=analysis.get("sentiment", ""), tone=analysis.get("tone", ""),
+    ))
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
-        
-        response_text = response.choices[0].message.content.strip()
+        response_text = _complete(client, prompt, 500, stream_stats, expect_object=True)
         
-        # Clean up response - remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-        
-        # Parse JSON
-        validation = json.loads(response_text)
+        # Parse JSON (tolerating code fences, trailing prose and truncation)
+        validation = parse_json(response_text, expect_object=True)
+        if not isinstance(validation, dict):
+            raise ValueError(f"reply is {type(validation).__name__}, expected an object")
         
         # Add validation symbol
         validation["validation_symbol"] = "[VALID]" if validation.get("is_valid", False) else "[INVALID]"
         
         # Validate required fields
-        required_fields = ["is_valid", "justification", "suggested_corrections"]
-        if not all(field in validation for field in required_fields):
+        if not all(field in validation for field in REQUIRED_FIELDS):
             print(f"[WARN] Incomplete validation for: {title[:50]}")
             return None
         
         return validation
         
     except Exception as e:
+        if raise_on_overload and is_retryable(e):
+            raise as_overload_error(e) from e
         print(f"[ERROR] Validation failed for '{title[:50]}': {str(e)[:100]}")
         return None
 
 
-def validate_all_analyses(articles: List[Dict]) -> List[Dict]:
+def validate_batch(articles: List[Dict], client: OpenAI, raise_on_overload: bool = False,
+                   stream_stats: Optional[StreamStats] = None) -> List[Optional[Dict]]:
+    """
+    Validate several (article, analysis) pairs in one chat completion.
+    
+    The instruction block is sent once; Mistral returns a JSON array with
+    one verdict per pair keyed by its index. Missing or malformed verdicts
+    come back as None so the caller can retry only those individually.
+    
+    Args:
+        articles: Articles whose "analysis" is a successful analysis dict
+        client: Initialized OpenRouter client
+        raise_on_overload: Raise OverloadError on transient failures instead of failing the batch
+        stream_stats: Stream the reply, recording time to first token here
+        
+    Returns:
+        One validation (or None) per input article, in input order
+    """
+    items_block = "\n\n".join(
+        BATCH_ITEM_TEMPLATE.format(
+            index=idx, title=article.get("title", "No title"), content=article_content(article),
+            gist=article["analysis"].get("gist", ""), sentiment=article["analysis"].get("sentiment", ""),
+            tone=article["analysis"].get("tone", ""),
+        )
+        for idx, article in enumerate(articles)
+    )
+    prompt = Prompt(BATCH_INSTRUCTIONS, BATCH_TEMPLATE.format(count=len(articles), items=items_block))
+
+    results: List[Optional[Dict]] = [None] * len(articles)
+    
+    try:
+        items = parse_json(_complete(client, prompt, BATCH_ITEM_MAX_TOKENS * len(articles), stream_stats))
+    except Exception as e:
+        if raise_on_overload and is_retryable(e):
+            raise as_overload_error(e) from e
+        print(f"[WARN] Batch validation of {len(articles)} items failed: {str(e)[:100]}")
+        return results
+    
+    if not isinstance(items, list):
+        print(f"[WARN] Batch validation returned {type(items).__name__}, expected a list")
+        return results
+    
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.pop("index"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < len(articles) and all(field in item for field in REQUIRED_FIELDS):
+            item["validation_symbol"] = "[VALID]" if item.get("is_valid", False) else "[INVALID]"
+            results[idx] = item
+    
+    return results
+
+
+def validation_cache_key(article: Dict, analysis: Dict) -> str:
+    """Cache key over the validator model, the article text and the analysis under review."""
+    content_hash = make_cache_key(article.get("title", "No title"),
+                                  article_content(article))
+    analysis_hash = make_cache_key(analysis.get("gist", ""), analysis.get("sentiment", ""),
+                                   analysis.get("tone", ""))
+    return make_cache_key(MODEL_NAME, PROMPT_VERSION, content_hash, analysis_hash)
+
+
+def open_validation_cache() -> Optional[ResultCache]:
+    """Open the persistent validation cache, or None if it is unavailable."""
+    try:
+        return ResultCache(CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+    except Exception as e:
+        print(f"[WARN] Validation cache disabled: {str(e)[:100]}")
+        return None
+
+
+class _ValidationWorker:
+    """Per-article Mistral call under an adaptive (AIMD) concurrency limit."""
+    
+    def __init__(self, client: OpenAI, cache: Optional[ResultCache] = None, stream_replies: bool = False):
+        self.client = client
+        self.stream_stats = StreamStats() if stream_replies else None
+        self.limiter = AIMDLimiter(
+            initial=INITIAL_IN_FLIGHT, maximum=MAX_IN_FLIGHT, latency_target=LATENCY_TARGET
+        )
+        self.backoff = AdaptiveBackoff()
+        self.cache = cache
+    
+    def __call__(self, article: Dict) -> Optional[Dict]:
+        analysis = article.get("analysis")
+        
+        # Failed analyses are skipped locally, so there is nothing to cache
+        if self.cache and is_result(analysis):
+            cached = self.cache.get(validation_cache_key(article, analysis))
+            if cached is not None:
+                return cached
+        return self._validate_uncached(article)
+    
+    def _validate_uncached(self, article: Dict) -> Optional[Dict]:
+        """Single-article Mistral call with AIMD gating and overload retries."""
+        title = article.get("title", "No title")
+        analysis = article.get("analysis")
+        
+        for attempt in range(MAX_OVERLOAD_RETRIES + 1):
+            # Fail fast instead of sitting out the shared backoff for a tripped endpoint
+            if is_result(analysis) and get_breaker(ENDPOINT).state == "open":
+                print(f"[ERROR] Validation failed for '{title[:50]}': {ENDPOINT} circuit open")
+                return None
+            self.backoff.wait()
+            self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                validation = validate_analysis(article, analysis, self.client, raise_on_overload=True,
+                                               stream_stats=self.stream_stats)
+            except OverloadError as e:
+                self.limiter.release(time.monotonic() - start, overloaded=True)
+                self.backoff.record_rate_limit(e.retry_after)
+                print(f"[WARN] OpenRouter overloaded (attempt {attempt + 1}, limit {self.limiter.limit}): {title[:50]}")
+                continue
+            self.limiter.release(time.monotonic() - start)
+            self.backoff.record_success()
+            if self.cache and validation and is_result(analysis):
+                self.cache.put(validation_cache_key(article, analysis), validation)
+            return validation
+        
+        print(f"[ERROR] Validation failed for '{title[:50]}': overload retries exhausted")
+        return None
+    
+    def validate_batch(self, articles: List[Dict]) -> List[Optional[Dict]]:
+        """Validate a batch in one request, falling back to single calls for failed items."""
+        results: List[Optional[Dict]] = [None] * len(articles)
+        pending: List[Tuple[int, Dict]] = []
+        
+        for idx, article in enumerate(articles):
+            analysis = article.get("analysis")
+            if not is_result(analysis):
+                # Failed analysis: validate_analysis returns the local [SKIPPED] verdict
+                results[idx] = validate_analysis(article, analysis, self.client)
+                continue
+            cached = self.cache.get(validation_cache_key(article, analysis)) if self.cache else None
+            if cached is not None:
+                results[idx] = cached
+            else:
+                pending.append((idx, article))
+        
+        if len(pending) > 1:
+            batch = [article for _, article in pending]
+            batch_results = [None] * len(batch)
+            for attempt in range(MAX_OVERLOAD_RETRIES + 1):
+                if get_breaker(ENDPOINT).state == "open":
+                    break  # leftovers fail fast on the single-article path
+                self.backoff.wait()
+                self.limiter.acquire()
+                start = time.monotonic()
+                try:
+                    batch_results = validate_batch(batch, self.client, raise_on_overload=True,
+                                                   stream_stats=self.stream_stats)
+                except OverloadError as e:
+                    self.limiter.release(time.monotonic() - start, overloaded=True)
+                    self.backoff.record_rate_limit(e.retry_after)
+                    print(f"[WARN] OpenRouter overloaded on batch (attempt {attempt + 1}, limit {self.limiter.limit})")
+                    continue
+                # Judge congestion by per-item latency so larger batches are not penalized
+                self.limiter.release((time.monotonic() - start) / len(batch))
+                self.backoff.record_success()
+                break
+            
+            for (idx, article), validation in zip(pending, batch_results):
+                if validation is not None:
+                    results[idx] = validation
+                    if self.cache:
+                        self.cache.put(validation_cache_key(article, article["analysis"]), validation)
+            pending = [(idx, article) for idx, article in pending if results[idx] is None]
+            if pending:
+                print(f"[WARN] {len(pending)}/{len(batch)} batch items need a single-article retry")
+        
+        # Single-article path for leftovers (and batches of one)
+        for idx, article in pending:
+            results[idx] = self._validate_uncached(article)
+        
+        return results
+
+
+def _record_validation(article: Dict, validation: Optional[Dict], weight: float = 1.0) -> bool:
+    """Attach a validation result (or skip marker) and its sampling weight to the article."""
+    if validation:
+        article["validation"] = validation
+        if weight != 1.0:
+            article["validation"]["sampling_weight"] = weight
+        symbol = validation["validation_symbol"]
+        print(f"   {symbol} Valid: {validation['is_valid']} | {validation['justification'][:60]}")
+        return True
+    
+    article["validation"] = "skipped"
+    article["validation_error"] = "validation_failed"
+    print(f"   [WARN] Validation failed")
+    return False
+
+
+def validate_all_analyses(articles: List[Dict], max_in_flight: int = MAX_IN_FLIGHT,
+                          use_cache: bool = True, batched: bool = False,
+                          on_result: Optional[Callable[[Dict], None]] = None,
+                          sample_rate: float = 1.0, stream_replies: bool = False) -> List[Dict]:
     """
     Validate all analyses using Mistral.
     Continues even if some validations fail.
     
+    Requests run concurrently; the number actually in flight adapts to
+    observed 429/5xx responses and latency. Results keep input order.
+    
     Args:
         articles: List of articles with analysis
+        max_in_flight: Worker pool size (ceiling for the adaptive limit)
+        use_cache: Reuse validations from the persistent cache
+        batched: Validate several analyses per OpenRouter request
+        on_result: Called with each article as soon as its validation is attached
+        sample_rate: Base validation sampling rate; below 1.0 the validation
+            policy picks which analyses are validated (see validation_policy)
+        stream_replies: Stream replies, closing each stream once its JSON is complete
         
     Returns:
         List of articles with validation added
@@ -157,35 +442,127 @@ def validate_all_analyses(articles: List[Dict]) -> List[Dict]:
     success_count = 0
     fail_count = 0
     
-    for idx, article in enumerate(articles, 1):
-        print(f"\n[{idx}/{len(articles)}] Validating: {article['title'][:60]}...")
-        
-        analysis = article.get("analysis")
-        validation = validate_analysis(article, analysis, client)
-        
-        if validation:
-            article["validation"] = validation
-            validated_articles.append(article)
-            success_count += 1
-            symbol = validation["validation_symbol"]
-            print(f"   {symbol} Valid: {validation['is_valid']} | {validation['justification'][:60]}")
+    # The policy decides up front which analyses go to Mistral
+    policy = ValidationPolicy.create(sample_rate)
+    weights = [policy.select(article) for article in articles]
+    sampled = [article for article, weight in zip(articles, weights) if weight is not None]
+    if len(sampled) < len(articles):
+        print(f"Sampled {len(sampled)}/{len(articles)} analyses for validation")
+    
+    cache = open_validation_cache() if use_cache else None
+    worker = _ValidationWorker(client, cache=cache, stream_replies=stream_replies)
+    if batched:
+        batches = [sampled[i:i + MAX_BATCH_SIZE] for i in range(0, len(sampled), MAX_BATCH_SIZE)]
+        print(f"Packed {len(sampled)} analyses into {len(batches)} batched requests")
+        results = (
+            validation
+            for batch_results in ordered_map(worker.validate_batch, batches, max_in_flight)
+            for validation in batch_results
+        )
+    else:
+        results = ordered_map(worker, sampled, max_in_flight)
+    
+    for idx, (article, weight) in enumerate(zip(articles, weights), 1):
+        if weight is None:
+            article["validation"] = UNSAMPLED
         else:
-            article["validation"] = "skipped"
-            article["validation_error"] = "validation_failed"
-            validated_articles.append(article)
-            fail_count += 1
-            print(f"   [WARN] Validation failed")
+            validation = next(results)
+            print(f"\n[{idx}/{len(articles)}] Validated: {article['title'][:60]}...")
+            
+            if _record_validation(article, validation, weight):
+                success_count += 1
+                policy.record(article)
+            else:
+                fail_count += 1
+        validated_articles.append(article)
+        if on_result:
+            on_result(article)
     
     # Summary
     print("\n" + "-"*60)
-    print(f"[OK] SUCCESS: Validated {success_count}/{len(articles)} articles")
+    print(f"[OK] SUCCESS: Validated {success_count}/{len(sampled)} articles"
+          + (f" ({len(articles) - len(sampled)} not sampled)" if len(sampled) < len(articles) else ""))
     if fail_count > 0:
         print(f"[WARN] WARNING: {fail_count} articles failed validation")
+    policy.close()
+    if worker.stream_stats:
+        print(f"   Streaming: {worker.stream_stats.summary()}")
+    if get_usage(ENDPOINT).replies:
+        print(f"   Tokens: {get_usage(ENDPOINT).summary()}")
+    if cache:
+        print(f"   Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
     print("="*60 + "\n")
     
     return validated_articles
 
 
+def validate_stream(articles: Iterable[Dict], max_in_flight: int = MAX_IN_FLIGHT,
+                    use_cache: bool = True, sample_rate: float = 1.0,
+                    stream_replies: bool = False) -> Iterator[Dict]:
+    """
+    Validate analyses as they arrive.
+    Streaming counterpart of validate_all_analyses; output order matches
+    input order.
+    
+    Args:
+        articles: Iterable of articles with analysis (may be unbounded)
+        max_in_flight: Worker pool size (ceiling for the adaptive limit)
+        use_cache: Reuse validations from the persistent cache
+        sample_rate: Base validation sampling rate (see validate_all_analyses)
+        stream_replies: Stream replies, closing each stream once its JSON is complete
+        
+    Yields:
+        Each article with validation added
+    """
+    client = init_mistral()
+    if not client:
+        print("[ERROR] Could not initialize Mistral, skipping validation for streamed articles")
+        for article in articles:
+            article["validation"] = "skipped"
+            article["validation_error"] = "mistral_init_failed"
+            yield article
+        return
+    
+    success_count = 0
+    fail_count = 0
+    unsampled_count = 0
+    policy = ValidationPolicy.create(sample_rate)
+    cache = open_validation_cache() if use_cache else None
+    worker = _ValidationWorker(client, cache=cache, stream_replies=stream_replies)
+    
+    def validate_pair(item):
+        article, weight = item
+        return article, weight, (worker(article) if weight is not None else None)
+    
+    # Sampling is decided on the submitting side, so only selected articles reach a worker
+    selected = ((article, policy.select(article)) for article in articles)
+    for idx, (article, weight, validation) in enumerate(ordered_map(validate_pair, selected, max_in_flight), 1):
+        if weight is None:
+            article["validation"] = UNSAMPLED
+            unsampled_count += 1
+            yield article
+            continue
+        print(f"\n[{idx}] Validated: {article['title'][:60]}...")
+        
+        if _record_validation(article, validation, weight):
+            success_count += 1
+            policy.record(article)
+        else:
+            fail_count += 1
+        yield article
+    
+    print(f"\n[OK] Mistral stream: {success_count} validated, {fail_count} failed, {unsampled_count} not sampled")
+    policy.close()
+    if worker.stream_stats:
+        print(f"   Streaming: {worker.stream_stats.summary()}")
+    if get_usage(ENDPOINT).replies:
+        print(f"   Tokens: {get_usage(ENDPOINT).summary()}")
+    if cache:
+        print(f"   Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+
+
 if __name__ == "__main__":
     # Test the validator with a sample article and analysis
     sample_article = {
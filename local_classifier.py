@@ -0,0 +1,228 @@
+"""
+Local Classifier
+CPU-only fast path in front of Gemini. A multinomial naive Bayes model,
+trained on accumulated analysis reports, predicts sentiment and tone with
+a confidence score; confident articles get a local analysis (extractive
+gist, capitalized-phrase entities) and skip the LLM call entirely.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from content_reducer import STOPWORDS, reduce_content, terms
+from jsonl_io import iter_jsonl
+from models import is_result
+
+# Constants
+MODEL_PATH = "cache/local_classifier.json"
+CONFIDENCE_THRESHOLD = 0.9  # minimum of sentiment and tone confidence for the fast path
+MIN_TRAINING_EXAMPLES = 200
+MIN_TERM_COUNT = 2  # vocabulary terms must occur in at least this many training articles
+EVIDENCE_CAP = 40  # tokens of evidence before likelihoods are tempered (NB is overconfident)
+CONTENT_TOKEN_BUDGET = 1000  # same text budget as the Gemini prompt
+GIST_TOKEN_BUDGET = 60
+MAX_ENTITIES = 5
+LOCAL_LABEL = "local"  # "analyzed_by" marker on fast-path analyses
+
+_ENTITY_RE = re.compile(r"\b[A-Z][\w'-]*(?:\s+(?:of\s+)?[A-Z][\w'-]*)*")
+
+
+def _features(article: Dict) -> List[str]:
+    title = article.get("title", "")
+    return terms(title) + terms(reduce_content(article.get("content", ""), CONTENT_TOKEN_BUDGET, title))
+
+
+def extract_entities(text: str, limit: int = MAX_ENTITIES) -> List[str]:
+    """Most frequent capitalized phrases (people, parties, places) in the text."""
+    counts = Counter()
+    first_seen: Dict[str, int] = {}
+    for match in _ENTITY_RE.finditer(text):
+        words = match.group(0).split()
+        while words and words[0].lower() in STOPWORDS:
+            words.pop(0)  # sentence-initial "The", "He", ...
+        if not words:
+            continue
+        phrase = " ".join(words)
+        counts[phrase] += 1
+        first_seen.setdefault(phrase, match.start())
+    ranked = sorted(counts, key=lambda phrase: (-counts[phrase], first_seen[phrase]))
+    return ranked[:limit]
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes over bag-of-words features."""
+
+    def __init__(self, priors: Dict[str, float], likelihoods: Dict[str, Dict[str, float]],
+                 unseen: Dict[str, float]):
+        self.priors = priors
+        self.likelihoods = likelihoods
+        self.unseen = unseen
+
+    @classmethod
+    def train(cls, documents: List[List[str]], labels: List[str], vocabulary: set) -> "NaiveBayes":
+        """Fit log priors and Laplace-smoothed log likelihoods."""
+        class_counts = Counter(labels)
+        term_counts: Dict[str, Counter] = {label: Counter() for label in class_counts}
+        for words, label in zip(documents, labels):
+            term_counts[label].update(word for word in words if word in vocabulary)
+
+        total = len(labels)
+        priors = {label: math.log(count / total) for label, count in class_counts.items()}
+        likelihoods, unseen = {}, {}
+        for label, counts in term_counts.items():
+            denominator = sum(counts.values()) + len(vocabulary)
+            likelihoods[label] = {term: math.log((count + 1) / denominator) for term, count in counts.items()}
+            unseen[label] = math.log(1 / denominator)
+        return cls(priors, likelihoods, unseen)
+
+    def predict(self, words: List[str]) -> Tuple[str, float]:
+        """
+        Return the most likely label and its posterior probability.
+
+        Likelihoods are tempered beyond EVIDENCE_CAP tokens so long articles
+        do not produce near-certain posteriors from correlated words.
+        """
+        known = [word for word in words if any(word in table for table in self.likelihoods.values())]
+        scale = min(1.0, EVIDENCE_CAP / len(known)) if known else 1.0
+        scores = {
+            label: prior + scale * sum(self.likelihoods[label].get(word, self.unseen[label]) for word in known)
+            for label, prior in self.priors.items()
+        }
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+    def to_dict(self) -> Dict:
+        return {"priors": self.priors, "likelihoods": self.likelihoods, "unseen": self.unseen}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NaiveBayes":
+        return cls(data["priors"], data["likelihoods"], data["unseen"])
+
+
+class LocalClassifier:
+    """
+    Sentiment + tone pre-classifier with extractive gist and entities.
+
+    Args:
+        sentiment: Model predicting the sentiment label
+        tone: Model predicting the tone label
+        threshold: Confidence required to skip Gemini
+    """
+
+    def __init__(self, sentiment: NaiveBayes, tone: NaiveBayes, threshold: float = CONFIDENCE_THRESHOLD):
+        self.sentiment = sentiment
+        self.tone = tone
+        self.threshold = threshold
+
+    def predict(self, article: Dict) -> Tuple[str, str, float]:
+        """Return (sentiment, tone, confidence) for an article."""
+        words = _features(article)
+        sentiment, sentiment_confidence = self.sentiment.predict(words)
+        tone, tone_confidence = self.tone.predict(words)
+        return sentiment, tone, min(sentiment_confidence, tone_confidence)
+
+    def classify(self, article: Dict) -> Optional[Dict]:
+        """
+        Analyze an article locally if the model is confident enough.
+
+        Returns:
+            Analysis dict in the Gemini schema (plus analyzed_by/confidence),
+            or None to route the article to Gemini
+        """
+        content = article.get("content", "")
+        if not content:
+            return None
+        sentiment, tone, confidence = self.predict(article)
+        if confidence < self.threshold:
+            return None
+
+        title = article.get("title", "")
+        return {
+            "gist": reduce_content(content, GIST_TOKEN_BUDGET, title),
+            "sentiment": sentiment,
+            "tone": tone,
+            "key_entities": extract_entities(f"{title}. {reduce_content(content, CONTENT_TOKEN_BUDGET, title)}"),
+            "analyzed_by": LOCAL_LABEL,
+            "confidence": round(confidence, 3),
+        }
+
+    @classmethod
+    def train(cls, records: Iterable[Dict]) -> Optional["LocalClassifier"]:
+        """
+        Train from analyzed articles (the analysis_reports.json schema).
+
+        Only Gemini analyses that the validator did not reject are used, so
+        the model never learns from its own fast-path output.
+
+        Returns:
+            Trained classifier, or None if there are too few examples
+        """
+        documents, sentiments, tones = [], [], []
+        for record in records:
+            analysis = record.get("analysis")
+            validation = record.get("validation")
+            if not is_result(analysis) or "error" in analysis or analysis.get("analyzed_by") == LOCAL_LABEL:
+                continue
+            if is_result(validation) and not validation.get("is_valid", False):
+                continue
+            if not analysis.get("sentiment") or not analysis.get("tone"):
+                continue
+            documents.append(_features(record))
+            sentiments.append(analysis["sentiment"])
+            tones.append(analysis["tone"])
+
+        if len(documents) < MIN_TRAINING_EXAMPLES:
+            print(f"[WARN] Local classifier: {len(documents)} usable examples, need {MIN_TRAINING_EXAMPLES}")
+            return None
+        if len(set(sentiments)) < 2 or len(set(tones)) < 2:
+            print("[WARN] Local classifier: training reports cover only one sentiment or tone")
+            return None
+
+        document_frequency = Counter(word for words in documents for word in set(words))
+        vocabulary = {word for word, count in document_frequency.items() if count >= MIN_TERM_COUNT}
+        print(f"[OK] Local classifier: trained on {len(documents)} articles, {len(vocabulary)} terms")
+        return cls(NaiveBayes.train(documents, sentiments, vocabulary),
+                   NaiveBayes.train(documents, tones, vocabulary))
+
+    def save(self, path: str = MODEL_PATH):
+        """Write the model as JSON."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"sentiment": self.sentiment.to_dict(), "tone": self.tone.to_dict()}, f)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH, threshold: float = CONFIDENCE_THRESHOLD) -> Optional["LocalClassifier"]:
+        """Load a saved model, or None if it is missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(NaiveBayes.from_dict(data["sentiment"]), NaiveBayes.from_dict(data["tone"]), threshold)
+        except FileNotFoundError:
+            print(f"[WARN] Local classifier: no model at {path} (train with: python local_classifier.py <reports>)")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] Local classifier disabled: {str(e)[:100]}")
+        return None
+
+
+def _iter_reports(path: str) -> Iterable[Dict]:
+    """Records of a JSON array report or a (compressed) JSONL report."""
+    if path.endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return iter_jsonl(path)
+
+
+if __name__ == "__main__":
+    # Train from accumulated reports: python local_classifier.py output/analysis_reports.json ...
+    reports = (record for report_path in sys.argv[1:] for record in _iter_reports(report_path))
+    classifier = LocalClassifier.train(reports)
+    if classifier:
+        classifier.save()
+        print(f"[OK] Saved local classifier: {MODEL_PATH}")
@@ -1,95 +1,85 @@
 import os
 import json
+import queue
+import shutil
+import argparse
+import threading
 from datetime import datetime
-from typing import List, Dict
-from news_fetcher import fetch_all_news
-from llm_analyzer import analyze_all_articles
-from llm_validator import validate_all_analyses
+from typing import List, Dict, Iterable, Iterator, Optional
+from news_fetcher import fetch_all_news, stream_all_news, DEFAULT_ARTICLE_BUDGET
+from llm_analyzer import analyze_all_articles, analyze_stream
+from llm_validator import validate_all_analyses, validate_stream
+from deduplicator import deduplicate, propagate_results, StreamDeduplicator
+from seen_index import SeenIndex
+from checkpoint import CheckpointLog
+from jsonl_io import JsonlWriter, jsonl_path
+from models import UNSAMPLED, as_dict, is_result
+from stats_engine import SummaryStats, calculate_stats
+from columnar_export import ColumnarWriter, columnar_available, columnar_path, save_columnar_report
+from resilience import print_resilience_report
+from stream_stages import queue_iter, start_stages
 
+# Constants
+STREAM_QUEUE_SIZE = 32  # articles buffered between streaming stages
+RAW_FIELDS = ["title", "source", "url", "published_at", "content", "api_source"]
+WRITE_BUFFER_SIZE = 1024 * 1024  # bytes buffered per Markdown file handle
 
-def save_json_report(articles: List[Dict], filepath: str = "output/analysis_reports.json"):
-    """Save complete analysis to JSON file."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, indent=2, ensure_ascii=False)
-    
-    print(f"Saved JSON report: {filepath}")
 
+def _open_record_writer(filepath: str, jsonl: bool = False, compression: Optional[str] = None):
+    """Open a per-record writer: a JSONL stream or a pretty-printed JSON array."""
+    if jsonl or compression:
+        return JsonlWriter(jsonl_path(filepath, compression), compression=compression)
+    return _JsonArrayWriter(filepath)
 
-def save_raw_articles(articles: List[Dict], filepath: str = "output/raw_articles.json"):
-    """Save raw fetched articles to JSON file."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+def save_json_report(articles: Iterable[Dict], filepath: str = "output/analysis_reports.json",
+                     jsonl: bool = False, compression: Optional[str] = None) -> str:
+    """
+    Save complete analysis to JSON file.
     
-    # Create clean version without analysis/validation
-    raw_articles = []
-    for article in articles:
-        raw_articles.append({
-            "title": article.get("title"),
-            "source": article.get("source"),
-            "url": article.get("url"),
-            "published_at": article.get("published_at"),
-            "content": article.get("content"),
-            "api_source": article.get("api_source")
-        })
+    With jsonl=True (or a compression codec) records are streamed to a
+    .jsonl file instead, one compact line per article.
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(raw_articles, f, indent=2, ensure_ascii=False)
+    Returns:
+        Path of the written file
+    """
+    writer = _open_record_writer(filepath, jsonl, compression)
+    for article in articles:
+        writer.write(as_dict(article))
+    writer.close()
     
-    print(f"Saved raw articles: {filepath}")
+    print(f"Saved JSON report: {writer.path}")
+    return writer.path
 
 
-def calculate_summary_stats(articles: List[Dict]) -> Dict:
-    """Calculate summary statistics from analyzed articles."""
-    stats = {
-        "total_articles": len(articles),
-        "sentiment_counts": {"positive": 0, "negative": 0, "neutral": 0},
-        "tone_counts": {},
-        "analysis_success": 0,
-        "analysis_failed": 0,
-        "validation_success": 0,
-        "validation_failed": 0,
-        "validation_correct": 0,
-        "validation_incorrect": 0
-    }
+def save_raw_articles(articles: Iterable[Dict], filepath: str = "output/raw_articles.json",
+                      jsonl: bool = False, compression: Optional[str] = None) -> str:
+    """
+    Save raw fetched articles to JSON file.
     
+    Returns:
+        Path of the written file
+    """
+    writer = _open_record_writer(filepath, jsonl, compression)
+    
+    # Only the fetched fields, serialized straight from each record
     for article in articles:
-        analysis = article.get("analysis")
-        validation = article.get("validation")
-        
-        # Count analysis results
-        if analysis and analysis != "failed" and not isinstance(analysis, str):
-            stats["analysis_success"] += 1
-            
-            # Count sentiments
-            sentiment = analysis.get("sentiment", "neutral")
-            if sentiment in stats["sentiment_counts"]:
-                stats["sentiment_counts"][sentiment] += 1
-            
-            # Count tones
-            tone = analysis.get("tone", "unknown")
-            stats["tone_counts"][tone] = stats["tone_counts"].get(tone, 0) + 1
-        else:
-            stats["analysis_failed"] += 1
-        
-        # Count validation results
-        if validation and validation != "skipped" and not isinstance(validation, str):
-            stats["validation_success"] += 1
-            if validation.get("is_valid"):
-                stats["validation_correct"] += 1
-            else:
-                stats["validation_incorrect"] += 1
-        else:
-            stats["validation_failed"] += 1
+        writer.write(as_dict(article, RAW_FIELDS))
+    writer.close()
     
-    return stats
+    print(f"Saved raw articles: {writer.path}")
+    return writer.path
 
 
-def generate_markdown_report(articles: List[Dict], stats: Dict, filepath: str = "output/final_report.md"):
-    """Generate human-readable Markdown report."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    
+def calculate_summary_stats(articles: Iterable[Dict]) -> Dict:
+    """Calculate summary statistics from analyzed articles."""
+    return calculate_stats(articles)
+
+
+def _report_header_lines(stats: Dict) -> List[str]:
+    """Build the report header and summary sections."""
     report_lines = []
+    total = stats['total_articles'] or 1  # avoid division by zero on empty runs
     
     # Header
     report_lines.append("# News Analysis Report")
@@ -106,13 +96,24 @@ def generate_markdown_report(articles: List[Dict], stats: Dict, filepath: str =
     report_lines.append(f"- **Negative:** {stats['sentiment_counts']['negative']} articles")
     report_lines.append(f"- **Neutral:** {stats['sentiment_counts']['neutral']} articles")
     report_lines.append("")
-    report_lines.append(f"**Analysis Success Rate:** {stats['analysis_success']}/{stats['total_articles']} ({stats['analysis_success']/stats['total_articles']*100:.1f}%)")
-    report_lines.append(f"**Validation Success Rate:** {stats['validation_success']}/{stats['total_articles']} ({stats['validation_success']/stats['total_articles']*100:.1f}%)")
+    report_lines.append(f"**Analysis Success Rate:** {stats['analysis_success']}/{stats['total_articles']} ({stats['analysis_success']/total*100:.1f}%)")
+    sampled = stats['total_articles'] - stats.get('validation_unsampled', 0)
+    report_lines.append(f"**Validation Success Rate:** {stats['validation_success']}/{sampled} ({stats['validation_success']/(sampled or 1)*100:.1f}%)")
+    
+    if stats.get('validation_unsampled'):
+        report_lines.append(f"**Validation Sampling:** {sampled}/{stats['total_articles']} analyses sent to Mistral, {stats['validation_unsampled']} not sampled")
+    
+    if stats.get('fast_path_hits'):
+        share = stats['fast_path_hits'] / (stats['analysis_success'] or 1) * 100
+        report_lines.append(f"**Local Fast Path:** {stats['fast_path_hits']}/{stats['analysis_success']} analyses ({share:.1f}%), {stats['analysis_success'] - stats['fast_path_hits']} via Gemini")
     
     if stats['validation_success'] > 0:
         accuracy = stats['validation_correct'] / stats['validation_success'] * 100
         report_lines.append(f"**Validation Accuracy:** {stats['validation_correct']}/{stats['validation_success']} ({accuracy:.1f}%)")
     
+    if stats.get('validation_unsampled') and stats.get('estimated_accuracy') is not None:
+        report_lines.append(f"**Estimated Accuracy (all analyses):** {stats['estimated_accuracy']*100:.1f}% ± {stats['accuracy_margin']*100:.1f}% (~{stats['estimated_incorrect']} incorrect, extrapolated from the sample)")
+    
     report_lines.append("")
     
     # Tone breakdown
@@ -123,94 +124,284 @@ def generate_markdown_report(articles: List[Dict], stats: Dict, filepath: str =
             report_lines.append(f"- **{tone.capitalize()}:** {count} articles")
         report_lines.append("")
     
+    # Per-source sentiment breakdown
+    if stats.get('sentiment_by_source'):
+        report_lines.append("### Sentiment by Source")
+        report_lines.append("")
+        report_lines.append("| Source | Positive | Negative | Neutral |")
+        report_lines.append("|--------|----------|----------|---------|")
+        for source, counts in stats['sentiment_by_source'].items():
+            report_lines.append(f"| {source} | {counts.get('positive', 0)} | {counts.get('negative', 0)} | {counts.get('neutral', 0)} |")
+        report_lines.append("")
+    
+    # Per-day sentiment breakdown
+    if stats.get('sentiment_by_day'):
+        report_lines.append("### Sentiment by Day")
+        report_lines.append("")
+        report_lines.append("| Day | Positive | Negative | Neutral |")
+        report_lines.append("|-----|----------|----------|---------|")
+        for day, counts in stats['sentiment_by_day'].items():
+            report_lines.append(f"| {day} | {counts.get('positive', 0)} | {counts.get('negative', 0)} | {counts.get('neutral', 0)} |")
+        report_lines.append("")
+    
+    # Entity frequency
+    if stats.get('top_entities'):
+        report_lines.append("### Most Mentioned Entities")
+        report_lines.append("")
+        for entity, count in stats['top_entities']:
+            report_lines.append(f"- **{entity}:** {count} mentions")
+        report_lines.append("")
+    
     # Detailed Analysis
     report_lines.append("---")
     report_lines.append("")
     report_lines.append("## Detailed Analysis")
     report_lines.append("")
     
-    for idx, article in enumerate(articles, 1):
-        title = article.get("title", "No title")
-        source = article.get("source", "Unknown")
-        url = article.get("url", "")
-        analysis = article.get("analysis")
-        validation = article.get("validation")
+    return report_lines
+
+
+def _article_section_lines(idx: int, article: Dict) -> List[str]:
+    """Build the detailed report section for one article."""
+    report_lines = []
+    title = article.get("title", "No title")
+    source = article.get("source", "Unknown")
+    url = article.get("url", "")
+    analysis = article.get("analysis")
+    validation = article.get("validation")
+    
+    report_lines.append(f"### Article {idx}: \"{title}\"")
+    report_lines.append("")
+    report_lines.append(f"- **Source:** {source}")
+    report_lines.append(f"- **URL:** [{url}]({url})")
+    report_lines.append("")
+    
+    # Analysis section
+    if analysis and analysis != "failed" and not isinstance(analysis, str):
+        gist = analysis.get("gist", "N/A")
+        sentiment = analysis.get("sentiment", "N/A")
+        tone = analysis.get("tone", "N/A")
+        entities = analysis.get("key_entities", [])
         
-        report_lines.append(f"### Article {idx}: \"{title}\"")
-        report_lines.append("")
-        report_lines.append(f"- **Source:** {source}")
-        report_lines.append(f"- **URL:** [{url}]({url})")
-        report_lines.append("")
+        report_lines.append(f"- **Gist:** {gist}")
+        report_lines.append(f"- **LLM#1 Sentiment:** {sentiment.capitalize()}")
+        report_lines.append(f"- **Tone:** {tone.capitalize()}")
         
-        # Analysis section
-        if analysis and analysis != "failed" and not isinstance(analysis, str):
-            gist = analysis.get("gist", "N/A")
-            sentiment = analysis.get("sentiment", "N/A")
-            tone = analysis.get("tone", "N/A")
-            entities = analysis.get("key_entities", [])
-            
-            report_lines.append(f"- **Gist:** {gist}")
-            report_lines.append(f"- **LLM#1 Sentiment:** {sentiment.capitalize()}")
-            report_lines.append(f"- **Tone:** {tone.capitalize()}")
-            
-            if entities:
-                report_lines.append(f"- **Key Entities:** {', '.join(entities)}")
-        else:
-            report_lines.append(f"- **Analysis:** [FAILED]")
+        if entities:
+            report_lines.append(f"- **Key Entities:** {', '.join(entities)}")
+    else:
+        report_lines.append(f"- **Analysis:** [FAILED]")
+    
+    report_lines.append("")
+    
+    # Validation section
+    if validation and validation != "skipped" and not isinstance(validation, str):
+        symbol = validation.get("validation_symbol", "?")
+        is_valid = validation.get("is_valid", False)
+        justification = validation.get("justification", "N/A")
+        corrections = validation.get("suggested_corrections", [])
         
-        report_lines.append("")
+        report_lines.append(f"- **LLM#2 Validation:** {symbol} {'Correct' if is_valid else 'Incorrect'}")
+        report_lines.append(f"- **Justification:** {justification}")
         
-        # Validation section
-        if validation and validation != "skipped" and not isinstance(validation, str):
-            symbol = validation.get("validation_symbol", "?")
-            is_valid = validation.get("is_valid", False)
-            justification = validation.get("justification", "N/A")
-            corrections = validation.get("suggested_corrections", [])
-            
-            report_lines.append(f"- **LLM#2 Validation:** {symbol} {'Correct' if is_valid else 'Incorrect'}")
-            report_lines.append(f"- **Justification:** {justification}")
-            
-            if corrections:
-                report_lines.append(f"- **Suggested Corrections:**")
-                for correction in corrections:
-                    report_lines.append(f"  - {correction}")
+        if corrections:
+            report_lines.append(f"- **Suggested Corrections:**")
+            for correction in corrections:
+                report_lines.append(f"  - {correction}")
+    elif validation == UNSAMPLED:
+        report_lines.append(f"- **Validation:** [NOT SAMPLED]")
+    else:
+        report_lines.append(f"- **Validation:** [SKIPPED]")
+    
+    report_lines.append("")
+    report_lines.append("---")
+    report_lines.append("")
+    
+    return report_lines
+
+
+class _MarkdownReportWriter:
+    """
+    Stream Markdown article sections to disk as articles are processed.
+    
+    If the summary statistics are known up front the header is written
+    first; otherwise the first page's sections go to a side file and the
+    header is joined on at close(). With page_bytes set, a new page file
+    (final_report_p2.md, ...) is started whenever the current page exceeds
+    that size, and pages link to each other.
+    
+    Args:
+        filepath: Markdown report output path (first page)
+        stats: Summary statistics, if already known
+        page_bytes: Page size threshold in bytes (None = single file)
+    """
+    
+    def __init__(self, filepath: str, stats: Optional[Dict] = None, page_bytes: Optional[int] = None):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.path = filepath
+        self.page_bytes = page_bytes
+        self.pages = [filepath]
+        self._count = 0
+        self._page_size = 0
+        self._deferred_header = stats is None
+        
+        if self._deferred_header:
+            self._file = open(filepath + ".body", 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
         else:
-            report_lines.append(f"- **Validation:** [SKIPPED]")
+            self._file = open(filepath, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+            self._file.write('\n'.join(_report_header_lines(stats)) + '\n')
+    
+    def _page_path(self, page: int) -> str:
+        root, ext = os.path.splitext(self.path)
+        return f"{root}_p{page}{ext}"
+    
+    def _next_page(self):
+        """Close the current page with a forward link and open the next one."""
+        previous = os.path.basename(self.pages[-1])
+        following = self._page_path(len(self.pages) + 1)
+        self._file.write(f"\n[Next page]({os.path.basename(following)})\n")
+        self._file.close()
         
-        report_lines.append("")
-        report_lines.append("---")
-        report_lines.append("")
+        self.pages.append(following)
+        self._page_size = 0
+        self._file = open(following, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+        self._file.write(f"# News Analysis Report (page {len(self.pages)})\n\n")
+        self._file.write(f"[Previous page]({previous})\n\n")
+    
+    def write(self, article: Dict):
+        """Append one article section."""
+        if self.page_bytes and self._page_size >= self.page_bytes:
+            self._next_page()
+        self._count += 1
+        section = '\n'.join(_article_section_lines(self._count, article)) + '\n'
+        self._file.write(section)
+        self._page_size += len(section.encode('utf-8'))
+    
+    def close(self, stats: Optional[Dict] = None):
+        """
+        Finish the last page and, if deferred, prepend the header to page one.
+        
+        Args:
+            stats: Final summary statistics (required if not given up front)
+        """
+        self._file.close()
+        
+        # Drop trailing pages left over from an earlier, longer report
+        page = len(self.pages) + 1
+        while os.path.exists(self._page_path(page)):
+            os.remove(self._page_path(page))
+            page += 1
+        
+        if not self._deferred_header:
+            return
+        
+        body_path = self.path + ".body"
+        with open(self.path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write('\n'.join(_report_header_lines(stats)) + '\n')
+            with open(body_path, 'r', encoding='utf-8') as body:
+                shutil.copyfileobj(body, f, WRITE_BUFFER_SIZE)
+        os.remove(body_path)
+
+
+def generate_markdown_report(articles: Iterable[Dict], stats: Dict, filepath: str = "output/final_report.md",
+                             page_bytes: Optional[int] = None) -> List[str]:
+    """
+    Generate human-readable Markdown report.
     
-    # Write to file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(report_lines))
+    Returns:
+        Paths of the written page files
+    """
+    writer = _MarkdownReportWriter(filepath, stats, page_bytes)
+    for article in articles:
+        writer.write(article)
+    writer.close()
     
-    print(f"Saved Markdown report: {filepath}")
+    print(f"Saved Markdown report: {filepath}" + (f" ({len(writer.pages)} pages)" if len(writer.pages) > 1 else ""))
+    return writer.pages
 
 
-def run_pipeline():
-    """Execute the complete dual-LLM news analysis pipeline."""
+def run_pipeline(query: str = "India politics", batched: bool = False, incremental: bool = False,
+                 resume: bool = False, jsonl: bool = False, compression: Optional[str] = None,
+                 columnar: Optional[str] = None, page_bytes: Optional[int] = None,
+                 fast_path: bool = False, validate_rate: float = 1.0, stream_replies: bool = False,
+                 budget: Optional[int] = None):
+    """
+    Execute the complete dual-LLM news analysis pipeline.
+    
+    Every stage output is checkpointed per article; with resume=True the
+    fetched articles and completed analyses/validations are restored from
+    the last run's checkpoint and only the remaining work is done. With a
+    budget, result pages are walked until that many articles are fetched;
+    otherwise a single page of 12 articles is fetched.
+    """
     print("\n" + "="*60)
     print("DUAL-LLM NEWS ANALYSIS PIPELINE")
     print("="*60)
     print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*60 + "\n")
     
-    # Agent 1: Fetch news
-    articles = fetch_all_news(query="India politics", target_count=12)
+    # Incremental runs only ask for articles newer than each source's watermark
+    index = SeenIndex() if incremental else None
+    checkpoint = CheckpointLog()
     
-    if not articles:
-        print("\n[ERROR] PIPELINE FAILED: No articles fetched")
-        return
+    if resume:
+        state = checkpoint.load()
+        articles = state.articles
+        if not articles:
+            print("\n[ERROR] PIPELINE FAILED: No checkpoint to resume from")
+            return
+        state.apply(articles)
+        checkpoint.reopen()
+        print(f"[OK] Resuming: {len(articles)} articles, {len(state.analyses)} analyzed, "
+              f"{len(state.validations)} validated")
+    else:
+        # Agent 1: Fetch news
+        from_dates = index.watermarks() if index else None
+        if budget:
+            articles = list(stream_all_news(query, budget, from_dates=from_dates))
+        else:
+            articles = fetch_all_news(query=query, target_count=12, from_dates=from_dates)
+        
+        if index and articles:
+            articles = list(index.filter_new(articles))
+            print(f"[OK] Incremental: skipped {index.skipped} already processed, {len(articles)} new")
+            if not articles:
+                print("\n[OK] PIPELINE COMPLETE: No new articles since last run")
+                index.close()
+                return
+        
+        if not articles:
+            print("\n[ERROR] PIPELINE FAILED: No articles fetched")
+            return
+        
+        checkpoint.start()
+        checkpoint.record_fetched(articles)
     
     # Save raw articles
-    save_raw_articles(articles)
+    raw_path = save_raw_articles(articles, jsonl=jsonl, compression=compression)
+    
+    # Collapse syndicated/cross-source copies so each story hits the LLMs once
+    unique_articles, duplicates = deduplicate(articles)
+    
+    # Agent 2: Analyze with Gemini (skipping checkpointed results)
+    pending = [a for a in unique_articles if not is_result(a.get("analysis"))]
+    analyze_all_articles(pending, batched=batched, on_result=checkpoint.record_analysis, fast_path=fast_path,
+                         stream_replies=stream_replies)
     
-    # Agent 2: Analyze with Gemini
-    articles = analyze_all_articles(articles)
+    # Agent 3: Validate with Mistral (skipping checkpointed results)
+    pending = [a for a in unique_articles if not is_result(a.get("validation"))]
+    validate_all_analyses(pending, batched=batched, on_result=checkpoint.record_validation,
+                          sample_rate=validate_rate, stream_replies=stream_replies)
+    checkpoint.close()
     
-    # Agent 3: Validate with Mistral
-    articles = validate_all_analyses(articles)
+    # Duplicates share their representative's results (articles are updated in place)
+    propagate_results(duplicates)
+    
+    if index:
+        for article in articles:
+            index.record(article)
+        index.commit_watermarks()
+        index.close()
     
     # Agent 4: Generate outputs
     print("\n" + "="*60)
@@ -218,8 +409,9 @@ def run_pipeline():
     print("="*60 + "\n")
     
     stats = calculate_summary_stats(articles)
-    save_json_report(articles)
-    generate_markdown_report(articles, stats)
+    json_path = save_json_report(articles, jsonl=jsonl, compression=compression)
+    columnar_file = save_columnar_report(articles, fmt=columnar) if columnar else None
+    generate_markdown_report(articles, stats, page_bytes=page_bytes)
     
     # Final summary
     print("\n" + "="*60)
@@ -228,13 +420,223 @@ def run_pipeline():
     print(f"End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"\nArticles Processed: {stats['total_articles']}")
     print(f"Analysis Success: {stats['analysis_success']}/{stats['total_articles']}")
-    print(f"Validation Success: {stats['validation_success']}/{stats['total_articles']}")
+    print(f"Validation Success: {stats['validation_success']}/{stats['total_articles'] - stats['validation_unsampled']}"
+          + (f" ({stats['validation_unsampled']} not sampled)" if stats['validation_unsampled'] else ""))
+    print_resilience_report()
     print("\nOutput Files:")
-    print("  - output/raw_articles.json")
-    print("  - output/analysis_reports.json")
+    print(f"  - {raw_path}")
+    print(f"  - {json_path}")
+    if columnar_file:
+        print(f"  - {columnar_file}")
     print("  - output/final_report.md")
     print("="*60 + "\n")
 
 
+class _JsonArrayWriter:
+    """Write a JSON array to disk one element at a time."""
+    
+    def __init__(self, filepath: str):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.path = filepath
+        self._file = open(filepath, 'w', encoding='utf-8')
+        self._file.write("[")
+        self._count = 0
+    
+    def write(self, item: Dict):
+        body = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._file.write(("," if self._count else "") + "\n  " + body)
+        self._count += 1
+    
+    def close(self):
+        self._file.write("\n]" if self._count else "]")
+        self._file.close()
+
+
+def write_streaming_reports(articles: Iterable[Dict],
+                            raw_path: str = "output/raw_articles.json",
+                            json_path: str = "output/analysis_reports.json",
+                            md_path: str = "output/final_report.md",
+                            jsonl: bool = False, compression: Optional[str] = None,
+                            columnar: Optional[str] = None, page_bytes: Optional[int] = None) -> Dict:
+    """
+    Write all reports incrementally as processed articles arrive.
+    
+    The Markdown article sections are streamed to a side file and joined
+    with the summary header once the final statistics are known.
+    
+    Args:
+        articles: Iterable of fully processed articles
+        raw_path: Raw articles JSON output path
+        json_path: Analysis JSON output path
+        md_path: Markdown report output path
+        jsonl: Write JSON outputs as JSONL, one record per article
+        compression: Optional JSONL codec ("gzip" or "zstd")
+        columnar: Also export a "parquet" or "arrow" file next to the JSON report
+        page_bytes: Split the Markdown report into pages of about this size
+        
+    Returns:
+        Summary statistics for the written articles
+    """
+    stats = SummaryStats()
+    raw_writer = _open_record_writer(raw_path, jsonl, compression)
+    report_writer = _open_record_writer(json_path, jsonl, compression)
+    columnar_writer = ColumnarWriter(columnar_path(json_path, columnar), columnar) if columnar else None
+    md_writer = _MarkdownReportWriter(md_path, page_bytes=page_bytes)
+    
+    for article in articles:
+        stats.add(article)
+        raw_writer.write(as_dict(article, RAW_FIELDS))
+        report_writer.write(as_dict(article))
+        if columnar_writer:
+            columnar_writer.write(article)
+        md_writer.write(article)
+    
+    raw_writer.close()
+    report_writer.close()
+    if columnar_writer:
+        columnar_writer.close()
+    stats = stats.to_dict()
+    md_writer.close(stats)
+    
+    print(f"Saved raw articles: {raw_writer.path}")
+    print(f"Saved JSON report: {report_writer.path}")
+    if columnar_writer:
+        print(f"Saved {columnar} report: {columnar_writer.path} ({columnar_writer.count} rows)")
+    print(f"Saved Markdown report: {md_path}" + (f" ({len(md_writer.pages)} pages)" if len(md_writer.pages) > 1 else ""))
+    return stats
+
+
+def _recorded(articles: Iterable[Dict], index: SeenIndex) -> Iterator[Dict]:
+    """Pass articles through while marking them in the seen index."""
+    for article in articles:
+        index.record(article)
+        yield article
+
+
+def run_streaming_pipeline(query: str = "India politics", budget: int = DEFAULT_ARTICLE_BUDGET,
+                           incremental: bool = False, jsonl: bool = False,
+                           compression: Optional[str] = None, columnar: Optional[str] = None,
+                           page_bytes: Optional[int] = None, fast_path: bool = False,
+                           validate_rate: float = 1.0, stream_replies: bool = False):
+    """
+    Execute the pipeline with all stages overlapping.
+    
+    Articles flow fetcher -> analyzer -> validator -> writer through bounded
+    queues, so each stage starts on the first article instead of waiting for
+    the previous stage to finish, and memory stays flat as the batch grows.
+    """
+    print("\n" + "="*60)
+    print("DUAL-LLM NEWS ANALYSIS PIPELINE (STREAMING)")
+    print("="*60)
+    print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*60 + "\n")
+    
+    fetched = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    analyzed = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    validated = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    errors = []
+    stop = threading.Event()  # set by a failing stage; ends every other stage too
+    dedup = StreamDeduplicator()
+    index = SeenIndex() if incremental else None
+    
+    source = stream_all_news(query, budget, from_dates=index.watermarks() if index else None)
+    if index:
+        source = index.filter_new(source)
+    
+    stages = [
+        (dedup.filter(source), fetched),
+        (analyze_stream(queue_iter(fetched, stop), fast_path=fast_path, stream_replies=stream_replies), analyzed),
+        (validate_stream(queue_iter(analyzed, stop), sample_rate=validate_rate, stream_replies=stream_replies),
+         validated),
+    ]
+    threads = start_stages(stages, errors, stop)
+    
+    processed = dedup.expand(queue_iter(validated, stop))
+    if index:
+        processed = _recorded(processed, index)
+    stats = write_streaming_reports(processed, jsonl=jsonl, compression=compression,
+                                    columnar=columnar, page_bytes=page_bytes)
+    
+    for thread in threads:
+        thread.join()
+    
+    if index:
+        index.commit_watermarks()
+        index.close()
+        print(f"[OK] Incremental: skipped {index.skipped} already processed articles")
+    
+    if not stats["total_articles"]:
+        if errors:
+            print(f"\n[ERROR] PIPELINE FAILED: {str(errors[0])[:100]}")
+        elif index and index.skipped:
+            print("\n[OK] PIPELINE COMPLETE: No new articles since last run")
+        else:
+            print("\n[ERROR] PIPELINE FAILED: No articles fetched")
+        return
+    
+    print("\n" + "="*60)
+    print("[OK] PIPELINE COMPLETE" if not errors else "[WARN] PIPELINE COMPLETE WITH ERRORS")
+    print("="*60)
+    print(f"End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"\nArticles Processed: {stats['total_articles']}")
+    print(f"Analysis Success: {stats['analysis_success']}/{stats['total_articles']}")
+    print(f"Validation Success: {stats['validation_success']}/{stats['total_articles'] - stats['validation_unsampled']}"
+          + (f" ({stats['validation_unsampled']} not sampled)" if stats['validation_unsampled'] else ""))
+    print_resilience_report()
+    print("="*60 + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Dual-LLM news analysis pipeline")
+    parser.add_argument("--stream", action="store_true",
+                        help="overlap fetch, analysis, validation and output through bounded queues")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="maximum articles to fetch, walking result pages (default: "
+                             f"{DEFAULT_ARTICLE_BUDGET} with --stream, one page of 12 otherwise)")
+    parser.add_argument("--query", default="India politics", help="news search query")
+    parser.add_argument("--batch", action="store_true",
+                        help="pack several articles into each LLM request (batch pipeline only)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch and process articles not seen in earlier runs")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the last interrupted run from its checkpoint")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="write JSON outputs as JSONL, one compact record per article")
+    parser.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="compress JSONL outputs (implies --jsonl)")
+    parser.add_argument("--columnar", choices=["parquet", "arrow"],
+                        help="also export flattened results to Parquet or Arrow IPC (needs pyarrow)")
+    parser.add_argument("--report-page-mb", type=float, default=None,
+                        help="split the Markdown report into pages of about this many MB")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="classify confident articles locally instead of calling Gemini")
+    parser.add_argument("--validate-rate", type=float, default=1.0,
+                        help="base fraction of analyses to validate; risky sources and disagreements are always checked")
+    parser.add_argument("--stream-replies", action="store_true",
+                        help="stream LLM replies and stop reading each one as soon as its JSON is complete")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    run_pipeline()
+    args = parse_args()
+    page_bytes = int(args.report_page_mb * 1024 * 1024) if args.report_page_mb else None
+    if args.stream and args.resume:
+        print("[ERROR] --resume applies to the batch pipeline only")
+    elif args.stream and args.batch:
+        print("[ERROR] --batch applies to the batch pipeline only")
+    elif not 0 < args.validate_rate <= 1:
+        print("[ERROR] --validate-rate must be in (0, 1]")
+    elif args.columnar and not columnar_available():
+        print("[ERROR] --columnar requires pyarrow (pip install pyarrow)")
+    elif args.stream:
+        run_streaming_pipeline(query=args.query, budget=args.budget or DEFAULT_ARTICLE_BUDGET,
+                               incremental=args.incremental, jsonl=args.jsonl, compression=args.compress,
+                               columnar=args.columnar, page_bytes=page_bytes, fast_path=args.fast_path,
+                               validate_rate=args.validate_rate, stream_replies=args.stream_replies)
+    else:
+        run_pipeline(query=args.query, batched=args.batch, incremental=args.incremental,
+                     resume=args.resume, jsonl=args.jsonl, compression=args.compress,
+                     columnar=args.columnar, page_bytes=page_bytes, fast_path=args.fast_path,
+                     validate_rate=args.validate_rate, stream_replies=args.stream_replies,
+                     budget=args.budget)
@@ -0,0 +1,166 @@
+"""
+Record Models
+Compact slotted records for articles and their LLM results. Records keep
+the dict-style access the pipeline stages already use (get, [], in) but
+store fields in __slots__ instead of a per-article dict, and intern
+repeated labels (sentiment, tone, source) so every article shares one copy.
+Conversion to and from the JSON schema is lossless.
+"""
+
+import sys
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+# Constants
+SENTIMENTS = ("positive", "negative", "neutral")
+TONES = ("urgent", "analytical", "satirical", "balanced", "critical", "optimistic", "informative", "unknown")
+UNSAMPLED = "unsampled"  # "validation" marker for analyses the validation policy did not select
+
+
+def intern_label(value):
+    """Share one string object per distinct label value."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record:
+    """
+    Base for slotted records with dict-style field access.
+
+    Unset slots behave like missing dict keys. Keys outside FIELDS are kept
+    in a lazily created overflow dict so the schema stays open.
+    """
+
+    __slots__ = ("_extra",)
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: Tuple[str, ...] = ()
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "_Record":
+        """Build a record from its JSON dict form."""
+        record = cls()
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    def _coerce(self, key: str, value):
+        return intern_label(value) if key in self.INTERNED else value
+
+    def __setitem__(self, key: str, value):
+        if key in self.FIELDS:
+            object.__setattr__(self, key, self._coerce(key, value))
+            return
+        try:
+            self._extra[key] = value
+        except AttributeError:
+            self._extra = {key: value}
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key) if key in self.FIELDS else self._extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        yield from getattr(self, "_extra", {})
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        for key in self.keys():
+            yield key, self[key]
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Convert to the JSON dict schema (nested records included).
+
+        Args:
+            fields: Only these keys, in this order, missing ones as None
+
+        Returns:
+            Plain dict ready for json.dumps
+        """
+        if fields is not None:
+            return {key: as_dict(self.get(key)) for key in fields}
+        return {key: as_dict(value) for key, value in self.items()}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_Record, dict)):
+            return self.to_dict() == as_dict(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Analysis(_Record):
+    """Gemini analysis of one article."""
+
+    __slots__ = ("gist", "sentiment", "tone", "key_entities", "error", "analyzed_by", "confidence")
+    FIELDS = __slots__
+    INTERNED = ("sentiment", "tone", "analyzed_by")
+
+
+class Validation(_Record):
+    """Mistral verdict on one analysis."""
+
+    __slots__ = ("is_valid", "validation_symbol", "justification", "suggested_corrections", "sampling_weight")
+    FIELDS = __slots__
+    INTERNED = ("validation_symbol",)
+
+
+class Article(_Record):
+    """
+    A fetched article plus the results attached by each stage.
+
+    "analysis"/"validation" hold Analysis/Validation records (assigned
+    dicts are converted) or the "failed"/"skipped"/"unsampled" markers.
+    """
+
+    __slots__ = ("title", "source", "url", "published_at", "content", "api_source",
+                 "analysis", "analysis_error", "validation", "validation_error", "duplicate_of")
+    FIELDS = __slots__
+    INTERNED = ("source", "api_source", "analysis_error", "validation_error")
+
+    def _coerce(self, key: str, value):
+        if key == "analysis" and isinstance(value, dict):
+            return Analysis.from_dict(value)
+        if key == "validation" and isinstance(value, dict):
+            return Validation.from_dict(value)
+        return super()._coerce(key, value)
+
+
+def is_result(value) -> bool:
+    """Whether a stage result is a real analysis/validation (not a failure marker)."""
+    return isinstance(value, (dict, _Record))
+
+
+def as_dict(value, fields: Optional[Sequence[str]] = None):
+    """Return the JSON form of a record; other values pass through."""
+    if isinstance(value, _Record):
+        return value.to_dict(fields)
+    if fields is not None and isinstance(value, dict):
+        return {key: value.get(key) for key in fields}
+    return value
@@ -4,9 +4,16 @@ Fetches news articles from NewsAPI and Guardian API about Indian politics.
 """
 
 import os
+import time
+import queue
+import threading
 import requests
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterator
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from models import Article
+from resilience import CircuitOpenError, call_with_retry
 
 # Load environment variables
 load_dotenv()
@@ -18,15 +25,107 @@ GUARDIAN_API_KEY = os.getenv("GUARDIAN_API_KEY")
 NEWS_API_URL = "https://newsapi.org/v2/everything"
 GUARDIAN_API_URL = "https://content.guardianapis.com/search"
 TIMEOUT = 10  # seconds
+POOL_SIZE = 8  # keep-alive connections per host
+NEWSAPI_PAGE_SIZE = 100  # NewsAPI maximum
+GUARDIAN_PAGE_SIZE = 50  # Guardian allows up to 200
+DEFAULT_ARTICLE_BUDGET = 1000  # articles per paginated run
+STREAM_BUFFER_SIZE = 200  # articles buffered ahead of the consumer
 
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
 
-def fetch_from_newsapi(query: str = "India politics", max_articles: int = 8) -> Optional[List[Dict]]:
+
+def get_session() -> requests.Session:
+    """
+    Return the shared HTTP session, creating it on first use.
+    
+    The session keeps connections alive between requests so repeated
+    fetches against the same API skip the TCP/TLS handshake.
+    
+    Returns:
+        Process-wide requests.Session with a pooled adapter
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _get_json(endpoint: str, url: str, params: Dict, check_status: bool = True) -> Dict:
+    """
+    GET a JSON document, retrying transient failures under the endpoint's circuit breaker.
+    
+    Args:
+        endpoint: Breaker name for the API
+        url: Request URL
+        params: Query parameters
+        check_status: Raise on any HTTP error status; when False only 429/5xx
+            raise (and are retried) so API error bodies can be inspected
+        
+    Returns:
+        Decoded JSON body
+    """
+    def attempt():
+        response = get_session().get(url, params=params, timeout=TIMEOUT)
+        if check_status or response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        return response.json()
+    
+    return call_with_retry(attempt, endpoint)
+
+
+def _normalize_newsapi(article: Dict) -> Article:
+    """Convert a raw NewsAPI article into the shared article format."""
+    return Article(
+        title=article.get("title", "No title"),
+        source=article.get("source", {}).get("name", "Unknown"),
+        url=article.get("url", ""),
+        published_at=article.get("publishedAt", ""),
+        content=article.get("description", "") or article.get("content", ""),
+        api_source="newsapi"
+    )
+
+
+def _normalize_guardian(article: Dict) -> Article:
+    """Convert a raw Guardian result into the shared article format."""
+    fields = article.get("fields", {})
+    content = fields.get("bodyText", "") or fields.get("trailText", "")
+    
+    return Article(
+        title=article.get("webTitle", "No title"),
+        source="The Guardian",
+        url=article.get("webUrl", ""),
+        published_at=article.get("webPublicationDate", ""),
+        content=content,
+        api_source="guardian"
+    )
+
+
+def _newsapi_from(from_date: str) -> str:
+    """NewsAPI 'from' takes an ISO 8601 datetime without a timezone suffix."""
+    return from_date.rstrip("Z")[:19]
+
+
+def _guardian_from(from_date: str) -> str:
+    """Guardian 'from-date' is day-granular; overlap is dropped by the seen index."""
+    return from_date[:10]
+
+
+def fetch_from_newsapi(query: str = "India politics", max_articles: int = 8,
+                       from_date: Optional[str] = None) -> Optional[List[Dict]]:
     """
     Fetch articles from NewsAPI.
     
     Args:
         query: Search query
         max_articles: Maximum number of articles to fetch
+        from_date: Only return articles published at or after this ISO timestamp
         
     Returns:
         List of normalized articles or None on failure
@@ -42,13 +141,13 @@ def fetch_from_newsapi(query: str = "India politics", max_articles: int = 8) ->
         "sortBy": "publishedAt",
         "pageSize": max_articles
     }
+    if from_date:
+        params["from"] = _newsapi_from(from_date)
     
     print(f"Fetching from NewsAPI: '{query}'...")
     
     try:
-        response = requests.get(NEWS_API_URL, params=params, timeout=TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json("newsapi", NEWS_API_URL, params)
         
         if data.get("status") != "ok":
             print(f"[ERROR] NewsAPI: API returned status '{data.get('status')}'")
@@ -61,32 +160,25 @@ def fetch_from_newsapi(query: str = "India politics", max_articles: int = 8) ->
             return []
         
         # Normalize article format
-        normalized = []
-        for article in articles:
-            normalized.append({
-                "title": article.get("title", "No title"),
-                "source": article.get("source", {}).get("name", "Unknown"),
-                "url": article.get("url", ""),
-                "published_at": article.get("publishedAt", ""),
-                "content": article.get("description", "") or article.get("content", ""),
-                "api_source": "newsapi"
-            })
+        normalized = [_normalize_newsapi(article) for article in articles]
         
         print(f"[OK] NewsAPI: Fetched {len(normalized)} articles")
         return normalized
         
-    except requests.RequestException as e:
+    except (requests.RequestException, CircuitOpenError) as e:
         print(f"[ERROR] NewsAPI: {e}")
         return None
 
 
-def fetch_from_guardian(query: str = "India politics", max_articles: int = 8) -> Optional[List[Dict]]:
+def fetch_from_guardian(query: str = "India politics", max_articles: int = 8,
+                        from_date: Optional[str] = None) -> Optional[List[Dict]]:
     """
     Fetch articles from Guardian API.
     
     Args:
         query: Search query
         max_articles: Maximum number of articles to fetch
+        from_date: Only return articles published on or after this ISO timestamp
         
     Returns:
         List of normalized articles or None on failure
@@ -102,13 +194,13 @@ def fetch_from_guardian(query: str = "India politics", max_articles: int = 8) ->
         "order-by": "newest",
         "show-fields": "bodyText,trailText"
     }
+    if from_date:
+        params["from-date"] = _guardian_from(from_date)
     
     print(f"Fetching from Guardian: '{query}'...")
     
     try:
-        response = requests.get(GUARDIAN_API_URL, params=params, timeout=TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json("guardian", GUARDIAN_API_URL, params)
         
         if data.get("response", {}).get("status") != "ok":
             print(f"[ERROR] Guardian: API returned status '{data.get('response', {}).get('status')}'")
@@ -121,29 +213,36 @@ def fetch_from_guardian(query: str = "India politics", max_articles: int = 8) ->
             return []
         
         # Normalize article format
-        normalized = []
-        for article in articles:
-            fields = article.get("fields", {})
-            content = fields.get("bodyText", "") or fields.get("trailText", "")
-            
-            normalized.append({
-                "title": article.get("webTitle", "No title"),
-                "source": "The Guardian",
-                "url": article.get("webUrl", ""),
-                "published_at": article.get("webPublicationDate", ""),
-                "content": content,
-                "api_source": "guardian"
-            })
+        normalized = [_normalize_guardian(article) for article in articles]
         
         print(f"[OK] Guardian: Fetched {len(normalized)} articles")
         return normalized
         
-    except requests.RequestException as e:
+    except (requests.RequestException, CircuitOpenError) as e:
         print(f"[ERROR] Guardian: {e}")
         return None
 
 
-def fetch_all_news(query: str = "India politics", target_count: int = 12) -> List[Dict]:
+# Registered sources: api_source -> (display name, fetch function)
+SOURCES = {
+    "newsapi": ("NewsAPI", fetch_from_newsapi),
+    "guardian": ("Guardian", fetch_from_guardian),
+}
+
+
+def _timed_fetch(fetch_fn, query: str, max_articles: int, from_date: Optional[str] = None):
+    """Run a source fetch and return (articles, elapsed seconds)."""
+    start = time.perf_counter()
+    try:
+        articles = fetch_fn(query, max_articles, from_date)
+    except Exception as e:
+        print(f"[ERROR] {fetch_fn.__name__}: {str(e)[:100]}")
+        articles = None
+    return articles, time.perf_counter() - start
+
+
+def fetch_all_news(query: str = "India politics", target_count: int = 12, concurrent: bool = True,
+                   from_dates: Optional[Dict[str, str]] = None) -> List[Dict]:
     """
     Fetch news from both NewsAPI and Guardian API.
     Continues even if one source fails.
@@ -151,6 +250,8 @@ def fetch_all_news(query: str = "India politics", target_count: int = 12) -> Lis
     Args:
         query: Search query
         target_count: Target total number of articles
+        concurrent: Query all sources in parallel instead of one after another
+        from_dates: Optional per-source lower bound on published_at (api_source -> ISO timestamp)
         
     Returns:
         Combined list of articles from both sources
@@ -160,17 +261,29 @@ def fetch_all_news(query: str = "India politics", target_count: int = 12) -> Lis
     print("="*60)
     
     all_articles = []
-    articles_per_source = target_count // 2
+    articles_per_source = target_count // len(SOURCES)
+    from_dates = from_dates or {}
+    results = {}
     
-    # Fetch from NewsAPI
-    newsapi_articles = fetch_from_newsapi(query, articles_per_source)
-    if newsapi_articles:
-        all_articles.extend(newsapi_articles)
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+            futures = {
+                api_source: executor.submit(_timed_fetch, fetch_fn, query, articles_per_source,
+                                            from_dates.get(api_source))
+                for api_source, (_, fetch_fn) in SOURCES.items()
+            }
+            for api_source, future in futures.items():
+                results[api_source] = future.result()
+    else:
+        for api_source, (_, fetch_fn) in SOURCES.items():
+            results[api_source] = _timed_fetch(fetch_fn, query, articles_per_source,
+                                               from_dates.get(api_source))
     
-    # Fetch from Guardian
-    guardian_articles = fetch_from_guardian(query, articles_per_source)
-    if guardian_articles:
-        all_articles.extend(guardian_articles)
+    # Combine in registration order so output is stable across runs
+    for api_source in SOURCES:
+        articles, _ = results[api_source]
+        if articles:
+            all_articles.extend(articles)
     
     # Summary
     print("\n" + "-"*60)
@@ -178,15 +291,218 @@ def fetch_all_news(query: str = "India politics", target_count: int = 12) -> Lis
         print("[ERROR] FAILED: No articles fetched from any source")
     else:
         print(f"[OK] SUCCESS: Fetched {len(all_articles)} total articles")
-        newsapi_count = sum(1 for a in all_articles if a["api_source"] == "newsapi")
-        guardian_count = sum(1 for a in all_articles if a["api_source"] == "guardian")
-        print(f"   - NewsAPI: {newsapi_count} articles")
-        print(f"   - Guardian: {guardian_count} articles")
+    for api_source, (name, _) in SOURCES.items():
+        articles, elapsed = results[api_source]
+        count = len(articles) if articles else 0
+        status = "" if articles is not None else " [FAILED]"
+        print(f"   - {name}: {count} articles ({elapsed:.2f}s){status}")
     print("="*60 + "\n")
     
     return all_articles
 
 
+def iter_newsapi_pages(query: str = "India politics", page_size: int = NEWSAPI_PAGE_SIZE,
+                       from_date: Optional[str] = None) -> Iterator[List[Dict]]:
+    """
+    Walk NewsAPI result pages, yielding one normalized page at a time.
+    Stops at the last page or on the first error.
+    
+    Args:
+        query: Search query
+        page_size: Articles requested per page
+        from_date: Only return articles published at or after this ISO timestamp
+        
+    Yields:
+        List of normalized articles for each page
+    """
+    if not NEWS_API_KEY:
+        print("[ERROR] NewsAPI: API key not found in .env file")
+        return
+    
+    page = 1
+    while True:
+        params = {
+            "q": query,
+            "apiKey": NEWS_API_KEY,
+            "language": "en",
+            "sortBy": "publishedAt",
+            "pageSize": page_size,
+            "page": page
+        }
+        if from_date:
+            params["from"] = _newsapi_from(from_date)
+        
+        try:
+            # Not raising on 4xx: the 'maximumResultsReached' error body ends pagination below
+            data = _get_json("newsapi", NEWS_API_URL, params, check_status=False)
+        except (requests.RequestException, ValueError, CircuitOpenError) as e:
+            print(f"[ERROR] NewsAPI page {page}: {e}")
+            return
+        
+        if data.get("status") != "ok":
+            # Free plans stop paginating with a 'maximumResultsReached' error
+            print(f"[WARN] NewsAPI page {page}: {data.get('code', data.get('status'))}")
+            return
+        
+        articles = data.get("articles", [])
+        if not articles:
+            return
+        
+        yield [_normalize_newsapi(article) for article in articles]
+        
+        if page * page_size >= data.get("totalResults", 0):
+            return
+        page += 1
+
+
+def iter_guardian_pages(query: str = "India politics", page_size: int = GUARDIAN_PAGE_SIZE,
+                        from_date: Optional[str] = None) -> Iterator[List[Dict]]:
+    """
+    Walk Guardian result pages, yielding one normalized page at a time.
+    Stops at the last page or on the first error.
+    
+    Args:
+        query: Search query
+        page_size: Articles requested per page
+        from_date: Only return articles published on or after this ISO timestamp
+        
+    Yields:
+        List of normalized articles for each page
+    """
+    if not GUARDIAN_API_KEY:
+        print("[ERROR] Guardian: API key not found in .env file")
+        return
+    
+    page = 1
+    while True:
+        params = {
+            "q": query,
+            "api-key": GUARDIAN_API_KEY,
+            "page-size": page_size,
+            "page": page,
+            "order-by": "newest",
+            "show-fields": "bodyText,trailText"
+        }
+        if from_date:
+            params["from-date"] = _guardian_from(from_date)
+        
+        try:
+            data = _get_json("guardian", GUARDIAN_API_URL, params).get("response", {})
+        except (requests.RequestException, ValueError, CircuitOpenError) as e:
+            print(f"[ERROR] Guardian page {page}: {e}")
+            return
+        
+        if data.get("status") != "ok":
+            print(f"[WARN] Guardian page {page}: API returned status '{data.get('status')}'")
+            return
+        
+        articles = data.get("results", [])
+        if not articles:
+            return
+        
+        yield [_normalize_guardian(article) for article in articles]
+        
+        if page >= data.get("pages", 0):
+            return
+        page += 1
+
+
+# Paginated sources: api_source -> (display name, page iterator)
+PAGINATED_SOURCES = {
+    "newsapi": ("NewsAPI", iter_newsapi_pages),
+    "guardian": ("Guardian", iter_guardian_pages),
+}
+
+_DONE = object()  # end-of-source marker on the stream queue
+
+
+def _pump_source(api_source: str, query: str, out: "queue.Queue", stop: threading.Event,
+                 from_date: Optional[str] = None):
+    """Push every article from one paginated source onto the shared queue."""
+    name, iter_pages = PAGINATED_SOURCES[api_source]
+    pages = iter_pages(query, from_date=from_date)
+    try:
+        for page in pages:
+            for article in page:
+                while not stop.is_set():
+                    try:
+                        out.put(article, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+    except Exception as e:
+        print(f"[ERROR] {name}: {str(e)[:100]}")
+    finally:
+        pages.close()
+        out.put((_DONE, api_source))
+
+
+def stream_all_news(query: str = "India politics", budget: int = DEFAULT_ARTICLE_BUDGET,
+                    from_dates: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+    """
+    Stream articles from every source, walking result pages concurrently.
+    Articles are yielded as soon as they arrive so downstream stages can
+    start before fetching finishes. Continues even if one source fails.
+    
+    Args:
+        query: Search query
+        budget: Maximum number of articles to yield across all sources
+        from_dates: Optional per-source lower bound on published_at (api_source -> ISO timestamp)
+        
+    Yields:
+        Normalized article dictionaries
+    """
+    print("\n" + "="*60)
+    print(f"Starting Paginated News Fetch (budget: {budget})")
+    print("="*60)
+    
+    out = queue.Queue(maxsize=STREAM_BUFFER_SIZE)
+    stop = threading.Event()
+    from_dates = from_dates or {}
+    counts = {api_source: 0 for api_source in PAGINATED_SOURCES}
+    start = time.perf_counter()
+    
+    workers = [
+        threading.Thread(target=_pump_source,
+                         args=(api_source, query, out, stop, from_dates.get(api_source)), daemon=True)
+        for api_source in PAGINATED_SOURCES
+    ]
+    for worker in workers:
+        worker.start()
+    
+    active = len(workers)
+    yielded = 0
+    try:
+        while active and yielded < budget:
+            item = out.get()
+            if isinstance(item, tuple) and item[0] is _DONE:
+                active -= 1
+                continue
+            counts[item["api_source"]] += 1
+            yielded += 1
+            yield item
+    finally:
+        # Budget reached or consumer stopped early: release the producers
+        stop.set()
+        while active:
+            try:
+                item = out.get(timeout=0.5)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+                continue
+            if isinstance(item, tuple) and item[0] is _DONE:
+                active -= 1
+        
+        print("\n" + "-"*60)
+        print(f"[OK] Streamed {yielded} articles in {time.perf_counter() - start:.2f}s")
+        for api_source, (name, _) in PAGINATED_SOURCES.items():
+            print(f"   - {name}: {counts[api_source]} articles")
+        print("="*60 + "\n")
+
+
 if __name__ == "__main__":
     # Test the news fetcher
     articles = fetch_all_news()
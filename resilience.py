@@ -0,0 +1,253 @@
+"""
+Resilience helpers shared by every outbound call (news APIs and LLMs).
+Classifies errors as retryable or not, retries transient failures with
+jittered exponential backoff that honours Retry-After, and keeps a circuit
+breaker per endpoint so a dead provider fails fast instead of being hit
+once per article.
+"""
+
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, TypeVar
+
+from throttling import OverloadError, RateLimitError, http_status
+
+T = TypeVar("T")
+
+# Constants
+MAX_ATTEMPTS = 4  # first try + retries
+BASE_DELAY = 1.0  # seconds
+MAX_DELAY = 30.0  # cap for a single backoff sleep
+MAX_RETRY_AFTER = 120.0  # longer Retry-After values are treated as an outage
+FAILURE_THRESHOLD = 5  # consecutive transient failures that open a breaker
+RESET_TIMEOUT = 30.0  # seconds a breaker stays open before a probe call
+
+# Exception class names (from requests, httpx, urllib3, SDKs) that mean a transient network problem
+_TRANSIENT_NAMES = ("Timeout", "ConnectionError", "ConnectError", "RemoteDisconnected",
+                    "ProtocolError", "ReadError", "ChunkedEncodingError", "APIConnectionError")
+
+
+class CallCancelled(Exception):
+    """Raised inside a call its caller abandoned (deadline passed, hedge lost)."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"circuit open for {endpoint} (retry in {retry_in:.0f}s)")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classify an outbound-call failure.
+
+    Returns:
+        "rate_limit" (429), "unavailable" (408/5xx), "network" (timeouts,
+        dropped connections), "circuit_open" or "fatal" (anything a retry
+        will not fix: 4xx, auth, malformed replies)
+    """
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, RateLimitError):
+        return "rate_limit"
+    if isinstance(error, OverloadError):
+        return "unavailable"
+    status = http_status(error)
+    if status == 429:
+        return "rate_limit"
+    if status is not None:
+        return "unavailable" if status == 408 or 500 <= status < 600 else "fatal"
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return "network"
+    if any(name in cls.__name__ for cls in type(error).__mro__ for name in _TRANSIENT_NAMES):
+        return "network"
+    message = str(error)
+    if "RESOURCE_EXHAUSTED" in message or "rate limit" in message.lower():
+        return "rate_limit"
+    if "UNAVAILABLE" in message or "overloaded" in message.lower():
+        return "unavailable"
+    return "fatal"
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether retrying the same call later may succeed."""
+    return classify_error(error) in ("rate_limit", "unavailable", "network")
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by a Retry-After header (or attribute) on the error, if any."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def as_overload_error(error: BaseException) -> OverloadError:
+    """Wrap a retryable error for the LLM workers' shared backoff, keeping Retry-After."""
+    wrapped = RateLimitError(str(error)) if classify_error(error) == "rate_limit" else OverloadError(str(error))
+    wrapped.retry_after = retry_after(error)
+    return wrapped
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None,
+                  base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY) -> float:
+    """
+    Full-jitter exponential backoff, never shorter than the server's Retry-After.
+
+    Args:
+        attempt: Zero-based retry number
+        error: The failure being retried (for Retry-After)
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    requested = retry_after(error) if error is not None else None
+    return max(delay, min(requested, MAX_RETRY_AFTER)) if requested is not None else delay
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint.
+
+    Closed: calls pass. After `failure_threshold` transient failures in a
+    row it opens and calls fail immediately with CircuitOpenError. After
+    `reset_timeout` seconds one probe call is let through (half-open); its
+    success closes the breaker, its failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.calls = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.trips = 0
+        self._consecutive = 0
+        self._opened_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._consecutive < self.failure_threshold:
+                return "closed"
+            return "half_open" if time.monotonic() >= self._opened_until else "open"
+
+    def before_call(self):
+        """Reserve a call, or raise CircuitOpenError if the endpoint is tripped."""
+        with self._lock:
+            if self._consecutive >= self.failure_threshold:
+                now = time.monotonic()
+                if now < self._opened_until or self._probing:
+                    self.short_circuits += 1
+                    raise CircuitOpenError(self.name, max(0.0, self._opened_until - now))
+                self._probing = True  # half-open: this call is the probe
+            self.calls += 1
+
+    def release(self):
+        """End a call the caller cancelled; it counts as neither success nor failure."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._probing = False
+
+    def record_failure(self, error: BaseException):
+        """Count a failure; only transient ones move the breaker toward open."""
+        with self._lock:
+            self.failures += 1
+            was_probe = self._probing
+            self._probing = False
+            if not is_retryable(error):
+                return
+            self._consecutive += 1
+            if self._consecutive >= self.failure_threshold:
+                if was_probe or self._consecutive == self.failure_threshold:
+                    self.trips += 1
+                # A long Retry-After keeps the breaker open for as long as the server asked
+                hold = max(self.reset_timeout, min(retry_after(error) or 0.0, MAX_RETRY_AFTER))
+                self._opened_until = time.monotonic() + hold
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """Process-wide circuit breaker for an endpoint (API host, model, ...)."""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+
+def guarded(endpoint: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Make one call through the endpoint's circuit breaker (no retries)."""
+    breaker = get_breaker(endpoint)
+    breaker.before_call()
+    try:
+        result = fn(*args, **kwargs)
+    except CallCancelled:
+        breaker.release()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
+
+
+def call_with_retry(fn: Callable[..., T], endpoint: str, *args,
+                    max_attempts: int = MAX_ATTEMPTS, **kwargs) -> T:
+    """
+    Call fn under the endpoint's circuit breaker, retrying transient failures.
+
+    Args:
+        fn: The outbound call
+        endpoint: Breaker / log name (e.g. "newsapi")
+        max_attempts: First try plus retries
+
+    Returns:
+        fn's result
+
+    Raises:
+        The last error once it is not retryable or attempts are exhausted;
+        CircuitOpenError as soon as the breaker is open
+    """
+    for attempt in range(max_attempts):
+        try:
+            return guarded(endpoint, fn, *args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e) or attempt == max_attempts - 1:
+                raise
+            delay = backoff_delay(attempt, e)
+            print(f"[WARN] {endpoint}: {classify_error(e)} ({str(e)[:60]}), retry {attempt + 1} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def print_resilience_report():
+    """Print per-endpoint failure / breaker counters for endpoints that had trouble."""
+    with _breakers_lock:
+        breakers = sorted(_breakers.values(), key=lambda breaker: breaker.name)
+    for breaker in breakers:
+        if breaker.failures or breaker.short_circuits:
+            print(f"   Endpoint {breaker.name}: {breaker.failures}/{breaker.calls} calls failed, "
+                  f"{breaker.trips} breaker trips, {breaker.short_circuits} calls short-circuited ({breaker.state})")
@@ -0,0 +1,138 @@
+"""
+Seen Index
+Persistent record of already-processed articles and per-source
+published_at high-water marks, used for incremental runs.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from deduplicator import normalize_url
+from result_cache import make_cache_key
+from models import UNSAMPLED, is_result
+
+# Constants
+DEFAULT_INDEX_PATH = "cache/seen_index.db"
+
+
+def article_keys(article: Dict) -> List[str]:
+    """Identity keys for an article: normalized URL and content hash."""
+    keys = [make_cache_key("content", article.get("title", ""), article.get("content", ""))]
+    url = normalize_url(article.get("url", ""))
+    if url:
+        keys.append(make_cache_key("url", url))
+    return keys
+
+
+def is_processed(article: Dict) -> bool:
+    """An article is done once both LLM stages produced a result (or validation was not sampled)."""
+    validation = article.get("validation")
+    return is_result(article.get("analysis")) and (is_result(validation) or validation == UNSAMPLED)
+
+
+class SeenIndex:
+    """
+    SQLite-backed index of processed articles plus per-source watermarks.
+
+    Watermarks only advance past an article once everything older from
+    that source has been processed, so failed articles are fetched again
+    on the next run while successful ones are skipped by the key lookup.
+
+    Args:
+        path: SQLite database file (created if missing)
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._newest: Dict[str, str] = {}  # api_source -> newest published_at this run
+        self._oldest_failed: Dict[str, str] = {}  # api_source -> oldest unprocessed published_at
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, processed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks (api_source TEXT PRIMARY KEY, published_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def watermarks(self) -> Dict[str, str]:
+        """Return the stored high-water mark for each source."""
+        with self._lock:
+            rows = self._conn.execute("SELECT api_source, published_at FROM watermarks").fetchall()
+        return dict(rows)
+
+    def is_seen(self, article: Dict) -> bool:
+        """Check whether an article (by URL or content) was already processed."""
+        keys = article_keys(article)
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM seen WHERE key IN ({placeholders}) LIMIT 1", keys
+            ).fetchone()
+        return row is not None
+
+    def filter_new(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield only articles that were not processed in an earlier run."""
+        for article in articles:
+            if self.is_seen(article):
+                self.skipped += 1
+            else:
+                yield article
+
+    def record(self, article: Dict):
+        """Mark an article processed (if it was) and track watermark candidates."""
+        api_source = article.get("api_source", "")
+        published_at = article.get("published_at") or ""
+        with self._lock:
+            if is_processed(article):
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO seen (key, processed_at) VALUES (?, ?)",
+                    [(key, now) for key in article_keys(article)],
+                )
+                self._conn.commit()
+                if published_at > self._newest.get(api_source, ""):
+                    self._newest[api_source] = published_at
+            elif published_at:
+                oldest = self._oldest_failed.get(api_source)
+                if oldest is None or published_at < oldest:
+                    self._oldest_failed[api_source] = published_at
+
+    def commit_watermarks(self):
+        """
+        Advance each source's watermark without skipping unprocessed articles.
+
+        A source with a failed article is set to that article's published_at,
+        even if this moves its mark back, so the next run fetches it again;
+        otherwise the mark only moves forward to the newest processed article.
+        """
+        with self._lock:
+            for api_source in set(self._newest) | set(self._oldest_failed):
+                oldest_failed: Optional[str] = self._oldest_failed.get(api_source)
+                if oldest_failed:
+                    update = "excluded.published_at"
+                    mark = oldest_failed
+                else:
+                    update = "MAX(published_at, excluded.published_at)"
+                    mark = self._newest[api_source]
+                self._conn.execute(
+                    "INSERT INTO watermarks (api_source, published_at) VALUES (?, ?) "
+                    f"ON CONFLICT(api_source) DO UPDATE SET published_at = {update}",
+                    (api_source, mark),
+                )
+            self._conn.commit()
+            self._newest.clear()
+            self._oldest_failed.clear()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,324 @@
+"""
+Stats Engine
+Single-pass summary statistics over processed articles. Aggregates are
+mergeable, so they can be built incrementally as records stream in, per
+worker or per row group, and combined afterwards. Stored corpora are
+aggregated batch by batch (JSONL, Parquet or Arrow IPC) without loading
+everything into memory; columnar files use vectorized Arrow group-bys.
+"""
+
+import sys
+import math
+from collections import Counter
+from typing import Dict, Iterable
+
+from jsonl_io import iter_jsonl
+from models import UNSAMPLED, is_result
+from local_classifier import LOCAL_LABEL
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for columnar corpora
+    pa = None
+    pc = None
+    pq = None
+
+# Constants
+SENTIMENTS = ["positive", "negative", "neutral"]
+TOP_ENTITIES = 20
+CONFIDENCE_Z = 1.96  # 95% interval for the extrapolated accuracy
+UNKNOWN_SOURCE = "Unknown"
+UNKNOWN_DAY = "unknown"
+STATS_COLUMNS = ["source", "published_at", "sentiment", "tone", "key_entities", "analyzed_by",
+                 "analysis_ok", "validation_ok", "is_valid", "validation_unsampled", "sampling_weight"]
+
+
+def _has_analysis(article: Dict) -> bool:
+    analysis = article.get("analysis")
+    return bool(analysis) and is_result(analysis)
+
+
+def _has_validation(article: Dict) -> bool:
+    validation = article.get("validation")
+    return bool(validation) and is_result(validation)
+
+
+def _day(published_at) -> str:
+    """Calendar day (YYYY-MM-DD) of an ISO timestamp."""
+    return str(published_at)[:10] if published_at else UNKNOWN_DAY
+
+
+class SummaryStats:
+    """
+    Mergeable partial aggregate of article statistics.
+
+    add() folds in one article, merge() combines two partial aggregates
+    (e.g. from separate workers or row groups) and to_dict() renders the
+    summary used by the reports.
+
+    Validations carry a sampling weight (1 / inclusion probability) when
+    the validation policy sampled them; accuracy is extrapolated with the
+    weighted ratio estimator, and its variance from the summed w(w-1) terms.
+    """
+
+    def __init__(self):
+        self.total_articles = 0
+        self.analysis_success = 0
+        self.validation_success = 0
+        self.validation_correct = 0
+        self.validation_unsampled = 0
+        self.validation_weight = 0.0  # sum of sampling weights over validations
+        self.correct_weight = 0.0
+        self.excess_weight = 0.0  # sum of w(w-1), zero when everything was validated
+        self.excess_correct_weight = 0.0
+        self.fast_path_hits = 0  # analyses answered by the local classifier
+        self.sentiments = Counter()
+        self.tones = Counter()
+        self.entities = Counter()
+        self.by_source: Dict[str, Counter] = {}
+        self.by_day: Dict[str, Counter] = {}
+
+    def add(self, article: Dict):
+        """Fold a single processed article into the aggregate."""
+        self.total_articles += 1
+
+        if _has_analysis(article):
+            analysis = article["analysis"]
+            sentiment = analysis.get("sentiment", "neutral")
+            self.analysis_success += 1
+            self.fast_path_hits += analysis.get("analyzed_by") == LOCAL_LABEL
+            self.sentiments[sentiment] += 1
+            self.tones[analysis.get("tone", "unknown")] += 1
+            source = article.get("source") or UNKNOWN_SOURCE
+            self.by_source.setdefault(source, Counter())[sentiment] += 1
+            self.by_day.setdefault(_day(article.get("published_at")), Counter())[sentiment] += 1
+            entities = analysis.get("key_entities")
+            if isinstance(entities, list):
+                self.entities.update(str(entity) for entity in entities)
+
+        if _has_validation(article):
+            validation = article["validation"]
+            self.add_verdict(bool(validation.get("is_valid")), validation.get("sampling_weight") or 1.0)
+        elif article.get("validation") == UNSAMPLED:
+            self.validation_unsampled += 1
+
+    def add_verdict(self, is_valid: bool, weight: float = 1.0):
+        """Fold in one validation verdict with its sampling weight."""
+        self.validation_success += 1
+        self.validation_weight += weight
+        self.excess_weight += weight * (weight - 1)
+        if is_valid:
+            self.validation_correct += 1
+            self.correct_weight += weight
+            self.excess_correct_weight += weight * (weight - 1)
+
+    def update(self, articles: Iterable[Dict]) -> "SummaryStats":
+        """Fold in many articles."""
+        for article in articles:
+            self.add(article)
+        return self
+
+    def merge(self, other: "SummaryStats") -> "SummaryStats":
+        """Combine another partial aggregate into this one."""
+        self.total_articles += other.total_articles
+        self.analysis_success += other.analysis_success
+        self.validation_success += other.validation_success
+        self.validation_correct += other.validation_correct
+        self.validation_unsampled += other.validation_unsampled
+        self.validation_weight += other.validation_weight
+        self.correct_weight += other.correct_weight
+        self.excess_weight += other.excess_weight
+        self.excess_correct_weight += other.excess_correct_weight
+        self.fast_path_hits += other.fast_path_hits
+        self.sentiments.update(other.sentiments)
+        self.tones.update(other.tones)
+        self.entities.update(other.entities)
+        for mine, theirs in ((self.by_source, other.by_source), (self.by_day, other.by_day)):
+            for key, counts in theirs.items():
+                mine.setdefault(key, Counter()).update(counts)
+        return self
+
+    def estimated_accuracy(self):
+        """
+        Accuracy over all validation-eligible analyses, extrapolated from the sample.
+
+        Returns:
+            (accuracy, margin) with a 95% margin of error, or (None, None)
+            without any verdicts
+        """
+        if not self.validation_weight:
+            return None, None
+        accuracy = self.correct_weight / self.validation_weight
+        variance = (self.excess_correct_weight * (1 - 2 * accuracy)
+                    + self.excess_weight * accuracy ** 2) / self.validation_weight ** 2
+        return accuracy, CONFIDENCE_Z * math.sqrt(max(0.0, variance))
+
+    def to_dict(self, top_entities: int = TOP_ENTITIES) -> Dict:
+        """
+        Render the summary statistics.
+
+        Returns:
+            Dict with overall counts, sentiment/tone distributions, per-source
+            and per-day sentiment breakdowns and the most frequent entities.
+            validation_correct/incorrect count the verdicts actually seen;
+            estimated_* extrapolate them to unsampled analyses.
+        """
+        accuracy, margin = self.estimated_accuracy()
+        return {
+            "total_articles": self.total_articles,
+            "sentiment_counts": {sentiment: self.sentiments.get(sentiment, 0) for sentiment in SENTIMENTS},
+            "tone_counts": dict(self.tones),
+            "analysis_success": self.analysis_success,
+            "analysis_failed": self.total_articles - self.analysis_success,
+            "validation_success": self.validation_success,
+            "validation_failed": self.total_articles - self.validation_success - self.validation_unsampled,
+            "validation_unsampled": self.validation_unsampled,
+            "validation_correct": self.validation_correct,
+            "validation_incorrect": self.validation_success - self.validation_correct,
+            "estimated_accuracy": accuracy,
+            "accuracy_margin": margin,
+            "estimated_correct": round(self.correct_weight),
+            "estimated_incorrect": round(self.validation_weight - self.correct_weight),
+            "fast_path_hits": self.fast_path_hits,
+            "sentiment_by_source": {key: dict(counts) for key, counts in sorted(self.by_source.items())},
+            "sentiment_by_day": {key: dict(counts) for key, counts in sorted(self.by_day.items())},
+            "top_entities": sorted(self.entities.items(), key=lambda item: (-item[1], item[0]))[:top_entities],
+        }
+
+
+def calculate_stats(articles: Iterable[Dict]) -> Dict:
+    """Calculate summary statistics from processed articles in one pass."""
+    return SummaryStats().update(articles).to_dict()
+
+
+# ---------------------------------------------------------------------------
+# Vectorized aggregation over columnar batches
+# ---------------------------------------------------------------------------
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("columnar statistics require the 'pyarrow' package (pip install pyarrow)")
+
+
+def _decoded(batch, name: str):
+    """Column as a plain (non-dictionary) array."""
+    column = batch.column(batch.schema.get_field_index(name))
+    return column.dictionary_decode() if pa.types.is_dictionary(column.type) else column
+
+
+def _labels(array, default: str):
+    """Replace null and empty labels with a default."""
+    array = pc.fill_null(array, default)
+    return pc.if_else(pc.equal(array, ""), default, array)
+
+
+def _value_counts(array) -> Counter:
+    counts = Counter()
+    for item in pc.value_counts(array).to_pylist():
+        if item["values"] is not None:
+            counts[item["values"]] += item["counts"]
+    return counts
+
+
+def _grouped_counts(keys, values) -> Dict[str, Counter]:
+    """Count (key, value) pairs with a hash group-by."""
+    grouped = pa.table({"key": keys, "value": values}).group_by(["key", "value"]).aggregate([([], "count_all")])
+    result: Dict[str, Counter] = {}
+    for key, value, count in zip(*(grouped.column(name).to_pylist() for name in ("key", "value", "count_all"))):
+        result.setdefault(key, Counter())[value] += count
+    return result
+
+
+def stats_from_batch(batch) -> SummaryStats:
+    """
+    Aggregate one Arrow record batch written by columnar_export.
+
+    Args:
+        batch: pyarrow RecordBatch or Table with the STATS_COLUMNS fields
+
+    Returns:
+        Partial aggregate for the batch
+    """
+    _require_pyarrow()
+    stats = SummaryStats()
+    stats.total_articles = batch.num_rows
+
+    analysis_ok = pc.fill_null(_decoded(batch, "analysis_ok"), False)
+    validation_ok = pc.fill_null(_decoded(batch, "validation_ok"), False)
+    stats.analysis_success = pc.sum(analysis_ok).as_py() or 0
+    stats.validation_success = pc.sum(validation_ok).as_py() or 0
+    stats.validation_unsampled = pc.sum(pc.fill_null(_decoded(batch, "validation_unsampled"), False)).as_py() or 0
+    correct = pc.and_(validation_ok, pc.fill_null(_decoded(batch, "is_valid"), False))
+    stats.validation_correct = pc.sum(correct).as_py() or 0
+
+    weights = pc.if_else(validation_ok, pc.fill_null(_decoded(batch, "sampling_weight"), 1.0), 0.0)
+    excess = pc.multiply(weights, pc.subtract(weights, 1.0))
+    stats.validation_weight = pc.sum(weights).as_py() or 0.0
+    stats.correct_weight = pc.sum(pc.if_else(correct, weights, 0.0)).as_py() or 0.0
+    stats.excess_weight = pc.sum(pc.if_else(validation_ok, excess, 0.0)).as_py() or 0.0
+    stats.excess_correct_weight = pc.sum(pc.if_else(correct, excess, 0.0)).as_py() or 0.0
+
+    analyzed = batch.filter(analysis_ok)
+    if analyzed.num_rows:
+        stats.fast_path_hits = pc.sum(pc.equal(_decoded(analyzed, "analyzed_by"), LOCAL_LABEL)).as_py() or 0
+        sentiment = pc.fill_null(_decoded(analyzed, "sentiment"), "neutral")
+        stats.sentiments = _value_counts(sentiment)
+        stats.tones = _value_counts(pc.fill_null(_decoded(analyzed, "tone"), "unknown"))
+        stats.entities = _value_counts(pc.list_flatten(_decoded(analyzed, "key_entities")))
+        stats.by_source = _grouped_counts(_labels(_decoded(analyzed, "source"), UNKNOWN_SOURCE), sentiment)
+        days = pc.utf8_slice_codeunits(_decoded(analyzed, "published_at"), 0, 10)
+        stats.by_day = _grouped_counts(_labels(days, UNKNOWN_DAY), sentiment)
+    return stats
+
+
+def _iter_batches(path: str):
+    """Yield record batches of a Parquet or Arrow IPC file, reading only stats columns."""
+    if path.endswith(".parquet"):
+        yield from pq.ParquetFile(path).iter_batches(columns=STATS_COLUMNS)
+        return
+    with pa.memory_map(path) as source:
+        for batch in pa.ipc.open_stream(source):
+            yield batch.select(STATS_COLUMNS)
+
+
+def stats_from_columnar(path: str) -> SummaryStats:
+    """Aggregate a Parquet/Arrow file batch by batch."""
+    _require_pyarrow()
+    stats = SummaryStats()
+    for batch in _iter_batches(path):
+        stats.merge(stats_from_batch(batch))
+    return stats
+
+
+def load_stats(path: str) -> SummaryStats:
+    """
+    Aggregate a stored corpus without loading it all into memory.
+
+    Args:
+        path: .parquet/.arrows columnar export or (compressed) JSONL report
+
+    Returns:
+        Aggregate over every record in the file
+    """
+    if path.endswith((".parquet", ".arrows")):
+        return stats_from_columnar(path)
+    return SummaryStats().update(iter_jsonl(path))
+
+
+if __name__ == "__main__":
+    # Summarize a stored corpus: python stats_engine.py output/analysis_reports.parquet
+    for corpus_path in sys.argv[1:]:
+        summary = load_stats(corpus_path).to_dict()
+        print(f"\n{corpus_path}: {summary['total_articles']} articles")
+        print(f"  Sentiment: {summary['sentiment_counts']}")
+        print(f"  Analysis success: {summary['analysis_success']}, validation correct: "
+              f"{summary['validation_correct']}/{summary['validation_success']}")
+        if summary["validation_unsampled"] and summary["estimated_accuracy"] is not None:
+            print(f"  Estimated accuracy: {summary['estimated_accuracy']:.1%} "
+                  f"(+/- {summary['accuracy_margin']:.1%}, {summary['validation_unsampled']} not sampled)")
+        for source, counts in summary["sentiment_by_source"].items():
+            print(f"  {source}: {dict(counts)}")
+        print(f"  Top entities: {summary['top_entities'][:10]}")
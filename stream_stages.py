@@ -0,0 +1,82 @@
+"""
+Stream Stages
+Bounded-queue plumbing for the streaming pipeline. Each stage generator
+runs in its own thread and drains into the next stage's queue. A shared
+stop event ends the whole chain when any stage fails, so producers above
+the failed stage give up instead of blocking forever on a full queue.
+"""
+
+import queue
+import threading
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+# Constants
+POLL_INTERVAL = 0.2  # seconds between stop checks while blocked on a queue
+
+
+def queue_iter(inbox: "queue.Queue", stop: threading.Event) -> Iterator[Any]:
+    """Yield items from a stage queue until the end-of-stream marker, or until stopped and empty."""
+    while True:
+        try:
+            item = inbox.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is None:
+            return
+        yield item
+
+
+def put(outbox: "queue.Queue", item: Any, stop: threading.Event) -> bool:
+    """Put an item into a bounded queue; False if the pipeline stopped while waiting."""
+    while True:
+        try:
+            outbox.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def pipe_stage(stage: Iterable[Any], outbox: "queue.Queue", errors: List[BaseException],
+               stop: threading.Event):
+    """Drain a stage generator into the next bounded queue (thread target)."""
+    try:
+        for item in stage:
+            if not put(outbox, item, stop):
+                break  # downstream is gone; abandon the rest of this stage
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+        print(f"[ERROR] Streaming stage failed: {str(e)[:100]}")
+    finally:
+        close = getattr(stage, "close", None)
+        if close:
+            try:
+                close()  # runs the stage's cleanup (reports, cache close) if it was abandoned
+            except Exception as e:
+                print(f"[WARN] Streaming stage cleanup failed: {str(e)[:100]}")
+        put(outbox, None, stop)
+
+
+def start_stages(stages: Sequence[Tuple[Iterable[Any], "queue.Queue"]], errors: List[BaseException],
+                 stop: threading.Event) -> List[threading.Thread]:
+    """
+    Run each (stage, outbox) pair in a daemon thread.
+
+    Args:
+        stages: Stage generators with the queue each one feeds
+        errors: Collects exceptions raised by stages
+        stop: Set when a stage fails; every queue wait checks it
+
+    Returns:
+        The started threads (join them once the last queue is drained)
+    """
+    threads = [
+        threading.Thread(target=pipe_stage, args=(stage, outbox, errors, stop), daemon=True)
+        for stage, outbox in stages
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
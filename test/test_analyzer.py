@@ -1,4 +1,92 @@
+import io
+import os
+import re
+import json
+import sys
+import time
+import tempfile
+import queue
+import threading
 import unittest
+from collections import deque
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest import mock
+
+# Make project modules importable when run from the repo root or test/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from result_cache import ResultCache, make_cache_key
+from deduplicator import RESULT_FIELDS, StreamDeduplicator, deduplicate, normalize_url, propagate_results
+from jsonl_io import JsonlWriter, iter_jsonl, jsonl_path
+from stats_engine import SummaryStats, calculate_stats, stats_from_columnar
+from columnar_export import ColumnarWriter, columnar_available, flatten_article
+from models import UNSAMPLED, Article, Analysis, as_dict
+from content_reducer import CONTENT_TOKEN_BUDGET, article_content, reduce_content, split_sentences
+from throttling import AdaptiveBackoff, AIMDLimiter, RateLimiter, TokenBucket, estimate_tokens, ordered_map
+from local_classifier import LocalClassifier, extract_entities
+from validation_policy import SourceHistory, ValidationPolicy
+from seen_index import SeenIndex
+from checkpoint import CheckpointLog, checkpoint_key
+from llm_backends import (
+    MIN_CONTEXT_CACHE_TOKENS, Backend, BackendError, BackendRouter, GeminiBackend, OpenRouterBackend, Prompt,
+    get_usage, read_json_stream,
+)
+from json_repair import JsonRepairParser, ParseStats, parse_json
+from stream_stages import queue_iter, start_stages
+from resilience import CallCancelled, CircuitBreaker, CircuitOpenError, call_with_retry, classify_error, retry_after
+
+# LLM stage modules need the provider SDKs; their tests are skipped without them
+try:
+    import news_fetcher
+except ImportError:
+    news_fetcher = None
+try:
+    import llm_analyzer
+except ImportError:
+    llm_analyzer = None
+try:
+    import llm_validator
+except ImportError:
+    llm_validator = None
+try:
+    import main
+except ImportError:
+    main = None
+
+
+class FakeClock:
+    """Stand-in for the time module: monotonic() is fixed and sleep() advances it."""
+    
+    def __init__(self, now: float = 100.0):
+        self.now = now
+        self.sleeps = []
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedBackend(Backend):
+    """Backend that returns queued replies in order and records every prompt it was sent."""
+    
+    def __init__(self, name, replies):
+        self.name = name
+        self.replies = list(replies)
+        self.prompts = []
+    
+    def generate(self, prompt, max_tokens=None, schema=None):
+        self.prompts.append(prompt.text if isinstance(prompt, Prompt) else prompt)
+        return self.replies.pop(0)
+
+
+def analysis_reply(gist: str, **extra) -> dict:
+    """A complete analysis item as a model would return it."""
+    return dict({"gist": gist, "sentiment": "neutral", "tone": "analytical", "key_entities": []}, **extra)
+
 
 class TestNewsAnalyzer(unittest.TestCase):
     
@@ -215,7 +303,1088 @@ class TestNewsAnalyzer(unittest.TestCase):
         self.assertIsInstance(validation_invalid["suggested_corrections"], list)
         self.assertGreater(len(validation_invalid["suggested_corrections"]), 0)
         print("[OK] Test 5: Validation output format is valid")
+    
+    def test_result_cache(self):
+        """Test 6: Verify the persistent cache round-trips, expires and evicts"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, "cache.db"), ttl=None, max_entries=2)
+            key = make_cache_key("model", "1", "Title", "Content")
+            
+            # Miss, then hit after put
+            self.assertIsNone(cache.get(key))
+            cache.put(key, {"sentiment": "positive"})
+            self.assertEqual(cache.get(key), {"sentiment": "positive"})
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            
+            # Key is content-addressed
+            self.assertNotEqual(key, make_cache_key("model", "2", "Title", "Content"))
+            
+            # LRU eviction keeps only max_entries
+            cache.put(make_cache_key("b"), {"n": 2})
+            cache.put(make_cache_key("c"), {"n": 3})
+            cache.evict()
+            self.assertIsNone(cache.get(key))
+            
+            # Expired entries are treated as misses
+            cache.ttl = -1
+            self.assertIsNone(cache.get(make_cache_key("c")))
+            cache.close()
+        print("[OK] Test 6: Result cache round-trips, expires and evicts")
+    
+    def test_deduplication(self):
+        """Test 7: Verify URL and near-duplicate articles collapse to one representative"""
+        body = ("Prime Minister Narendra Modi on Saturday made infiltration the central theme "
+                "of his attack on the TMC government, alleging that large-scale illegal "
+                "migration had altered the state's demographic profile ahead of the polls.")
+        articles = [
+            {"title": "Modi targets TMC", "url": "https://www.example.com/story/", "content": body},
+            {"title": "Modi targets TMC", "url": "https://other.com/syndicated", "content": body + " Reported by PTI."},
+            {"title": "Budget session", "url": "https://example.com/budget", "content": "Parliament opens the budget session with a debate on fiscal policy."},
+            {"title": "Copy", "url": "http://example.com/story?utm_source=feed", "content": "Different text"},
+        ]
+        
+        # URL normalization drops www, trailing slash and tracking params
+        self.assertEqual(normalize_url(articles[0]["url"]), normalize_url(articles[3]["url"]))
+        
+        unique, duplicates = deduplicate(articles)
+        self.assertEqual([a["url"] for a in unique], [articles[0]["url"], articles[2]["url"]])
+        self.assertEqual(len(duplicates), 2)
+        
+        # Results are copied from the representative to its duplicates
+        articles[0]["analysis"] = {"sentiment": "negative"}
+        propagate_results(duplicates)
+        self.assertEqual(articles[1]["analysis"], {"sentiment": "negative"})
+        self.assertEqual(articles[3]["duplicate_of"], articles[0]["url"])
+        print("[OK] Test 7: Deduplication collapses URL and near-duplicate articles")
+    
+    def test_jsonl_round_trip(self):
+        """Test 8: Verify JSONL output streams, compresses and appends records"""
+        records = [{"title": f"Article {i}", "sentiment": "neutral", "text": "नमस्ते"} for i in range(5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for compression in (None, "gzip"):
+                path = jsonl_path(os.path.join(tmp, "reports.json"), compression)
+                with JsonlWriter(path, fsync_every=2) as writer:
+                    for record in records[:3]:
+                        writer.write(record)
+                with JsonlWriter(path, append=True) as writer:
+                    for record in records[3:]:
+                        writer.write(record)
+                
+                # Codec is inferred from the suffix on read
+                self.assertEqual(list(iter_jsonl(path)), records)
+            self.assertTrue(path.endswith(".jsonl.gz"))
+        print("[OK] Test 8: JSONL writer round-trips plain and gzip output")
+    
+    def test_stats_engine_merge(self):
+        """Test 9: Verify partial statistics merge to the single-pass result"""
+        articles = [
+            {"source": "BBC", "published_at": "2026-01-05T10:00:00Z",
+             "analysis": {"sentiment": "negative", "tone": "critical", "key_entities": ["India", "BJP"]},
+             "validation": {"is_valid": True}},
+            {"source": "The Hindu", "published_at": "2026-01-05T18:30:00Z",
+             "analysis": {"sentiment": "positive", "tone": "optimistic", "key_entities": ["India"]},
+             "validation": {"is_valid": False}},
+            {"source": "BBC", "published_at": "2026-01-06T09:00:00Z", "analysis_error": "timeout"},
+        ]
+        stats = calculate_stats(articles)
+        self.assertEqual(stats["sentiment_counts"], {"positive": 1, "negative": 1, "neutral": 0})
+        self.assertEqual((stats["analysis_failed"], stats["validation_incorrect"]), (1, 1))
+        self.assertEqual(stats["sentiment_by_source"]["BBC"], {"negative": 1})
+        self.assertEqual(stats["sentiment_by_day"]["2026-01-05"], {"negative": 1, "positive": 1})
+        self.assertEqual(stats["top_entities"][0], ("India", 2))
+        
+        # Aggregates built separately (per worker / row group) merge losslessly
+        merged = SummaryStats().update(articles[:1]).merge(SummaryStats().update(articles[1:]))
+        self.assertEqual(merged.to_dict(), stats)
+        print("[OK] Test 9: Partial statistics merge to the single-pass result")
+    
+    def test_article_record_round_trip(self):
+        """Test 10: Verify slotted article records convert losslessly to the JSON schema"""
+        data = {
+            "title": "Test Article", "source": "The Guardian", "url": "https://example.com",
+            "published_at": "2026-01-18", "content": "Test content", "api_source": "guardian",
+            "analysis": {"gist": "g", "sentiment": "negative", "tone": "critical", "key_entities": ["India"]},
+        }
+        article = Article.from_dict(data)
+        
+        # Dict-style access used by the pipeline stages
+        self.assertEqual(article["title"], "Test Article")
+        self.assertIsNone(article.get("validation"))
+        self.assertNotIn("validation", article)
+        self.assertIsInstance(article["analysis"], Analysis)
+        
+        # Assigned dicts become records; labels are interned
+        article["validation"] = {"is_valid": True, "suggested_corrections": []}
+        self.assertIs(article["analysis"]["sentiment"], Article.from_dict(data)["analysis"]["sentiment"])
+        
+        # Conversion back keeps key order and values
+        data["validation"] = {"is_valid": True, "suggested_corrections": []}
+        self.assertEqual(list(as_dict(article)), list(data))
+        self.assertEqual(as_dict(article), data)
+        self.assertEqual(as_dict(article, ["title", "url"]), {"title": "Test Article", "url": "https://example.com"})
+        print("[OK] Test 10: Article records round-trip the JSON schema")
+    
+    def test_content_reduction(self):
+        """Test 11: Verify content is reduced to salient whole sentences within the token budget"""
+        title = "Modi targets TMC over infiltration in Bengal"
+        lead = "Prime Minister Narendra Modi made infiltration the central theme of his attack on the TMC."
+        filler = " ".join(f"Local weather report {i} expects light rain and mild winds." for i in range(40))
+        content = f"{lead} Sign up for our newsletter. {filler} Modi said infiltration in Bengal must end. [+2400 chars]"
+        
+        # Sentence splitting keeps abbreviations together
+        self.assertEqual(split_sentences("Mr. Modi met Dr. Singh. He left."), ["Mr. Modi met Dr. Singh.", "He left."])
+        
+        reduced = reduce_content(content, 100, title)
+        self.assertLessEqual(estimate_tokens(reduced), 100)
+        self.assertTrue(reduced.startswith(lead))
+        self.assertIn("Modi said infiltration in Bengal must end.", reduced)
+        self.assertNotIn("newsletter", reduced)
+        self.assertNotIn("chars]", reduced)
+        
+        # Short text is only cleaned, never cut
+        self.assertEqual(reduce_content(lead, 100, title), lead)
+        
+        # Both LLM stages get the same memoized reduction of a long article
+        article = {"title": title, "content": content * 10}
+        shared = article_content(article)
+        self.assertLessEqual(estimate_tokens(shared), CONTENT_TOKEN_BUDGET)
+        self.assertIs(article_content(dict(article)), shared)
+        if llm_analyzer:
+            self.assertIs(llm_analyzer.article_content, llm_validator.article_content)
+        print("[OK] Test 11: Content reduced to salient sentences within budget")
+    
+    def test_local_fast_path(self):
+        """Test 12: Verify the local classifier answers confident articles and defers the rest"""
+        texts = {
+            "positive": ("Investment boost", "Record investment and job growth welcomed across the state."),
+            "negative": ("Violent clashes", "Violent clashes and arrests deepen the political crisis."),
+        }
+        tones = {"positive": "optimistic", "negative": "critical"}
+        records = [
+            {"title": texts[label][0], "content": texts[label][1],
+             "analysis": {"gist": "g", "sentiment": label, "tone": tones[label], "key_entities": []}}
+            for label in ("positive", "negative") for _ in range(100)
+        ]
+        classifier = LocalClassifier.train(records)
+        self.assertIsNotNone(classifier)
+        
+        # Confident article gets a full local analysis in the Gemini schema
+        analysis = classifier.classify({"title": "Investment boost", "content": "Record investment and job growth in Gujarat."})
+        self.assertEqual((analysis["sentiment"], analysis["tone"], analysis["analyzed_by"]), ("positive", "optimistic", "local"))
+        
+        # Articles without known evidence fall back to Gemini
+        self.assertIsNone(classifier.classify({"title": "Budget", "content": "Parliament meets on Monday."}))
+        self.assertEqual(extract_entities("The BJP met in Delhi. The BJP won."), ["BJP", "Delhi"])
+        print("[OK] Test 12: Local fast path answers confident articles only")
+    
+    def test_validation_sampling(self):
+        """Test 13: Verify sampling policy decisions and extrapolated accuracy"""
+        with tempfile.TemporaryDirectory() as tmp:
+            history = SourceHistory(os.path.join(tmp, "history.json"))
+            for i in range(30):
+                history.record("Risky", is_valid=i % 2 == 0)
+                history.record("Clean", is_valid=True)
+            history.save()
+            policy = ValidationPolicy(rate=0.25, history=SourceHistory(history.path))
+            
+            analysis = {"gist": "g", "sentiment": "neutral", "tone": "balanced", "key_entities": []}
+            self.assertEqual(policy.inclusion_probability({"source": "Risky", "analysis": analysis}), (1.0, "source_risk"))
+            self.assertEqual(policy.inclusion_probability({"source": "Clean", "analysis": analysis}), (0.25, "base_rate"))
+            self.assertEqual(policy.inclusion_probability({"source": "New", "analysis": analysis}), (1.0, "new_source"))
+            self.assertEqual(policy.inclusion_probability({"source": "Clean", "analysis": "failed"}), (1.0, "no_analysis"))
+            local = dict(analysis, analyzed_by="local")  # fast path, never seen by Gemini
+            self.assertEqual(policy.inclusion_probability({"source": "Clean", "analysis": local}), (1.0, "local_analysis"))
+        
+        # One valid verdict at weight 1, one invalid sampled at p=0.25, three unsampled
+        articles = [
+            {"analysis": analysis, "validation": {"is_valid": True}},
+            {"analysis": analysis, "validation": {"is_valid": False, "sampling_weight": 4.0}},
+        ] + [{"analysis": analysis, "validation": "unsampled"}] * 3
+        stats = calculate_stats(articles)
+        self.assertEqual((stats["validation_correct"], stats["validation_incorrect"]), (1, 1))
+        self.assertEqual((stats["validation_unsampled"], stats["validation_failed"]), (3, 0))
+        self.assertAlmostEqual(stats["estimated_accuracy"], 0.2)
+        self.assertEqual((stats["estimated_correct"], stats["estimated_incorrect"]), (1, 4))
+        self.assertGreater(stats["accuracy_margin"], 0)
+        print("[OK] Test 13: Validation sampling and weighted accuracy work correctly")
+    
+    def test_backend_failover(self):
+        """Test 14: Verify backend deadlines, failover and latency reporting"""
+        class FakeBackend(Backend):
+            def __init__(self, name, reply, delay=0.0):
+                self.name, self.reply, self.delay = name, reply, delay
+            
+            def generate(self, prompt, max_tokens=None, schema=None):
+                time.sleep(self.delay)
+                if isinstance(self.reply, Exception):
+                    raise self.reply
+                return self.reply
+        
+        def parse(text):
+            if not text.startswith("{"):
+                raise ValueError("not JSON")
+            return text
+        
+        backends = [
+            FakeBackend("stuck", "{}", delay=1.0),
+            FakeBackend("broken", RuntimeError("500 server error")),
+            FakeBackend("garbled", "sorry"),
+            FakeBackend("fallback", '{"ok": true}'),
+        ]
+        router = BackendRouter(backends, deadline=0.1, histogram_path=None)
+        completion = router.complete("prompt", parse=parse)
+        self.assertEqual(completion, ('{"ok": true}', "fallback"))
+        
+        report = router.latency_report()
+        self.assertEqual(report["stuck [single]"]["timeouts"], 1)
+        self.assertEqual(report["broken [single]"]["errors"], 1)
+        self.assertEqual(report["garbled [single]"]["invalid"], 1)
+        self.assertEqual(report["fallback [single]"]["failovers"], 1)
+        
+        # With no working backend the router raises instead of returning None
+        with self.assertRaises(BackendError):
+            BackendRouter(backends[1:3], histogram_path=None).complete("prompt", parse=parse)
+        router.close()
+        print("[OK] Test 14: Backend router fails over past slow, failing and invalid backends")
+    
+    def test_resilience(self):
+        """Test 15: Verify error classification, Retry-After parsing and circuit breakers"""
+        class HTTPError(Exception):
+            def __init__(self, status, headers=None):
+                super().__init__(f"HTTP {status}")
+                self.response = type("Response", (), {"status_code": status, "headers": headers or {}})()
+        
+        self.assertEqual(classify_error(HTTPError(429)), "rate_limit")
+        self.assertEqual(classify_error(HTTPError(503)), "unavailable")
+        self.assertEqual(classify_error(HTTPError(401)), "fatal")
+        self.assertEqual(classify_error(TimeoutError()), "network")
+        self.assertEqual(classify_error(ValueError("bad JSON")), "fatal")
+        self.assertEqual(retry_after(HTTPError(429, {"Retry-After": "7"})), 7.0)
+        
+        # Transient failures trip the breaker; later calls fail fast without reaching the endpoint
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure(HTTPError(503))
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        
+        # Non-retryable errors are raised on the first attempt
+        attempts = []
+        def bad_request():
+            attempts.append(1)
+            raise HTTPError(400)
+        with self.assertRaises(HTTPError):
+            call_with_retry(bad_request, "test-endpoint")
+        self.assertEqual(len(attempts), 1)
+        print("[OK] Test 15: Resilience helpers classify, retry and trip correctly")
+    
+    def test_json_repair(self):
+        """Test 16: Verify malformed and truncated LLM replies are repaired"""
+        stats = ParseStats()
+        self.assertEqual(parse_json('{"tone": "critical"}', stats), {"tone": "critical"})
+        
+        # Fences, prose, trailing commas, Python literals and unescaped inner quotes
+        reply = 'Sure:\n```json\n{"gist": "He said "no" today", "ok": True, "key_entities": ["BJP",],}\n```'
+        self.assertEqual(parse_json(reply, stats), {"gist": 'He said "no" today', "ok": True, "key_entities": ["BJP"]})
+        self.assertEqual(parse_json("{'gist': 'India's budget'}", stats), {"gist": "India's budget"})
+        
+        # Truncated replies keep every complete member
+        self.assertEqual(parse_json('[{"index": 0, "tone": "urgent"}, {"index": 1, "to', stats),
+                         [{"index": 0, "tone": "urgent"}, {"index": 1}])
+        with self.assertRaises(ValueError):
+            parse_json("I cannot analyze this article.", stats)
+        self.assertEqual((stats.strict, stats.repaired, stats.failed), (1, 3, 1))
+        
+        # Brackets in leading prose are not arrays; single-item callers skip arrays altogether
+        self.assertEqual(parse_json('The answer is [see below]: {"a":1}'), {"a": 1})
+        self.assertEqual(parse_json('Here: [ {"a": 1} ] done'), [{"a": 1}])
+        self.assertEqual(parse_json('Options [1, 2] apply: {"a": 1}', expect_object=True), {"a": 1})
+        
+        # Incremental feeding exposes the partial value and detects the end of the top-level value
+        parser = JsonRepairParser()
+        parser.feed('{"gist": "Budget pas')
+        self.assertEqual(parser.value(), {"gist": "Budget pas"})
+        self.assertFalse(parser.complete)
+        parser.feed('sed", "sentiment": "neutral"} trailing text')
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.value(), {"gist": "Budget passed", "sentiment": "neutral"})
+        print("[OK] Test 16: Malformed and truncated replies are repaired")
+    
+    def test_streamed_replies(self):
+        """Test 17: Verify streamed replies stop at the end of the JSON value"""
+        read = []
+        
+        def chunks():
+            try:
+                for chunk in ['```json\n{"is_valid": tr', 'ue, "notes": ["a}"]}', '\n```\nLet me explain', " more"]:
+                    read.append(chunk)
+                    yield chunk
+            finally:
+                read.append("closed")
+        
+        reply = read_json_stream(chunks())
+        self.assertEqual(reply.text, '```json\n{"is_valid": true, "notes": ["a}"]}')
+        self.assertTrue(reply.stopped_early)
+        self.assertIsNotNone(reply.first_token)
+        self.assertEqual(read, read[:2] + ["closed"])  # the trailing explanation is never pulled
+        self.assertEqual(parse_json(reply.text), {"is_valid": True, "notes": ["a}"]})
+        
+        # Abandoned calls stop between chunks
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(CallCancelled):
+            read_json_stream(iter(['{"a": 1', "}"]), cancel)
+        
+        # A "[" at a chunk boundary waits for the next chunk before it counts as the start
+        reply = read_json_stream(iter(["Note [", 'see below]: {"a": 1}', " tail"]))
+        self.assertEqual(parse_json(reply.text), {"a": 1})
+        reply = read_json_stream(iter(["Options [1, 2] ", 'apply: {"a": 1}', " tail"]), expect_object=True)
+        self.assertTrue(reply.stopped_early)
+        self.assertEqual(parse_json(reply.text, expect_object=True), {"a": 1})
+        print("[OK] Test 17: Streamed replies stop at the end of the JSON value")
+    
+    def test_prompt_prefix_caching(self):
+        """Test 18: Verify static prompt prefixes are sent as cacheable system messages"""
+        requests = []
+        
+        def create(**kwargs):
+            requests.append(kwargs)
+            usage = SimpleNamespace(prompt_tokens=300, prompt_tokens_details=SimpleNamespace(cached_tokens=200))
+            return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        prompt = Prompt("Static instructions", "Article text")
+        
+        OpenRouterBackend(client, "test/plain-model").generate(prompt)
+        self.assertEqual(requests[-1]["messages"], [{"role": "system", "content": "Static instructions"},
+                                                    {"role": "user", "content": "Article text"}])
+        
+        # Providers that cache only at breakpoints get a cache_control marker on the prefix
+        OpenRouterBackend(client, "google/test-model").generate(prompt)
+        system = requests[-1]["messages"][0]["content"][0]
+        self.assertEqual(system["cache_control"], {"type": "ephemeral"})
+        
+        # Plain strings carry no prefix; cached input tokens are counted per endpoint
+        OpenRouterBackend(client, "test/plain-model").generate("Whole prompt")
+        self.assertEqual(requests[-1]["messages"], [{"role": "user", "content": "Whole prompt"}])
+        usage = get_usage("openrouter:test/plain-model")
+        self.assertEqual((usage.replies, usage.prompt_tokens, usage.cached_tokens), (2, 600, 400))
+        print("[OK] Test 18: Prompt prefixes are sent as cacheable system messages")
+    
+    def test_streaming_stage_failure(self):
+        """Test 19: Verify a failing streaming stage ends the run instead of hanging it"""
+        closed = []
+        
+        def source():
+            try:
+                for i in range(1000):  # far more than the queues can hold
+                    yield i
+            finally:
+                closed.append(True)
+        
+        def failing(items):
+            for item in items:
+                if item == 5:
+                    raise RuntimeError("analysis stage crashed")
+                yield item
+        
+        stop = threading.Event()
+        errors = []
+        fetched, analyzed, validated = (queue.Queue(maxsize=2) for _ in range(3))
+        stages = [
+            (source(), fetched),
+            (failing(queue_iter(fetched, stop)), analyzed),
+            ((item for item in queue_iter(analyzed, stop)), validated),
+        ]
+        threads = start_stages(stages, errors, stop)
+        results = list(queue_iter(validated, stop))
+        for thread in threads:
+            thread.join(timeout=5)
+        
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        self.assertEqual([str(e) for e in errors], ["analysis stage crashed"])
+        self.assertTrue(stop.is_set())
+        self.assertEqual(closed, [True])  # the producer above the failure was abandoned
+        print("[OK] Test 19: A failing streaming stage stops the whole pipeline")
+    
+    def test_throttling(self):
+        """Test 20: Verify token-bucket refill, backoff pauses and bounded ordered mapping"""
+        clock = FakeClock()
+        with mock.patch("throttling.time", clock):
+            bucket = TokenBucket(60, period=60.0)  # 1 token per second
+            bucket.acquire(60)
+            self.assertEqual(bucket._tokens, 0)
+            clock.now += 10
+            bucket._refill()
+            self.assertAlmostEqual(bucket._tokens, 10)
+            clock.now += 1000
+            bucket._refill()
+            self.assertEqual(bucket._tokens, 60)  # capped at capacity
+            
+            # An empty bucket blocks for exactly the refill time
+            bucket.acquire(60)
+            bucket.acquire(5)
+            self.assertEqual(clock.sleeps, [5.0])
+            
+            # The token budget throttles even while request slots remain
+            clock.sleeps.clear()
+            limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+            limiter.acquire(600)
+            limiter.acquire(300)
+            self.assertEqual(clock.sleeps, [30.0])
+            
+            # A provider's retry_after is honoured even when the backoff delay is shorter
+            clock.sleeps.clear()
+            backoff = AdaptiveBackoff(base_delay=1.0, max_delay=60.0)
+            backoff.record_rate_limit(retry_after=30.0)
+            backoff.record_rate_limit()  # a shorter pause never cuts the longer one
+            backoff.wait()
+            self.assertEqual(clock.sleeps, [30.0])
+            backoff.wait()
+            self.assertEqual(clock.sleeps, [30.0])  # pause has passed
+            backoff.record_success()
+            backoff.record_success()
+            self.assertEqual(backoff._delay, 0.0)
+        
+        # ordered_map keeps input order and never runs more than max_in_flight calls
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+        
+        def work(i):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.001 * ((i * 7) % 5))  # later items often finish first
+            with lock:
+                in_flight[0] -= 1
+            return i * i
+        
+        results = list(ordered_map(work, (i for i in range(40)), max_in_flight=3))
+        self.assertEqual(results, [i * i for i in range(40)])
+        self.assertLessEqual(peak[0], 3)
+        self.assertGreater(peak[0], 1)
+        print("[OK] Test 20: Rate limiting, backoff and ordered mapping behave deterministically")
+    
+    def test_aimd_limiter(self):
+        """Test 21: Verify AIMD additive increase, multiplicative decrease, floor and cooldown"""
+        clock = FakeClock()
+        
+        def finish(limiter, latency=1.0, overloaded=False):
+            limiter.acquire()
+            limiter.release(latency, overloaded=overloaded)
+        
+        with mock.patch("throttling.time", clock):
+            limiter = AIMDLimiter(initial=4, minimum=1, maximum=6, latency_target=10.0,
+                                  decrease_factor=0.5, cooldown=2.0)
+            
+            # Additive increase: +1/limit per fast success, capped at maximum
+            finish(limiter)
+            self.assertAlmostEqual(limiter._limit, 4.25)
+            for _ in range(20):
+                finish(limiter)
+            self.assertEqual(limiter.limit, 6)
+            
+            # Multiplicative decrease on overload
+            finish(limiter, overloaded=True)
+            self.assertEqual(limiter.limit, 3)
+            
+            # Further overloads inside the cooldown window are ignored
+            finish(limiter, overloaded=True)
+            clock.now += 1.0
+            finish(limiter, latency=30.0)
+            self.assertEqual(limiter.limit, 3)
+            
+            # After the cooldown a slow request counts as overload too
+            clock.now += 1.0
+            finish(limiter, latency=30.0)
+            self.assertAlmostEqual(limiter._limit, 1.5)
+            
+            # The limit never drops below the floor
+            for _ in range(3):
+                clock.now += 2.0
+                finish(limiter, overloaded=True)
+            self.assertEqual(limiter._limit, 1.0)
+            self.assertEqual(limiter._in_flight, 0)
+        print("[OK] Test 21: AIMD limiter adapts concurrency within its bounds")
+    
+    @unittest.skipUnless(llm_analyzer, "google-genai / python-dotenv not installed")
+    def test_batch_analysis(self):
+        """Test 22: Verify batch planning, partial batch replies and single-article fallback"""
+        articles = [
+            {"title": f"Story {i}", "content": f"Parliament debated bill number {i}. " * (5 + 20 * (i % 3))}
+            for i in range(7)
+        ]
+        
+        # Batches respect the token budget and the size cap, and keep input order
+        budget = llm_analyzer.PROMPT_OVERHEAD_TOKENS + 900
+        batches = llm_analyzer.plan_batches(articles, token_budget=budget, max_batch_size=3)
+        self.assertEqual([a for batch in batches for a in batch], articles)
+        for batch in batches:
+            self.assertLessEqual(len(batch), 3)
+            cost = llm_analyzer.PROMPT_OVERHEAD_TOKENS + sum(
+                estimate_tokens(a["title"] + llm_analyzer.article_content(a)) + llm_analyzer.BATCH_ITEM_OUTPUT_TOKENS
+                for a in batch
+            )
+            self.assertTrue(len(batch) == 1 or cost <= budget)
+        self.assertGreater(len(batches), 3)  # the budget, not only the size cap, split the list
+        
+        # Objects keyed by index are accepted as well as arrays
+        items = llm_analyzer._parse_batch(json.dumps({"1": analysis_reply("b"), "0": analysis_reply("a")}))
+        self.assertEqual(sorted((item["index"], item["gist"]) for item in items), [("0", "a"), ("1", "b")])
+        
+        # Missing, out-of-range and incomplete items come back as None
+        reply = json.dumps([
+            analysis_reply("first", index=0),
+            analysis_reply("stray", index=7),
+            {"index": 2, "gist": "no labels"},
+        ])
+        router = BackendRouter([ScriptedBackend("stub", [reply])], histogram_path=None)
+        results = llm_analyzer.analyze_batch(articles[:3], router)
+        self.assertEqual(results[0]["gist"], "first")
+        self.assertEqual(results[0]["analyzed_by"], "stub")
+        self.assertEqual(results[1:], [None, None])
+        router.close()
+        
+        # The worker retries only the failed items, one call each
+        backend = ScriptedBackend("stub", [
+            json.dumps({"0": analysis_reply("zero"), "2": analysis_reply("two")}),
+            json.dumps(analysis_reply("one")),
+        ])
+        router = BackendRouter([backend], histogram_path=None)
+        worker = llm_analyzer._AnalysisWorker(router)
+        results = worker.analyze_batch(articles[:3])
+        self.assertEqual([r["gist"] for r in results], ["zero", "one", "two"])
+        self.assertEqual(len(backend.prompts), 2)
+        self.assertIn("Story 1", backend.prompts[1])
+        self.assertNotIn("Story 0", backend.prompts[1])
+        self.assertNotIn("Story 2", backend.prompts[1])
+        router.close()
+        print("[OK] Test 22: Batch analysis retries only the items the batch reply missed")
+    
+    @unittest.skipUnless(llm_validator, "openai / httpx / python-dotenv not installed")
+    def test_batch_validation(self):
+        """Test 23: Verify a partial batch validation reply re-runs only the missing items"""
+        def verdict(valid, **extra):
+            return dict({"is_valid": valid, "justification": "checked", "suggested_corrections": []}, **extra)
+        
+        replies = [
+            json.dumps([verdict(True, index=0), verdict(False, index=2), {"index": 3, "is_valid": True}]),
+            json.dumps(verdict(True)),
+            json.dumps(verdict(False)),
+        ]
+        sent = []
+        
+        def create(**kwargs):
+            sent.append(kwargs["messages"][-1]["content"])
+            return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=replies.pop(0)))])
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        articles = [
+            {"title": f"Story {i}", "content": f"Body of story {i}.", "analysis": analysis_reply(f"gist {i}")}
+            for i in range(4)
+        ]
+        worker = llm_validator._ValidationWorker(client)
+        results = worker.validate_batch(articles)
+        
+        self.assertEqual([r["is_valid"] for r in results], [True, True, False, False])
+        self.assertEqual([r["validation_symbol"] for r in results], ["[VALID]", "[VALID]", "[INVALID]", "[INVALID]"])
+        self.assertEqual(len(sent), 3)  # one batch call plus one retry per missing or incomplete item
+        self.assertIn("Story 1", sent[1])
+        self.assertIn("Story 3", sent[2])
+        for retry in sent[1:]:
+            self.assertNotIn("Story 0", retry)
+            self.assertNotIn("Story 2", retry)
+        print("[OK] Test 23: Batch validation re-runs only the items missing from the reply")
+    
+    def test_seen_index(self):
+        """Test 24: Verify incremental runs skip seen articles and hold watermarks at failures"""
+        def article(i, source="newsapi", done=True):
+            return {
+                "title": f"Story {i}", "content": f"Body {i}", "url": f"https://example.com/{i}?utm_source=x",
+                "api_source": source, "published_at": f"2026-01-{i:02d}T00:00:00Z",
+                "analysis": analysis_reply("gist") if done else None,
+                "validation": {"is_valid": True} if done else None,
+            }
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = SeenIndex(os.path.join(tmp, "seen.db"))
+            for i in (1, 2, 3):
+                index.record(article(i))
+            index.record(article(10, source="guardian"))
+            index.commit_watermarks()
+            self.assertEqual(index.watermarks(), {"newsapi": "2026-01-03T00:00:00Z",
+                                                  "guardian": "2026-01-10T00:00:00Z"})
+            
+            # Seen articles are skipped by URL (tracking parameters ignored) or by content
+            moved = dict(article(2), url="https://example.com/2")
+            rewritten = dict(article(3), url="https://mirror.example.org/3")
+            new = article(4)
+            self.assertEqual(list(index.filter_new([moved, rewritten, new])), [new])
+            self.assertEqual(index.skipped, 2)
+            
+            # A failure holds the mark back at the failed article, even behind the stored mark
+            index.record(article(5))
+            index.record(article(2, done=False))
+            index.record(article(4, done=False))
+            index.commit_watermarks()
+            self.assertEqual(index.watermarks()["newsapi"], "2026-01-02T00:00:00Z")
+            
+            # Once everything succeeds the mark advances again, but never moves back on success alone
+            index.record(article(2))
+            index.record(article(4))
+            index.commit_watermarks()
+            self.assertEqual(index.watermarks()["newsapi"], "2026-01-04T00:00:00Z")
+            index.record(article(1))
+            index.commit_watermarks()
+            self.assertEqual(index.watermarks()["newsapi"], "2026-01-04T00:00:00Z")
+            self.assertEqual(index.watermarks()["guardian"], "2026-01-10T00:00:00Z")
+            index.close()
+        print("[OK] Test 24: Seen index skips processed articles and holds watermarks at failures")
+    
+    def checkpoint_articles(self):
+        return [
+            {"title": f"Story {i}", "source": "Wire", "url": f"https://example.com/{i}", "published_at": "2026-01-18",
+             "content": f"Distinct body text for story number {i}.", "api_source": "newsapi"}
+            for i in range(3)
+        ]
+    
+    def write_checkpoint(self, path):
+        """Checkpoint of an interrupted run: story 0 done, story 1 analyzed, story 2 untouched."""
+        articles = self.checkpoint_articles()
+        log = CheckpointLog(path)
+        log.start()
+        log.record_fetched(articles)
+        articles[0]["analysis"] = analysis_reply("zero")
+        articles[1]["analysis"] = analysis_reply("one")
+        articles[2]["analysis"] = None  # failures are not checkpointed
+        for article in articles:
+            log.record_analysis(article)
+        articles[0]["validation"] = {"is_valid": True, "justification": "ok", "suggested_corrections": []}
+        log.record_validation(articles[0])
+        log.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"stage": "validation", "key": "%s", "da' % checkpoint_key(articles[1]))  # torn by a crash
+    
+    def test_checkpoint_round_trip(self):
+        """Test 25: Verify checkpoint records load back and restore stage results"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "checkpoint.jsonl")
+            self.write_checkpoint(path)
+            state = CheckpointLog(path).load()
+        
+        self.assertEqual([a["title"] for a in state.articles], ["Story 0", "Story 1", "Story 2"])
+        self.assertEqual(len(state.analyses), 2)
+        self.assertEqual(len(state.validations), 1)  # the torn line was ignored
+        
+        articles = self.checkpoint_articles()
+        state.apply(articles)
+        self.assertEqual([(a.get("analysis") or {}).get("gist") for a in articles], ["zero", "one", None])
+        self.assertTrue(articles[0]["validation"]["is_valid"])
+        self.assertNotIn("validation", articles[1])
+        print("[OK] Test 25: Checkpoint log round-trips and ignores a torn last line")
+    
+    @unittest.skipUnless(main, "LLM provider SDKs not installed")
+    def test_resume_pipeline(self):
+        """Test 26: Verify a resumed run only repeats unfinished analyses and validations"""
+        calls = {}
+        
+        def fake_analyze(articles, on_result=None, **kwargs):
+            calls["analyze"] = [a["title"] for a in articles]
+            for article in articles:
+                article["analysis"] = analysis_reply("fresh")
+                on_result(article)
+        
+        def fake_validate(articles, on_result=None, **kwargs):
+            calls["validate"] = [a["title"] for a in articles]
+            for article in articles:
+                article["validation"] = {"is_valid": True, "justification": "ok", "suggested_corrections": [],
+                                         "validation_symbol": "[VALID]"}
+                on_result(article)
+        
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                self.write_checkpoint(main.CheckpointLog().path)
+                with mock.patch.object(main, "analyze_all_articles", fake_analyze), \
+                        mock.patch.object(main, "validate_all_analyses", fake_validate):
+                    main.run_pipeline(resume=True)
+                state = main.CheckpointLog().load()
+            finally:
+                os.chdir(cwd)
+        
+        self.assertEqual(calls["analyze"], ["Story 2"])
+        self.assertEqual(calls["validate"], ["Story 1", "Story 2"])
+        self.assertEqual((len(state.analyses), len(state.validations)), (3, 3))  # resumed work was checkpointed too
+        print("[OK] Test 26: Resumed runs skip checkpointed analyses and validations")
+    
+    @unittest.skipUnless(columnar_available(), "pyarrow not installed")
+    def test_columnar_export(self):
+        """Test 27: Verify Parquet/Arrow export round-trips and vectorized stats match SummaryStats"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        articles = []
+        for i in range(7):
+            article = {"title": f"Story {i}", "source": ["Wire", "Daily", ""][i % 3], "url": f"https://example.com/{i}",
+                       "published_at": f"2026-01-{10 + i % 2}T08:00:00Z", "api_source": "newsapi"}
+            if i == 5:
+                article["analysis"], article["analysis_error"] = None, "analysis_failed"
+            else:
+                article["analysis"] = analysis_reply(f"gist {i}", sentiment=["positive", "negative"][i % 2],
+                                                     key_entities=["Delhi", f"Entity {i % 2}"],
+                                                     analyzed_by="local" if i == 0 else "gemini")
+            if i in (1, 2, 3):
+                article["validation"] = {"is_valid": i != 2, "justification": "checked", "suggested_corrections": [],
+                                         "sampling_weight": 2.0 if i == 3 else 1.0}
+            elif i in (4, 6):
+                article["validation"] = UNSAMPLED
+            articles.append(article)
+        rows = [flatten_article(article) for article in articles]
+        expected = SummaryStats().update(articles).to_dict()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt, suffix in (("parquet", ".parquet"), ("arrow", ".arrows")):
+                path = os.path.join(tmp, "reports" + suffix)
+                with ColumnarWriter(path, fmt, row_group_size=3) as writer:  # several batches, growing dictionaries
+                    for article in articles:
+                        writer.write(article)
+                
+                if fmt == "parquet":
+                    table = pq.read_table(path)
+                else:
+                    with pa.memory_map(path) as source:
+                        table = pa.ipc.open_stream(source).read_all()
+                self.assertEqual(table.num_rows, len(articles))
+                for name in ("source", "sentiment", "tone", "analyzed_by"):
+                    self.assertTrue(pa.types.is_dictionary(table.schema.field(name).type), f"{fmt} {name}")
+                    self.assertEqual(table.column(name).to_pylist(), [row[name] for row in rows])
+                self.assertEqual(table.to_pylist(), rows)
+                
+                # Vectorized group-bys agree with the row-by-row aggregate
+                self.assertEqual(stats_from_columnar(path).to_dict(), expected)
+        print("[OK] Test 27: Columnar export round-trips and vectorized stats match")
+    
+    @unittest.skipUnless(main, "LLM provider SDKs not installed")
+    def test_markdown_pagination(self):
+        """Test 28: Verify paged Markdown reports, deferred headers and stale page cleanup"""
+        articles = [
+            {"title": f"Story {i}", "source": "Wire", "url": f"https://example.com/{i}",
+             "analysis": analysis_reply(f"Gist of story {i}. " * 10)}
+            for i in range(6)
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "final_report.md")
+            for page in range(2, 10):  # leftovers from an earlier, longer report
+                with open(os.path.join(tmp, f"final_report_p{page}.md"), "w") as f:
+                    f.write("stale")
+            
+            # Header unknown up front: sections go to a side file until close()
+            writer = main._MarkdownReportWriter(path, page_bytes=400)
+            for article in articles:
+                writer.write(article)
+            self.assertTrue(os.path.exists(path + ".body"))
+            writer.close(calculate_stats(articles))
+            
+            self.assertGreater(len(writer.pages), 2)
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(os.path.basename(page) for page in writer.pages))
+            pages = []
+            for page in writer.pages:
+                with open(page, encoding="utf-8") as f:
+                    pages.append(f.read())
+        
+        self.assertTrue(pages[0].startswith("# News Analysis Report\n"))
+        self.assertIn("**Articles Analyzed:** 6", pages[0])
+        self.assertLess(pages[0].index("## Summary"), pages[0].index("Story 0"))
+        self.assertIn("[Next page](final_report_p2.md)", pages[0])
+        self.assertTrue(pages[1].startswith("# News Analysis Report (page 2)\n"))
+        self.assertIn("[Previous page](final_report.md)", pages[1])
+        self.assertIn("[Next page](final_report_p3.md)", pages[1])
+        self.assertNotIn("[Next page]", pages[-1])
+        
+        # Every article appears exactly once, in order, across the pages
+        report = "".join(pages)
+        headings = [f'### Article {i + 1}: "Story {i}"' for i in range(6)]
+        self.assertEqual([report.count(heading) for heading in headings], [1] * 6)
+        positions = [report.index(heading) for heading in headings]
+        self.assertEqual(positions, sorted(positions))
+        print("[OK] Test 28: Markdown reports page, join deferred headers and drop stale pages")
+    
+    @unittest.skipUnless(news_fetcher, "requests / python-dotenv not installed")
+    def test_concurrent_fetch(self):
+        """Test 29: Verify sources are fetched in parallel, failures are isolated and latency is reported"""
+        both_waiting = threading.Barrier(2, timeout=5)  # only passes if both sources are in flight at once
+        
+        def get_json(endpoint, url, params, check_status=True):
+            both_waiting.wait()
+            if endpoint == "newsapi":
+                return {"status": "ok", "articles": [
+                    {"title": f"N{i}", "source": {"name": "Wire"}, "url": f"https://n.example/{i}",
+                     "description": "text"} for i in range(params["pageSize"])
+                ]}
+            time.sleep(0.1)
+            return {"response": {"status": "ok", "results": [
+                {"webTitle": f"G{i}", "webUrl": f"https://g.example/{i}", "fields": {"bodyText": "text"}}
+                for i in range(params["page-size"])
+            ]}}
+        
+        keys = {"NEWS_API_KEY": "key", "GUARDIAN_API_KEY": "key"}
+        with mock.patch.multiple(news_fetcher, _get_json=get_json, **keys), redirect_stdout(io.StringIO()) as out:
+            articles = news_fetcher.fetch_all_news(target_count=6)
+        self.assertEqual([a["title"] for a in articles], ["N0", "N1", "N2", "G0", "G1", "G2"])
+        
+        # Per-source latency reaches the summary block
+        latency = dict(re.findall(r"- (NewsAPI|Guardian): 3 articles \((\d+\.\d+)s\)", out.getvalue()))
+        self.assertEqual(set(latency), {"NewsAPI", "Guardian"})
+        self.assertGreaterEqual(float(latency["Guardian"]), 0.1)
+        
+        # One source raising still returns the other source's articles
+        def flaky_get_json(endpoint, url, params, check_status=True):
+            if endpoint == "guardian":
+                raise RuntimeError("connection reset")
+            return {"status": "ok", "articles": [
+                {"title": "N0", "source": {"name": "Wire"}, "url": "https://n.example/0", "description": "text"}
+            ]}
+        
+        with mock.patch.multiple(news_fetcher, _get_json=flaky_get_json, **keys), \
+                redirect_stdout(io.StringIO()) as out:
+            articles = news_fetcher.fetch_all_news(target_count=6)
+        self.assertEqual([a["title"] for a in articles], ["N0"])
+        self.assertIn("Guardian: 0 articles", out.getvalue())
+        self.assertIn("[FAILED]", out.getvalue())
+        print("[OK] Test 29: Sources are fetched concurrently and one failure does not sink the other")
+    
+    @unittest.skipUnless(news_fetcher, "requests / python-dotenv not installed")
+    def test_paginated_fetch(self):
+        """Test 30: Verify page walking, its stop conditions, the budget cutoff and producer shutdown"""
+        requested = []
+        
+        def fake_api(total, cap_page=None, empty_page=None):
+            """Stub _get_json serving `total` results, optionally failing or running dry at a page."""
+            def get_json(endpoint, url, params, check_status=True):
+                if endpoint == "newsapi":
+                    page, size = params["page"], params["pageSize"]
+                else:
+                    page, size = params["page"], params["page-size"]
+                requested.append((endpoint, page))
+                if page == cap_page:
+                    return {"status": "error", "code": "maximumResultsReached"}
+                count = 0 if page == empty_page else max(0, min(size, total - (page - 1) * size))
+                ids = range((page - 1) * size, (page - 1) * size + count)
+                if endpoint == "newsapi":
+                    return {"status": "ok", "totalResults": total, "articles": [
+                        {"title": f"N{i}", "source": {"name": "Wire"}, "url": f"https://n.example/{i}"} for i in ids
+                    ]}
+                return {"response": {"status": "ok", "pages": -(-total // size), "results": [
+                    {"webTitle": f"G{i}", "webUrl": f"https://g.example/{i}"} for i in ids
+                ]}}
+            return get_json
+        
+        def walk(iter_pages, api):
+            requested.clear()
+            with mock.patch.object(news_fetcher, "_get_json", api), redirect_stdout(io.StringIO()):
+                return [len(page) for page in iter_pages(page_size=2)]
+        
+        keys = {"NEWS_API_KEY": "key", "GUARDIAN_API_KEY": "key"}
+        with mock.patch.multiple(news_fetcher, **keys):
+            # The cursor walks to the last page, which may be short
+            self.assertEqual(walk(news_fetcher.iter_newsapi_pages, fake_api(5)), [2, 2, 1])
+            self.assertEqual([page for _, page in requested], [1, 2, 3])
+            self.assertEqual(walk(news_fetcher.iter_guardian_pages, fake_api(5)), [2, 2, 1])
+            self.assertEqual([page for _, page in requested], [1, 2, 3])
+            
+            # NewsAPI's result cap and empty pages end the walk early
+            self.assertEqual(walk(news_fetcher.iter_newsapi_pages, fake_api(100, cap_page=3)), [2, 2])
+            self.assertEqual(walk(news_fetcher.iter_newsapi_pages, fake_api(100, empty_page=2)), [2])
+            self.assertEqual(walk(news_fetcher.iter_guardian_pages, fake_api(100, empty_page=2)), [2])
+            
+            baseline = threading.active_count()
+            
+            def producers_released():
+                deadline = time.monotonic() + 2
+                while threading.active_count() > baseline and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                calls = len(requested)
+                time.sleep(0.1)
+                return threading.active_count() <= baseline and len(requested) == calls
+            
+            # The budget caps the articles yielded across both sources
+            requested.clear()
+            with mock.patch.object(news_fetcher, "_get_json", fake_api(10 ** 6)), redirect_stdout(io.StringIO()):
+                articles = list(news_fetcher.stream_all_news(budget=30))
+            self.assertEqual(len(articles), 30)
+            self.assertTrue(producers_released())
+            
+            # A consumer that stops early releases the producers as well
+            requested.clear()
+            with mock.patch.object(news_fetcher, "_get_json", fake_api(10 ** 6)), redirect_stdout(io.StringIO()):
+                stream = news_fetcher.stream_all_news(budget=10 ** 6)
+                first = [next(stream) for _ in range(5)]
+                stream.close()
+            self.assertEqual(len(first), 5)
+            self.assertTrue(producers_released())
+        print("[OK] Test 30: Pagination stops at the last page, the result cap and the budget")
+    
+    @unittest.skipUnless(llm_validator, "openai / httpx / python-dotenv not installed")
+    def test_validation_cache(self):
+        """Test 31: Verify cached validations skip the OpenRouter call and keys track model, content and analysis"""
+        sent = []
+        
+        def create(**kwargs):
+            sent.append(kwargs)
+            reply = json.dumps({"is_valid": True, "justification": "ok", "suggested_corrections": []})
+            return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        article = {"title": "Budget vote", "content": "Parliament passed the budget on Friday.",
+                   "analysis": analysis_reply("The budget passed")}
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, "validation.db"))
+            first = llm_validator._ValidationWorker(client, cache)(article)
+            self.assertEqual(len(sent), 1)
+            
+            # A repeated (article, analysis) pair is served from the cache, even by a new worker
+            again = llm_validator._ValidationWorker(client, cache)(dict(article))
+            self.assertEqual(len(sent), 1)
+            self.assertEqual(again, first)
+            
+            # Changing the gist or the article text misses
+            llm_validator._ValidationWorker(client, cache)(dict(article, analysis=analysis_reply("The budget failed")))
+            self.assertEqual(len(sent), 2)
+            llm_validator._ValidationWorker(client, cache)(dict(article, content="Parliament rejected the budget."))
+            self.assertEqual(len(sent), 3)
+            cache.close()
+        
+        key = llm_validator.validation_cache_key(article, article["analysis"])
+        with mock.patch.object(llm_validator, "MODEL_NAME", "other/model"):
+            self.assertNotEqual(llm_validator.validation_cache_key(article, article["analysis"]), key)
+        print("[OK] Test 31: Validation cache hits repeat pairs and misses on changed inputs")
+    
+    def test_stream_dedup_memory(self):
+        """Test 32: Verify streaming dedup only holds in-flight articles and keeps result fields afterwards"""
+        def story(i, url=None):
+            words = " ".join(f"w{i}x{j}" for j in range(30))
+            return {"title": f"Story {i}", "url": url or f"https://example.com/{i}", "content": words}
+        
+        articles = [story(0), story(0, "https://example.com/0?utm_source=feed")]  # copy while 0 is in flight
+        articles += [story(i) for i in range(1, 500)]
+        articles.append(story(0, "https://www.example.com/0/"))  # copy after 0 left the pipeline
+        
+        dedup = StreamDeduplicator()
+        peak = [0]
+        
+        def lagging(items, lag=4):
+            """LLM stages stand-in: analyzes each article, holding a few in flight."""
+            held = deque()
+            for article in items:
+                article["analysis"] = analysis_reply(f"gist of {article['title']}")
+                held.append(article)
+                peak[0] = max(peak[0], len(dedup._in_flight))
+                if len(held) > lag:
+                    yield held.popleft()
+            yield from held
+        
+        with redirect_stdout(io.StringIO()):
+            results = list(dedup.expand(lagging(dedup.filter(iter(articles)))))
+        
+        self.assertEqual(len(results), len(articles))
+        copies = [a for a in results if "duplicate_of" in a]
+        self.assertEqual(len(copies), 2)
+        for copy in copies:
+            self.assertEqual(copy["analysis"]["gist"], "gist of Story 0")
+            self.assertEqual(copy["duplicate_of"], "https://example.com/0")
+        
+        # Only articles inside the pipeline are referenced; afterwards just their result fields remain
+        self.assertLessEqual(peak[0], 6)
+        self.assertEqual((dedup._in_flight, dedup._ids, dedup._pending, dedup._ready), ({}, {}, {}, []))
+        self.assertEqual(len(dedup._results), 500)
+        self.assertTrue(all(set(kept) <= set(RESULT_FIELDS) | {"url"} for kept in dedup._results.values()))
+        print("[OK] Test 32: Streaming dedup memory stays bounded by the articles in flight")
 
+    @unittest.skipUnless(llm_analyzer, "google-genai / python-dotenv not installed")
+    def test_failover_not_cached(self):
+        """Test 33: Verify failover answers are not served later as primary-model cache hits"""
+        articles = [{"title": f"Budget vote {i}", "content": f"Parliament passed budget {i} on Friday."} for i in range(2)]
+        article = articles[0]
+        primary = ScriptedBackend(llm_analyzer.MODEL_NAME, [
+            "sorry",  # invalid reply, so the router fails over
+            json.dumps(analysis_reply("from primary")),
+            "sorry",
+        ])
+        fallback = ScriptedBackend("gemini-2.5-flash", [
+            json.dumps(analysis_reply("from fallback")),
+            json.dumps([analysis_reply("batch 0", index=0), analysis_reply("batch 1", index=1)]),
+        ])
+        router = BackendRouter([primary, fallback], histogram_path=None)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, "analysis.db"))
+            key = llm_analyzer.analysis_cache_key(article)
+            worker = llm_analyzer._AnalysisWorker(router, cache=cache)
+            
+            first = worker(dict(article))
+            self.assertEqual(first["analyzed_by"], "gemini-2.5-flash")
+            self.assertIsNone(cache.get(key))
+            
+            # The next call goes back to the primary model, whose answer is cached and reused
+            second = worker(dict(article))
+            self.assertEqual((second["gist"], second["analyzed_by"]), ("from primary", llm_analyzer.MODEL_NAME))
+            self.assertEqual(cache.get(key), second)
+            self.assertEqual(worker(dict(article)), second)
+            self.assertEqual(len(primary.prompts), 2)
+            
+            # Batch answers from a fallback backend are not cached either
+            other = llm_analyzer.analysis_cache_key(articles[1])
+            results = worker.analyze_batch([articles[1], dict(articles[1], title="Budget vote 2")])
+            self.assertEqual([r["analyzed_by"] for r in results], ["gemini-2.5-flash"] * 2)
+            self.assertIsNone(cache.get(other))
+            cache.close()
+        router.close()
+        print("[OK] Test 33: Only primary-model analyses are written to the analysis cache")
+    
+    def test_gemini_context_cache(self):
+        """Test 34: Verify long Gemini prefixes are cached once, reused and deleted when the router closes"""
+        created, deleted, configs = [], [], []
+        
+        def create(model, config):
+            created.append((model, config["system_instruction"]))
+            return SimpleNamespace(name=f"cachedContents/{len(created)}")
+        
+        def generate_content(model, contents, config):
+            configs.append(config)
+            return SimpleNamespace(text="{}", usage_metadata=None)
+        
+        client = SimpleNamespace(caches=SimpleNamespace(create=create, delete=lambda name: deleted.append(name)),
+                                 models=SimpleNamespace(generate_content=generate_content))
+        router = BackendRouter([GeminiBackend(client, "gemini-test")], histogram_path=None)
+        long_prefix = "Shared rubric. " * (4 * MIN_CONTEXT_CACHE_TOKENS // 15 + 1)
+        
+        with redirect_stdout(io.StringIO()):
+            for idx in range(3):
+                router.complete(Prompt(long_prefix, f"Article {idx}"))
+            router.complete(Prompt("Short instructions", "Article 3"))
+        
+        # One cache for the long prefix, referenced by every request that uses it
+        self.assertEqual(created, [("gemini-test", long_prefix)])
+        self.assertEqual([config.get("cached_content") for config in configs[:3]], ["cachedContents/1"] * 3)
+        self.assertNotIn("system_instruction", configs[0])
+        
+        # Prefixes under the minimum are sent inline as the system instruction
+        self.assertEqual(configs[3], {"system_instruction": "Short instructions"})
+        
+        router.close()
+        self.assertEqual(deleted, ["cachedContents/1"])
+        
+        # The real analysis prefixes are long enough for an explicit cache
+        if llm_analyzer:
+            for prefix in (llm_analyzer.ANALYSIS_INSTRUCTIONS, llm_analyzer.BATCH_INSTRUCTIONS):
+                self.assertGreaterEqual(estimate_tokens(prefix), MIN_CONTEXT_CACHE_TOKENS)
+        print("[OK] Test 34: Gemini context cache is created once, reused and deleted on close")
 
 if __name__ == "__main__":
     # Run tests
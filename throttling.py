@@ -0,0 +1,200 @@
+"""
+Throttling helpers shared by the LLM stages.
+Token-bucket rate limiting, adaptive 429 backoff, AIMD concurrency control
+and an order-preserving bounded concurrent map.
+"""
+
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class OverloadError(Exception):
+    """Raised when a provider signals overload (HTTP 429 or 5xx)."""
+
+    retry_after: Optional[float] = None  # seconds requested by the provider, if any
+
+
+class RateLimitError(OverloadError):
+    """Raised when a provider rejects a request with HTTP 429."""
+
+
+def http_status(error: BaseException) -> Optional[int]:
+    """Extract an HTTP status code from an SDK or requests exception, if it has one."""
+    for source in (error, getattr(error, "response", None)):
+        for attr in ("code", "status_code", "status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Holds up to `capacity` tokens and refills continuously at
+    `capacity / period` tokens per second.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0):
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, tokens: int):
+        """Reserve one request slot and an estimated token count."""
+        self.requests.acquire(1)
+        self.tokens.acquire(tokens)
+
+
+class AdaptiveBackoff:
+    """
+    Shared pause that grows on 429s and decays on successes.
+
+    Every worker calls wait() before sending a request, so a rate-limit
+    response from one worker slows down all of them instead of each one
+    discovering the limit separately.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._delay = 0.0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Sleep until the shared pause (if any) has passed."""
+        with self._lock:
+            remaining = self._resume_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def record_rate_limit(self, retry_after: Optional[float] = None):
+        """Double the delay (with jitter) and pause all workers."""
+        with self._lock:
+            self._delay = min(self.max_delay, max(self.base_delay, self._delay * 2))
+            delay = max(retry_after or 0.0, self._delay * random.uniform(0.5, 1.0))
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def record_success(self):
+        """Halve the delay after a successful request."""
+        with self._lock:
+            self._delay = self._delay / 2 if self._delay > self.base_delay else 0.0
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit tuned by additive-increase / multiplicative-decrease.
+
+    Each successful, fast request raises the limit by 1/limit (about +1 per
+    round of requests); an overload signal or a request slower than
+    `latency_target` multiplies it by `decrease_factor`. Decreases are
+    applied at most once per `cooldown` seconds so a single burst of
+    failures does not collapse the limit to the floor.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 latency_target: float = 10.0, decrease_factor: float = 0.5,
+                 cooldown: float = 2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    def acquire(self):
+        """Block until a concurrency slot is free, then take it."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, overloaded: bool = False):
+        """Return a slot and adjust the limit from the request outcome."""
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if overloaded or latency > self.latency_target:
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.minimum, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def ordered_map(fn: Callable[[T], R], items: Iterable[T], max_in_flight: int) -> Iterator[R]:
+    """
+    Apply fn to items on a thread pool, yielding results in input order.
+
+    At most `max_in_flight` calls run (or wait to be yielded) at once, so
+    unbounded iterables are consumed lazily.
+
+    Args:
+        fn: Function applied to each item
+        items: Input iterable (may be a generator)
+        max_in_flight: Maximum number of concurrent calls
+
+    Yields:
+        fn(item) for each item, in the order items were produced
+    """
+    max_in_flight = max(1, max_in_flight)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for item in items:
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fn, item))
+
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,184 @@
+"""
+Validation Policy
+Decides which analyses are sent to Mistral for validation. Each analysis
+gets an inclusion probability from a base sampling rate, raised for
+sources with a high historical invalid rate and for analyses where the
+local classifier disagrees with Gemini, lowered where it confidently
+agrees. Fast-path analyses from the local classifier itself were never
+seen by Gemini and are always validated. Sampled validations carry a weight (1 / probability) so accuracy
+can be extrapolated to every analysis, not just the validated ones.
+"""
+
+import os
+import json
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from result_cache import make_cache_key
+from models import is_result
+from local_classifier import LOCAL_LABEL, LocalClassifier
+
+# Constants
+HISTORY_PATH = "cache/source_quality.json"
+MIN_SAMPLING_RATE = 0.02  # floor so every kind of analysis keeps being checked
+AGREEMENT_DISCOUNT = 0.5  # rate multiplier when the local classifier agrees with Gemini
+AGREEMENT_CONFIDENCE = 0.7  # local predictions below this give no agreement signal
+RISK_MULTIPLIER = 4.0  # inclusion probability per unit of historical invalid rate
+MIN_SOURCE_VERDICTS = 20  # sources with fewer past verdicts are always validated
+
+
+def _unit_draw(article: Dict, seed: str) -> float:
+    """Deterministic uniform draw in [0, 1) per article, stable across reruns and resumes."""
+    identity = article.get("url") or article.get("title", "")
+    return int(make_cache_key("sample", seed, identity)[:15], 16) / 16 ** 15
+
+
+class SourceHistory:
+    """
+    Per-source validation outcomes accumulated across runs.
+
+    Verdicts are stored with their sampling weights so the invalid rate is
+    an unbiased estimate even though risky analyses are oversampled.
+
+    Args:
+        path: JSON file (created on save)
+    """
+
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.sources: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.sources = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Source history unreadable, starting fresh: {str(e)[:100]}")
+
+    def invalid_rate(self, source: str) -> Optional[float]:
+        """Weighted invalid rate of a source, or None without enough history."""
+        entry = self.sources.get(source)
+        if not entry or entry["verdicts"] < MIN_SOURCE_VERDICTS or entry["weight"] <= 0:
+            return None
+        return entry["invalid_weight"] / entry["weight"]
+
+    def record(self, source: str, is_valid: bool, weight: float = 1.0):
+        """Add one validation verdict."""
+        with self._lock:
+            entry = self.sources.setdefault(source, {"verdicts": 0, "weight": 0.0, "invalid_weight": 0.0})
+            entry["verdicts"] += 1
+            entry["weight"] += weight
+            if not is_valid:
+                entry["invalid_weight"] += weight
+
+    def save(self):
+        """Write the history atomically."""
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.sources, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class ValidationPolicy:
+    """
+    Confidence-gated sampling of analyses for validation.
+
+    Args:
+        rate: Base sampling rate (1.0 validates everything)
+        history: Per-source validation history (updated with this run's verdicts)
+        classifier: Local classifier used as a second opinion, if trained
+        seed: Changes which articles are drawn at a given probability
+    """
+
+    def __init__(self, rate: float = 1.0, history: Optional[SourceHistory] = None,
+                 classifier: Optional[LocalClassifier] = None, seed: str = ""):
+        self.rate = min(1.0, max(MIN_SAMPLING_RATE, rate))
+        self.history = history if history is not None else SourceHistory()
+        self.classifier = classifier
+        self.seed = seed
+        self.reasons = Counter()
+
+    @classmethod
+    def create(cls, rate: float = 1.0) -> "ValidationPolicy":
+        """Policy with the stored source history; the classifier is only loaded when sampling."""
+        classifier = LocalClassifier.load() if rate < 1.0 else None
+        return cls(rate, SourceHistory(), classifier)
+
+    def _agreement(self, article: Dict, analysis: Dict) -> Optional[bool]:
+        """Whether a confident local prediction matches Gemini (None = no signal)."""
+        if self.classifier is None:
+            return None
+        sentiment, tone, confidence = self.classifier.predict(article)
+        if confidence < AGREEMENT_CONFIDENCE:
+            return None
+        return sentiment == analysis.get("sentiment") and tone == analysis.get("tone")
+
+    def inclusion_probability(self, article: Dict) -> Tuple[float, str]:
+        """
+        Probability that an analysis is validated, with the deciding signal.
+
+        Returns:
+            (probability, reason) where reason is one of "full", "no_analysis",
+            "local_analysis", "new_source", "disagreement", "source_risk",
+            "agreement", "base_rate"
+        """
+        analysis = article.get("analysis")
+        if self.rate >= 1.0:
+            return 1.0, "full"
+        if not is_result(analysis):
+            return 1.0, "no_analysis"  # skipped locally, costs no LLM call
+        if analysis.get("analyzed_by") == LOCAL_LABEL:
+            return 1.0, "local_analysis"  # no Gemini opinion to lean on
+
+        invalid_rate = self.history.invalid_rate(article.get("source") or "Unknown")
+        if invalid_rate is None:
+            return 1.0, "new_source"
+        agreement = self._agreement(article, analysis)
+        if agreement is False:
+            return 1.0, "disagreement"
+
+        probability, reason = self.rate, "base_rate"
+        if agreement:
+            probability, reason = max(MIN_SAMPLING_RATE, self.rate * AGREEMENT_DISCOUNT), "agreement"
+        risk = min(1.0, invalid_rate * RISK_MULTIPLIER)
+        if risk > probability:
+            probability, reason = risk, "source_risk"
+        return probability, reason
+
+    def select(self, article: Dict) -> Optional[float]:
+        """
+        Decide whether to validate an article.
+
+        Returns:
+            Sampling weight (1 / inclusion probability) if selected, else None
+        """
+        probability, reason = self.inclusion_probability(article)
+        if probability < 1.0 and _unit_draw(article, self.seed) >= probability:
+            self.reasons["unsampled"] += 1
+            return None
+        self.reasons[reason] += 1
+        return 1.0 / probability
+
+    def record(self, article: Dict):
+        """Feed a completed validation back into the source history."""
+        analysis = article.get("analysis")
+        validation = article.get("validation")
+        if not is_result(analysis) or not is_result(validation):
+            return
+        self.history.record(article.get("source") or "Unknown", bool(validation.get("is_valid")),
+                            validation.get("sampling_weight") or 1.0)
+
+    def close(self):
+        """Persist the updated source history and report the sampling decisions."""
+        try:
+            self.history.save()
+        except OSError as e:
+            print(f"[WARN] Could not save source history: {str(e)[:100]}")
+        if self.rate < 1.0:
+            decided = ", ".join(f"{reason} {count}" for reason, count in self.reasons.most_common())
+            print(f"   Sampling (rate {self.rate:.2f}): {decided}")